@@ -4,6 +4,7 @@ import uuid
 import requests
 from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.db.models import Q
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
@@ -309,10 +310,12 @@ class AppStoreSearchViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
 
     def list(self, request):
-        total = AppStoreApp.objects.count()
-
         query = request.query_params.get("query")
-        limit = request.query_params.get("limit", total)
+        max_limit = getattr(settings, "APP_STORE_SEARCH_MAX_LIMIT", 100)
+        try:
+            limit = min(int(request.query_params.get("limit", max_limit)), max_limit)
+        except ValueError:
+            return DRFResponse(status=400)
 
         if not query:
             return DRFResponse(status=400)
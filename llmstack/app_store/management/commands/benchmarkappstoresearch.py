@@ -0,0 +1,95 @@
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from llmstack.app_store.search import VectorIndex
+
+
+def _percentile(samples, percentile):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * percentile / 100), len(samples) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks app store search over synthetic apps, comparing a faiss index built per request with the "
+        "process resident search index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--apps", type=int, default=10000, help="Number of synthetic apps")
+        parser.add_argument("--queries", type=int, default=200, help="Number of search queries")
+        parser.add_argument("--dimension", type=int, default=384, help="Dimension of the search vectors")
+        parser.add_argument("--top-k", type=int, default=20, help="Results per query")
+        parser.add_argument(
+            "--embed",
+            action="store_true",
+            help="Also time embedding queries with and without the query vector cache. Loads the embedding model",
+        )
+
+    def _report(self, label, samples):
+        self.stdout.write(
+            f"{label}: p50 {_percentile(samples, 50) * 1000:.2f}ms, p95 {_percentile(samples, 95) * 1000:.2f}ms, "
+            f"p99 {_percentile(samples, 99) * 1000:.2f}ms, mean {statistics.mean(samples) * 1000:.2f}ms"
+        )
+
+    def _time(self, fn, *args):
+        start = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - start
+
+    def _search_with_new_index(self, vectors, query, top_k):
+        import faiss
+
+        # What every search request did before the index was process resident
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(vectors)
+        return index.search(query, top_k)
+
+    def handle(self, *args, **options):
+        import numpy as np
+
+        num_apps, dimension, top_k = options["apps"], options["dimension"], options["top_k"]
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((num_apps, dimension)).astype(np.float32)
+        queries = rng.standard_normal((options["queries"], dimension)).astype(np.float32)
+        keys = [str(uuid.uuid4()) for _ in range(num_apps)]
+
+        # The old search also loaded every app from the database, so this is a lower bound for it
+        self._search_with_new_index(vectors, queries[:1], top_k)
+        samples = [
+            self._time(self._search_with_new_index, vectors, query[None, :], top_k)
+            for query in queries[: max(len(queries) // 4, 1)]
+        ]
+        self._report("Index per request", samples)
+
+        start = time.perf_counter()
+        index = VectorIndex(dimension)
+        index.upsert(zip(keys, vectors.tolist()))
+        self.stdout.write(f"Resident index build: {(time.perf_counter() - start) * 1000:.0f}ms for {num_apps} apps")
+
+        samples = [self._time(index.search, query.tolist(), top_k) for query in queries]
+        self._report("Resident index", samples)
+
+        updates = rng.standard_normal((100, dimension)).astype(np.float32)
+        samples = [self._time(index.upsert, [(keys[i], updates[i].tolist())]) for i in range(len(updates))]
+        self._report("Resident index update", samples)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "app_store_search.index")
+            save_time = self._time(index.save, path, {"fingerprint": [num_apps, None]})
+            load_time = self._time(VectorIndex.load, path)
+            self.stdout.write(f"Resident index save: {save_time * 1000:.0f}ms, load: {load_time * 1000:.0f}ms")
+
+        if options["embed"]:
+            from llmstack.common.utils.utils import vectorize_text
+
+            texts = [f"Name: App {i} Description: Synthetic app number {i}" for i in range(20)]
+            load_time = self._time(vectorize_text, "Name: Warm up")
+            self.stdout.write(f"Embedding model load: {load_time * 1000:.0f}ms")
+            self._report("Query embedding, uncached", [self._time(vectorize_text, text) for text in texts])
+            self._report("Query embedding, cached", [self._time(vectorize_text, text) for text in texts])
@@ -143,25 +143,39 @@ class AppStoreApp(models.Model):
         self.slug = self.slug.lower()
         super(AppStoreApp, self).save(*args, **kwargs)
 
+        from llmstack.app_store.search import get_app_store_search_index
 
-def filter_queryset_by_query(query, queryset, vector_field_name="search_vector", top_k=3):
-    import faiss
-    import numpy as np
-
-    base_vector = np.array(vectorize_text(query))
-    # Retrieve all vectors from the queryset
-    all_vectors = np.array([getattr(obj, vector_field_name) for obj in queryset])
-
-    # Build an index
-    index = faiss.IndexFlatL2(base_vector.size)
-    index.add(all_vectors)
+        try:
+            get_app_store_search_index().update(self)
+        except Exception as e:
+            logger.warning(f"Error updating app store search index for {self.slug}: {e}")
 
-    # Search for the most similar vectors
-    distances, idx = index.search(np.expand_dims(base_vector, axis=0), top_k)
 
-    # Get the IDs and similarity scores of the most similar objects
-    similar_objects = [(queryset[int(i)], float(dist)) for i, dist in zip(idx[0], distances[0])]
-
-    # Order the queryset based on the similarity scores
-    ordered_queryset = sorted(similar_objects, key=lambda x: x[1])
-    return ordered_queryset
+def filter_queryset_by_query(query, queryset, vector_field_name="search_vector", top_k=3):
+    """
+    Returns the top_k apps in queryset most similar to query with their distances, closest first. Apps are
+    looked up in the process wide search index, only the matched apps are loaded
+    """
+    from llmstack.app_store.search import get_app_store_search_index
+
+    if vector_field_name != "search_vector":
+        raise ValueError("Only the search_vector field is indexed")
+
+    top_k = int(top_k)
+    if top_k <= 0:
+        return []
+
+    index = get_app_store_search_index()
+    base_vector = vectorize_text(query)
+
+    # The index covers all apps, so search wider until enough of the matches are in queryset
+    search_k = top_k
+    while True:
+        matches = index.search(base_vector, search_k)
+        objects = queryset.in_bulk([uuid for uuid, _ in matches])
+        similar_objects = [
+            (objects[uuid.UUID(app_uuid)], distance) for app_uuid, distance in matches if uuid.UUID(app_uuid) in objects
+        ]
+        if len(similar_objects) >= top_k or len(matches) < search_k:
+            return similar_objects[:top_k]
+        search_k *= 2
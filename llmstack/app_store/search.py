@@ -0,0 +1,277 @@
+"""
+Process resident search index over app store apps.
+
+Searching used to load every app with its search vector and build a new faiss index on each request. The index is
+now built once per process from the stored search vectors, updated in place when an app changes and persisted to
+disk so that a restarted process only has to load the apps that changed since it was written.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+def get_app_store_search_index_path() -> str:
+    return getattr(settings, "APP_STORE_SEARCH_INDEX_PATH", "") or os.path.join(
+        tempfile.gettempdir(), "llmstack", "app_store_search.index"
+    )
+
+
+class VectorIndex:
+    """
+    An exact L2 index of vectors keyed by string IDs that supports adding, replacing and removing vectors in place.
+    Not thread safe, AppStoreSearchIndex serializes access to it
+    """
+
+    def __init__(self, dimension: int, index=None, ids: Optional[dict] = None, next_id: int = 0):
+        import faiss
+
+        self.dimension = dimension
+        self._index = index if index is not None else faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+        # faiss IDs are integers, so each key is assigned one
+        self._ids = ids or {}
+        self._keys = {value: key for key, value in self._ids.items()}
+        self._next_id = next_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def upsert(self, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        import numpy as np
+
+        keys, vectors = [], []
+        for key, vector in items:
+            if not vector or len(vector) != self.dimension:
+                self.remove([key])
+                continue
+            keys.append(key)
+            vectors.append(vector)
+
+        if not keys:
+            return
+
+        self.remove(keys)
+        ids = np.arange(self._next_id, self._next_id + len(keys), dtype=np.int64)
+        self._next_id += len(keys)
+        self._index.add_with_ids(np.asarray(vectors, dtype=np.float32), ids)
+        for key, id in zip(keys, ids.tolist()):
+            self._ids[key] = id
+            self._keys[id] = key
+
+    def remove(self, keys: Iterable[str]) -> None:
+        import numpy as np
+
+        ids = [self._ids.pop(key) for key in keys if key in self._ids]
+        if ids:
+            self._index.remove_ids(np.asarray(ids, dtype=np.int64))
+            for id in ids:
+                self._keys.pop(id, None)
+
+    def search(self, vector: Sequence[float], top_k: int) -> List[Tuple[str, float]]:
+        import numpy as np
+
+        top_k = min(top_k, len(self._ids))
+        if top_k <= 0:
+            return []
+
+        distances, ids = self._index.search(np.asarray([vector], dtype=np.float32), top_k)
+        return [
+            (self._keys[int(id)], float(distance))
+            for id, distance in zip(ids[0], distances[0])
+            if int(id) in self._keys
+        ]
+
+    def save(self, path: str, metadata: dict) -> None:
+        import faiss
+
+        # The metadata and the index are written to one file, a length prefixed JSON header followed by the
+        # serialized index. It is written to a temporary file and renamed in one step, so that a process loading
+        # the index never sees a partial write or the metadata of another save
+        header = json.dumps(
+            {**metadata, "dimension": self.dimension, "ids": self._ids, "next_id": self._next_id}
+        ).encode("utf-8")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(len(header).to_bytes(8, "little"))
+                f.write(header)
+                f.write(faiss.serialize_index(self._index).tobytes())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[Optional["VectorIndex"], dict]:
+        import faiss
+        import numpy as np
+
+        if not os.path.exists(path):
+            return None, {}
+
+        with open(path, "rb") as f:
+            header_size = int.from_bytes(f.read(8), "little")
+            metadata = json.loads(f.read(header_size))
+            index = faiss.deserialize_index(np.frombuffer(f.read(), dtype=np.uint8))
+        if index.ntotal != len(metadata["ids"]):
+            return None, {}
+
+        return cls(metadata["dimension"], index=index, ids=metadata["ids"], next_id=metadata["next_id"]), metadata
+
+
+class AppStoreSearchIndex:
+    """
+    Search index over the search vectors of app store apps. Checks the apps table for changes made by other
+    processes at most once every refresh_interval seconds and loads only the apps updated since
+    """
+
+    def __init__(self, path: Optional[str] = None, refresh_interval: float = 60):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self._index = None
+        # Number of apps and the latest updated_at the index reflects
+        self._fingerprint = None
+        self._checked_at = 0
+        self._lock = threading.RLock()
+
+        self._builds = metrics_registry.counter("app_store_search_index.builds", "Full builds of the search index")
+        self._loads = metrics_registry.counter("app_store_search_index.loads", "Search index loads from disk")
+        self._updates = metrics_registry.counter(
+            "app_store_search_index.updates", "Apps updated in the search index in place"
+        )
+        metrics_registry.gauge("app_store_search_index.size", "Apps in the search index", fn=self._size)
+
+    def _size(self) -> int:
+        return len(self._index) if self._index is not None else 0
+
+    def _get_db_fingerprint(self) -> Tuple[int, Optional[str]]:
+        from django.db.models import Count, Max
+
+        from llmstack.app_store.models import AppStoreApp
+
+        result = AppStoreApp.objects.aggregate(count=Count("uuid"), updated_at=Max("updated_at"))
+        return result["count"], result["updated_at"].isoformat() if result["updated_at"] else None
+
+    def _get_search_vectors(self, updated_after: Optional[str] = None):
+        from llmstack.app_store.models import AppStoreApp
+
+        queryset = AppStoreApp.objects.all()
+        if updated_after:
+            queryset = queryset.filter(updated_at__gt=updated_after)
+        return [(str(uuid), vector) for uuid, vector in queryset.values_list("uuid", "search_vector").iterator()]
+
+    def _build(self, fingerprint) -> None:
+        items = self._get_search_vectors()
+        dimension = next((len(vector) for _, vector in items if vector), 0)
+        self._index = VectorIndex(dimension) if dimension else None
+        if self._index is not None:
+            self._index.upsert(items)
+        self._fingerprint = fingerprint
+        self._builds.inc()
+        self._save()
+
+    def _save(self) -> None:
+        if not self.path or self._index is None:
+            return
+        try:
+            self._index.save(self.path, {"fingerprint": self._fingerprint})
+        except Exception as e:
+            logger.warning(f"Error saving app store search index: {e}")
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            self._index, metadata = VectorIndex.load(self.path)
+        except Exception as e:
+            logger.warning(f"Error loading app store search index: {e}")
+            self._index, metadata = None, {}
+
+        if self._index is not None:
+            self._fingerprint = tuple(metadata["fingerprint"])
+            self._loads.inc()
+
+    def _refresh(self) -> None:
+        fingerprint = self._get_db_fingerprint()
+        self._checked_at = time.monotonic()
+        if self._index is not None and fingerprint == self._fingerprint:
+            return
+
+        if self._index is None or self._fingerprint is None:
+            self._build(fingerprint)
+            return
+
+        # Load the apps that changed since the index was last updated. Apps were deleted if the counts still
+        # differ, which needs a full build
+        items = self._get_search_vectors(updated_after=self._fingerprint[1])
+        self._index.upsert(items)
+        self._updates.inc(len(items))
+        if len(self._index) != fingerprint[0]:
+            self._build(fingerprint)
+            return
+
+        self._fingerprint = fingerprint
+        self._save()
+
+    def _ensure_ready(self) -> None:
+        if self._index is None and self._fingerprint is None:
+            self._load()
+            self._refresh()
+        elif time.monotonic() - self._checked_at >= self.refresh_interval:
+            self._refresh()
+
+    def update(self, app) -> None:
+        """
+        Updates the search vector of an app that was created or changed in this process
+        """
+        with self._lock:
+            if self._index is None and self._fingerprint is None:
+                return
+
+            if self._index is not None:
+                self._index.upsert([(str(app.uuid), app.search_vector)])
+                self._updates.inc()
+
+            # Picks up changes made by other processes since the last refresh and saves the index
+            self._refresh()
+
+    def search(self, vector: Sequence[float], top_k: int) -> List[Tuple[str, float]]:
+        """
+        Returns the UUIDs of the top_k apps closest to vector and their distances
+        """
+        with self._lock:
+            self._ensure_ready()
+            if self._index is None or len(vector) != self._index.dimension:
+                return []
+            return self._index.search(vector, top_k)
+
+
+_app_store_search_index = None
+_app_store_search_index_lock = threading.Lock()
+
+
+def get_app_store_search_index() -> AppStoreSearchIndex:
+    global _app_store_search_index
+
+    if _app_store_search_index is None:
+        with _app_store_search_index_lock:
+            if _app_store_search_index is None:
+                _app_store_search_index = AppStoreSearchIndex(
+                    path=get_app_store_search_index_path(),
+                    refresh_interval=getattr(settings, "APP_STORE_SEARCH_INDEX_REFRESH_INTERVAL", 60),
+                )
+    return _app_store_search_index
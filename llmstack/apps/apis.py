@@ -30,6 +30,7 @@ from llmstack.apps.integration_configs import (
     TwilioIntegrationConfig,
     WebIntegrationConfig,
 )
+from llmstack.apps.runner.app_coordinator_pool import get_pool_key
 from llmstack.apps.runner.app_runner import (
     APIAppRunnerSource,
     AppRunner,
@@ -48,6 +49,7 @@ from llmstack.common.utils import prequests
 from llmstack.emails.sender import EmailSender
 from llmstack.emails.templates.factory import EmailTemplateFactory
 from llmstack.jobs.adhoc import ProcessingJob
+from llmstack.processors.providers.output_cache import is_cache_bypass_requested
 from llmstack.processors.providers.processors import ProcessorFactory
 
 from .models import App, AppData, AppSessionFiles, AppType, AppVisibility
@@ -757,6 +759,11 @@ class AppViewSet(viewsets.ViewSet):
             source=source,
             vendor_env=vendor_env,
             file_uploader=upload_file_fn,
+            pool_key=(
+                get_pool_key(app.uuid, app_data_obj.id, source.type, vendor_env)
+                if not preview and not app_data_config_override
+                else None
+            ),
         )
 
     def get_app_runner(self, session_id, app_uuid, source, request_user, preview=False, app_data=None):
@@ -819,6 +826,7 @@ class AppViewSet(viewsets.ViewSet):
                 request_content_type=request.headers.get("Content-Type", ""),
                 app_uuid=uid,
                 request_user_email=request.user.email,
+                cache_bypass=is_cache_bypass_requested(request.headers),
                 request_user=request.user,
             ),
             app_data_obj.data,
@@ -897,6 +905,7 @@ class APIViewSet(viewsets.ViewSet):
         app_run_response = app_runner.run_until_complete(
             AppRunnerRequest(client_request_id=str(uuid.uuid4()), session_id=session_id, input=input_data), loop
         )
+        async_to_sync(app_runner.stop)()
         return DRFResponse(data=app_run_response.data.model_dump(), status=200)
 
     def run(self, request, uid):
@@ -932,6 +941,7 @@ class APIViewSet(viewsets.ViewSet):
                 request_content_type=request.headers.get("Content-Type", ""),
                 app_uuid=uid,
                 request_user_email=request.user.email,
+                cache_bypass=is_cache_bypass_requested(request.headers),
             ),
             app_data_obj.data,
             session_id,
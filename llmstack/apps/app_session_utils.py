@@ -1,44 +1,189 @@
 import logging
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 
 import orjson as json
 from django.conf import settings
-from django.core.cache import caches
 
 logger = logging.getLogger(__name__)
 
+# Each processor's session data is stored in its own field so that reads and writes don't
+# have to load and rewrite the whole session
+DATA_FIELD_PREFIX = "data:"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
 
-def create_app_session(app_session_id=None):
-    app_session_store = caches["app_session"]
-    app_session_id = app_session_id or str(uuid.uuid4())
 
-    current_time = datetime.now(timezone.utc).isoformat()
-    app_session = {
-        "id": app_session_id,
-        "data": {},
-        "created_at": current_time,
-        "last_updated_at": current_time,
+def _session_from_fields(app_session_id, fields):
+    if not fields:
+        return None
+
+    return {
+        "id": fields.get("id", app_session_id),
+        "data": {
+            field[len(DATA_FIELD_PREFIX) :]: json.loads(value)
+            for field, value in fields.items()
+            if field.startswith(DATA_FIELD_PREFIX)
+        },
+        "created_at": fields.get("created_at"),
+        "last_updated_at": fields.get("last_updated_at"),
     }
 
-    app_session_store.set(
-        f"app_session_{app_session['id']}",
-        json.dumps(app_session),
-        settings.APP_SESSION_TIMEOUT,
-    )
 
-    return app_session
+class RedisAppSessionStore:
+    """
+    Stores each app session as a redis hash with one field per session data key
+    """
+
+    def __init__(self, timeout):
+        from django_redis import get_redis_connection
+
+        self._client = get_redis_connection("app_session_store")
+        self._timeout = timeout
+
+    @staticmethod
+    def _key(app_session_id):
+        return f"app_session:{app_session_id}"
+
+    def create(self, app_session_id):
+        current_time = _now()
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.hset(
+            self._key(app_session_id),
+            mapping={"id": app_session_id, "created_at": current_time, "last_updated_at": current_time},
+        )
+        pipeline.expire(self._key(app_session_id), self._timeout)
+        pipeline.execute()
+
+    def get(self, app_session_id):
+        fields = self._client.hgetall(self._key(app_session_id))
+        return _session_from_fields(app_session_id, {field.decode(): value.decode() for field, value in fields.items()})
+
+    def get_data(self, app_session_id, keys):
+        values = self._client.hmget(self._key(app_session_id), [f"{DATA_FIELD_PREFIX}{key}" for key in keys])
+        return {key: json.loads(value) if value is not None else None for key, value in zip(keys, values)}
+
+    def set_data(self, app_session_id, key, value):
+        key_name = self._key(app_session_id)
+        current_time = _now()
+
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.hsetnx(key_name, "id", app_session_id)
+        pipeline.hsetnx(key_name, "created_at", current_time)
+        pipeline.hset(
+            key_name,
+            mapping={f"{DATA_FIELD_PREFIX}{key}": json.dumps(value), "last_updated_at": current_time},
+        )
+        pipeline.expire(key_name, self._timeout)
+        pipeline.execute()
+
+    def touch(self, app_session_id):
+        return bool(self._client.expire(self._key(app_session_id), self._timeout))
+
+    def delete(self, app_session_id):
+        self._client.delete(self._key(app_session_id))
+
+
+class LocalMemoryAppSessionStore:
+    """
+    Process local session store with the same semantics as RedisAppSessionStore, used for tests
+    and deployments without redis
+    """
+
+    def __init__(self, timeout):
+        self._timeout = timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _get_fields(self, app_session_id):
+        entry = self._sessions.get(app_session_id)
+        if entry is None:
+            return None
+
+        expires_at, fields = entry
+        if expires_at < time.monotonic():
+            del self._sessions[app_session_id]
+            return None
+        return fields
+
+    def create(self, app_session_id):
+        current_time = _now()
+        with self._lock:
+            self._sessions[app_session_id] = (
+                time.monotonic() + self._timeout,
+                {"id": app_session_id, "created_at": current_time, "last_updated_at": current_time},
+            )
+
+    def get(self, app_session_id):
+        with self._lock:
+            fields = dict(self._get_fields(app_session_id) or {})
+        return _session_from_fields(app_session_id, fields)
+
+    def get_data(self, app_session_id, keys):
+        with self._lock:
+            fields = self._get_fields(app_session_id) or {}
+            values = [fields.get(f"{DATA_FIELD_PREFIX}{key}") for key in keys]
+        return {key: json.loads(value) if value is not None else None for key, value in zip(keys, values)}
+
+    def set_data(self, app_session_id, key, value):
+        current_time = _now()
+        serialized_value = json.dumps(value)
+        with self._lock:
+            fields = self._get_fields(app_session_id)
+            if fields is None:
+                fields = {"id": app_session_id, "created_at": current_time}
+            fields[f"{DATA_FIELD_PREFIX}{key}"] = serialized_value
+            fields["last_updated_at"] = current_time
+            self._sessions[app_session_id] = (time.monotonic() + self._timeout, fields)
+
+    def touch(self, app_session_id):
+        with self._lock:
+            fields = self._get_fields(app_session_id)
+            if fields is None:
+                return False
+            self._sessions[app_session_id] = (time.monotonic() + self._timeout, fields)
+            return True
+
+    def delete(self, app_session_id):
+        with self._lock:
+            self._sessions.pop(app_session_id, None)
+
+
+_app_session_store = None
+_app_session_store_lock = threading.Lock()
+
+
+def get_app_session_store():
+    global _app_session_store
+
+    if _app_session_store is None:
+        with _app_session_store_lock:
+            if _app_session_store is None:
+                store_cls = (
+                    LocalMemoryAppSessionStore
+                    if getattr(settings, "APP_SESSION_STORE", "redis") == "locmem"
+                    else RedisAppSessionStore
+                )
+                _app_session_store = store_cls(settings.APP_SESSION_TIMEOUT)
+    return _app_session_store
+
+
+def create_app_session(app_session_id=None):
+    app_session_id = app_session_id or str(uuid.uuid4())
+    get_app_session_store().create(app_session_id)
+
+    return get_app_session(app_session_id)
 
 
 def get_app_session(app_session_id):
     if not app_session_id:
         return None
 
-    app_session = caches["app_session"].get(f"app_session_{app_session_id}")
-    if app_session is None:
-        return None
-
-    return json.loads(app_session)
+    return get_app_session_store().get(app_session_id)
 
 
 def get_or_create_app_session(app_session_id=None):
@@ -50,23 +195,36 @@ def get_or_create_app_session(app_session_id=None):
 
 
 def save_app_session_data(app_session_id, key, value):
-    app_session = get_or_create_app_session(app_session_id)
-
-    app_session["data"][key] = value
-    app_session["last_updated_at"] = datetime.now(timezone.utc).isoformat()
+    # Writes only this key and refreshes the session's TTL, without reading the rest of the session
+    if not app_session_id:
+        return
 
-    caches["app_session"].set(
-        f"app_session_{app_session['id']}",
-        json.dumps(app_session),
-        settings.APP_SESSION_TIMEOUT,
-    )
+    get_app_session_store().set_data(app_session_id, key, value)
 
 
 def get_app_session_data(app_session_id, key):
-    app_session = get_app_session(app_session_id)
+    if not app_session_id:
+        return None
+
+    return get_app_session_store().get_data(app_session_id, [key])[key]
+
+
+def get_app_session_data_many(app_session_id, keys):
+    """
+    Returns a dict of session data for the given keys. Missing keys map to None
+    """
+    if not app_session_id:
+        return {key: None for key in keys}
+
+    return get_app_session_store().get_data(app_session_id, keys)
+
 
-    return app_session["data"].get(key, None) if app_session else None
+def touch_app_session(app_session_id):
+    """
+    Refreshes the session's TTL without rewriting it. Returns False if the session doesn't exist
+    """
+    return get_app_session_store().touch(app_session_id)
 
 
 def delete_app_session(app_session_id):
-    caches["app_session"].delete(f"app_session_{app_session_id}")
+    get_app_session_store().delete(app_session_id)
@@ -18,6 +18,7 @@ from llmstack.apps.runner.agent_controller import (
 from llmstack.apps.runner.output_actor import OutputActor
 from llmstack.common.utils.liquid import render_template
 from llmstack.play.actor import BookKeepingData
+from llmstack.play.bookkeeping import BookkeepingCollector
 from llmstack.play.messages import ContentData, Error, Message, MessageType
 from llmstack.play.output_stream import stitch_model_objects
 from llmstack.play.utils import run_coro_in_new_loop
@@ -38,7 +39,7 @@ class AgentActor(OutputActor):
         metadata: Dict[str, Any] = {},
         provider_configs: Dict[str, Any] = {},
         tools: List[Dict] = [],
-        bookkeeping_queue: asyncio.Queue = None,
+        bookkeeping_queue: BookkeepingCollector = None,
     ):
         self._process_output_task = None
         self._config = agent_config
@@ -214,6 +215,7 @@ class AgentActor(OutputActor):
                 elif controller_output.type == AgentControllerDataType.ERROR:
                     # Treat this as an agent output end
                     self._errors = [Error(message=controller_output.data.content[0].data)]
+                    self._content_queue.notify()
                 elif controller_output.type == AgentControllerDataType.INPUT_STREAM:
                     # Input has started streaming. We need to let the client know so they can interrupt audio playback
                     self._content_queue.put_nowait(
@@ -17,7 +17,7 @@ from llmstack.apps.types.agent import AgentConfigSchema
 from llmstack.apps.types.voice_agent import VoiceAgentConfigSchema
 from llmstack.common.blocks.base.schema import StrEnum
 from llmstack.common.utils.liquid import render_template
-from llmstack.common.utils.provider_config import get_matched_provider_config
+from llmstack.common.utils.provider_config import get_provider_config_resolver
 from llmstack.common.utils.sslr.types.chat.chat_completion import ChatCompletion
 from llmstack.common.utils.sslr.types.chat.chat_completion_chunk import (
     ChatCompletionChunk,
@@ -164,6 +164,7 @@ class AgentController:
         self._system_message = render_template(config.agent_config.system_message, {})
         self._output_queue = output_queue
         self._config = config
+        self._provider_config_resolver = get_provider_config_resolver(config.provider_configs)
         self._messages: List[AgentMessage] = (
             load_messages_from_session_data(self._session_id, self._controller_id) or []
         )
@@ -221,8 +222,7 @@ class AgentController:
         from llmstack.apps.models import AppSessionFiles
         from llmstack.assets.stream import AssetStream
 
-        self._provider_config = get_matched_provider_config(
-            provider_configs=self._config.provider_configs,
+        self._provider_config = self._provider_config_resolver.resolve(
             provider_slug=self._config.agent_config.backend.provider,
             model_slug=self._config.agent_config.backend.model,
         )
@@ -270,8 +270,7 @@ class AgentController:
         await self._send_websocket_message({"type": "response.create"})
 
     def _init_llm_client(self):
-        self._provider_config = get_matched_provider_config(
-            provider_configs=self._config.provider_configs,
+        self._provider_config = self._provider_config_resolver.resolve(
             provider_slug=self._config.agent_config.provider,
             model_slug=self._config.agent_config.model,
         )
@@ -279,8 +278,7 @@ class AgentController:
         self._llm_client = get_llm_client_from_provider_config(
             self._config.agent_config.provider,
             self._config.agent_config.model,
-            lambda provider_slug, model_slug: get_matched_provider_config(
-                provider_configs=self._config.provider_configs,
+            lambda provider_slug, model_slug: self._provider_config_resolver.resolve(
                 provider_slug=provider_slug,
                 model_slug=model_slug,
             ),
@@ -1,20 +1,22 @@
-import asyncio
 import logging
 from typing import Any, Dict, List, Set
 
-from pykka import ThreadingActor
-
 from llmstack.apps.runner.agent_actor import AgentActor
 from llmstack.apps.runner.input_actor import InputActor
 from llmstack.apps.runner.output_actor import OutputActor
 from llmstack.play.actor import ActorConfig
+from llmstack.play.bookkeeping import BookkeepingCollector
 from llmstack.play.messages import ContentData
 from llmstack.play.output_stream import Message, MessageType
+from llmstack.play.runtime import ActorBase
 
 logger = logging.getLogger(__name__)
 
 
-class AppCoordinator(ThreadingActor):
+class AppCoordinator(ActorBase):
+    # Coordinators only relay messages between actors
+    blocking = False
+
     def __init__(
         self,
         actor_configs: List[ActorConfig],
@@ -24,7 +26,7 @@ class AppCoordinator(ThreadingActor):
         env: Dict[str, Any] = {},
         config: Dict[str, Any] = {},
         spread_output_for_keys: Set[str] = set(),
-        bookkeeping_queue: asyncio.Queue = None,
+        bookkeeping_queue: BookkeepingCollector = None,
         metadata: Dict[str, Any] = {},
     ):
         super().__init__()
@@ -139,23 +141,47 @@ class AppCoordinator(ThreadingActor):
 
         self.tell_actor("_inputs0", message)
 
-        # Also start actors that have no dependencies and send a BEGIN message when not an agent
+        # Also start actors that have no dependencies and send a BEGIN message when not an agent.
+        # Actors already started by a previous run are reused after reset
         if not self._is_agent and not self._is_voice_agent:
             for actor_config in self._actor_configs_map.values():
                 if not self._actor_dependencies[actor_config.name]:
                     actor_id = actor_config.name
-                    self.actors[actor_id] = actor_config.actor.start(
-                        id=actor_id,
-                        coordinator_urn=self.actor_urn,
-                        dependencies=actor_config.dependencies,
-                        bookkeeping_queue=self._bookkeeping_queue,
-                        **actor_config.kwargs,
-                    )
+                    if actor_id not in self.actors or not self.actors[actor_id].is_alive():
+                        self.actors[actor_id] = actor_config.actor.start(
+                            id=actor_id,
+                            coordinator_urn=self.actor_urn,
+                            dependencies=actor_config.dependencies,
+                            bookkeeping_queue=self._bookkeeping_queue,
+                            **actor_config.kwargs,
+                        )
                     self.tell_actor(
                         actor_id,
                         Message(id=request_id, type=MessageType.BEGIN, sender="coordinator", receiver=actor_id),
                     )
 
+    def rebind(self, session_id: str, request_user: Any = None, output_cache: Dict[str, Any] = None):
+        """
+        Rebinds a pooled actor graph to a new session before it is reused
+        """
+        for actor_config in self._actor_configs_map.values():
+            actor_config.kwargs["session_id"] = session_id
+            actor_config.kwargs["request_user"] = request_user
+            actor_config.kwargs["output_cache"] = output_cache
+
+        for actor_id in list(self.actors.keys()):
+            if actor_id in ["_inputs0", "output"]:
+                continue
+
+            # Actors created for individual tool calls are not reused
+            if "/" in actor_id or not self.actors[actor_id].is_alive():
+                self.actors.pop(actor_id).stop(block=False)
+                continue
+
+            self.actors[actor_id].proxy().rebind(
+                session_id=session_id, request_user=request_user, output_cache=output_cache
+            ).get()
+
     async def output(self):
         return await self.actors["output"].proxy().get_output()
 
@@ -0,0 +1,177 @@
+"""
+Pool of warm AppCoordinator actor graphs.
+
+Building an AppCoordinator starts an input actor, an output actor and a thread per processor. For apps
+that are run often, idle graphs are kept in a pool keyed by app and published version, and rebound to
+the next request's session instead of being torn down.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+import orjson as json
+from django.conf import settings
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+from llmstack.play.bookkeeping import BookkeepingCollector
+
+logger = logging.getLogger(__name__)
+
+
+class PooledActorGraph(NamedTuple):
+    """
+    A started coordinator along with the bookkeeping collector its actors write to
+    """
+
+    coordinator: Any
+    bookkeeping_collector: BookkeepingCollector
+
+
+def get_pool_key(app_uuid: str, app_data_version: Any, source_type: str, vendor_env: Dict) -> Tuple:
+    """
+    Pool key for an app version. Includes a fingerprint of the vendor env so that graphs are not
+    reused after the owner's provider configs or connections change
+    """
+    env_fingerprint = hashlib.sha256(
+        json.dumps(vendor_env, option=json.OPT_SORT_KEYS, default=str),
+    ).hexdigest()
+    return (str(app_uuid), str(app_data_version), str(source_type), env_fingerprint)
+
+
+class AppCoordinatorPool:
+    def __init__(self, max_idle_per_key: int = 4, max_size: int = 256, max_idle_seconds: int = 300):
+        self._max_idle_per_key = max_idle_per_key
+        self._max_size = max_size
+        self._max_idle_seconds = max_idle_seconds
+
+        # Map of pool key to deque of (last used time, PooledActorGraph)
+        self._idle = defaultdict(deque)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+        self._hits = metrics_registry.counter("app_coordinator_pool.hits", "Runs served by a pooled actor graph")
+        self._misses = metrics_registry.counter("app_coordinator_pool.misses", "Runs that built a new actor graph")
+        self._evictions = metrics_registry.counter(
+            "app_coordinator_pool.evictions", "Idle actor graphs stopped by the pool"
+        )
+        metrics_registry.gauge("app_coordinator_pool.idle", "Idle actor graphs in the pool", fn=lambda: self._size)
+        metrics_registry.gauge("app_coordinator_pool.keys", "App versions with idle actor graphs", fn=self._num_keys)
+
+    def _num_keys(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, key: Tuple, factory: Callable[[], PooledActorGraph]) -> PooledActorGraph:
+        """
+        Returns an idle actor graph for key or builds a new one with factory
+        """
+        self._evict_expired()
+
+        graph = None
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle and graph is None:
+                _, candidate = idle.pop()
+                self._size -= 1
+                if candidate.coordinator.actor_ref.is_alive():
+                    graph = candidate
+            if idle is not None and not idle:
+                del self._idle[key]
+
+        if graph:
+            self._hits.inc()
+            return graph
+
+        self._misses.inc()
+        return factory()
+
+    def release(self, key: Tuple, graph: PooledActorGraph) -> None:
+        """
+        Returns a graph to the pool. Graphs beyond the pool limits are stopped
+        """
+        evicted = None
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) >= self._max_idle_per_key or self._size >= self._max_size:
+                evicted = graph
+            else:
+                idle.append((time.monotonic(), graph))
+                self._size += 1
+
+        if evicted:
+            self._stop(evicted)
+
+        self._start_sweeper()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for key in list(self._idle.keys()):
+                idle = self._idle[key]
+                while idle and now - idle[0][0] > self._max_idle_seconds:
+                    expired.append(idle.popleft()[1])
+                    self._size -= 1
+                if not idle:
+                    del self._idle[key]
+
+        for graph in expired:
+            self._stop(graph)
+
+    def _stop(self, graph: PooledActorGraph) -> None:
+        self._evictions.inc()
+        try:
+            graph.coordinator.actor_ref.stop(block=False)
+        except Exception as e:
+            logger.error(f"Error stopping pooled actor graph: {e}")
+
+    def _sweep(self) -> None:
+        while True:
+            time.sleep(max(self._max_idle_seconds / 4, 1))
+            self._evict_expired()
+
+    def _start_sweeper(self) -> None:
+        if self._sweeper:
+            return
+
+        with self._lock:
+            if not self._sweeper:
+                self._sweeper = threading.Thread(target=self._sweep, daemon=True)
+                self._sweeper.start()
+
+    def clear(self) -> None:
+        with self._lock:
+            graphs = [graph for idle in self._idle.values() for _, graph in idle]
+            self._idle.clear()
+            self._size = 0
+
+        for graph in graphs:
+            self._stop(graph)
+
+
+_pool: Optional[AppCoordinatorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_app_coordinator_pool() -> Optional[AppCoordinatorPool]:
+    """
+    Returns the process wide pool or None if pooling is disabled
+    """
+    global _pool
+
+    if not getattr(settings, "APP_RUNNER_POOL_ENABLED", False):
+        return None
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AppCoordinatorPool(
+                    max_idle_per_key=settings.APP_RUNNER_POOL_MAX_IDLE_PER_KEY,
+                    max_size=settings.APP_RUNNER_POOL_MAX_SIZE,
+                    max_idle_seconds=settings.APP_RUNNER_POOL_MAX_IDLE_SECONDS,
+                )
+    return _pool
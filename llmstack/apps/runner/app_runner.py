@@ -1,22 +1,33 @@
-import asyncio
 import logging
-import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Union
 
 from asgiref.sync import sync_to_async
+from django.db import close_old_connections
 from pydantic import BaseModel
 
 from llmstack.apps.runner.app_coordinator import AppCoordinator
+from llmstack.apps.runner.app_coordinator_pool import (
+    PooledActorGraph,
+    get_app_coordinator_pool,
+)
 from llmstack.common.blocks.base.schema import StrEnum
 from llmstack.events.apis import EventsViewSet
 from llmstack.play.actor import ActorConfig
+from llmstack.play.bookkeeping import BookkeepingCollector, BookkeepingRun
 from llmstack.play.utils import extract_variables_from_liquid_template
+from llmstack.processors.providers.output_cache import get_output_cache_options
 from llmstack.processors.providers.processors import ProcessorFactory
 
 logger = logging.getLogger(__name__)
 
+# Maximum time to wait for all actors in a run to report bookkeeping data
+BOOKKEEPING_TIMEOUT = 5
+
+_bookkeeping_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bookkeeping")
+
 
 def iter_over_async(ait, loop):
     ait = ait.__aiter__()
@@ -57,6 +68,7 @@ class AppRunnerSource(BaseModel):
     type: AppRunnerSourceType
     request_user_email: Optional[str] = None
     request_user: Optional[Any] = None
+    cache_bypass: bool = False  # Skip cached processor outputs for this run
 
     @property
     def id(self):
@@ -362,6 +374,7 @@ class AppRunner:
                         "output_template": (
                             processor.get("output_template", {"markdown": ""}) if is_agent_or_voice_agent else None
                         ),
+                        "output_cache": self._output_cache,
                     },
                     dependencies=self._compute_dependencies_from_processor(processor, allowed_processor_variables),
                     tool_schema=(
@@ -380,26 +393,32 @@ class AppRunner:
             )
         return actor_configs
 
-    def _get_bookkeeping_data(self):
+    def _persist_bookkeeping_data(self, bookkeeping_run: BookkeepingRun, request_id: str):
         """
-        Return a dictionary of bookkeeping data from the queue
+        Waits for all actors in the run to report their bookkeeping data and hands it to the source
         """
-        bookkeeping_data = {}
-        start_time = time.time()
-        while (not self._bookkeeping_queue.empty() or any([data is None for data in bookkeeping_data.values()])) and (
-            time.time() - start_time < 5
-        ):
-            if self._bookkeeping_queue.empty():
-                continue
-
-            actor_id, data = self._bookkeeping_queue.get_nowait()
-
-            if actor_id not in bookkeeping_data or data is not None:
-                bookkeeping_data[actor_id] = data
-
-            self._bookkeeping_queue.task_done()
-
-        return bookkeeping_data
+        try:
+            bookkeeping_data = bookkeeping_run.wait(timeout=BOOKKEEPING_TIMEOUT)
+            if bookkeeping_data:
+                self._source.effects(request_id, self._session_id, bookkeeping_data.get("output", {}), bookkeeping_data)
+        except Exception as e:
+            logger.exception(f"Error persisting bookkeeping data: {e}")
+        finally:
+            close_old_connections()
+
+    def _hand_off_bookkeeping_data(self, bookkeeping_run: BookkeepingRun):
+        """
+        Persists the run's bookkeeping data in the background so the response stream is not blocked
+        """
+        if bookkeeping_run.handed_off or bookkeeping_run.is_empty():
+            return
+
+        bookkeeping_run.handed_off = True
+        _bookkeeping_executor.submit(
+            self._persist_bookkeeping_data,
+            bookkeeping_run,
+            getattr(self, "_request_id", None),
+        )
 
     def __init__(
         self,
@@ -408,6 +427,7 @@ class AppRunner:
         source: AppRunnerSource = None,
         vendor_env: Dict = {},
         file_uploader: Optional[Callable] = None,
+        pool_key: Optional[tuple] = None,
     ):
         self._session_id = session_id or str(uuid.uuid4())
         self._app_data = app_data
@@ -416,46 +436,70 @@ class AppRunner:
         self._is_agent = app_data.get("type_slug") == "agent"
         self._is_voice_agent = app_data.get("type_slug") == "voice-agent"
         self._file_uploader = file_uploader
-        self._bookkeeping_queue = asyncio.Queue()
+        self._vendor_env = vendor_env
 
+        output_cache_options = get_output_cache_options(self._app_config, source.type, bypass=source.cache_bypass)
+        self._output_cache = output_cache_options.model_dump() if output_cache_options else None
+
+        # Agents keep per conversation state in their controllers and are not pooled
+        self._pool = get_app_coordinator_pool() if pool_key and not (self._is_agent or self._is_voice_agent) else None
+        self._pool_key = pool_key
+        self._pool_reusable = True
+
+        if self._pool:
+            graph = self._pool.acquire(self._pool_key, self._build_actor_graph)
+            graph.coordinator.rebind(self._session_id, self._source.request_user, self._output_cache).get()
+        else:
+            graph = self._build_actor_graph()
+
+        self._coordinator = graph.coordinator
+        self._bookkeeping_collector = graph.bookkeeping_collector
+
+    def _build_actor_graph(self) -> PooledActorGraph:
+        bookkeeping_collector = BookkeepingCollector()
         actor_configs = self._get_actor_configs_from_processors(
-            app_data.get("processors", []), self._session_id, (self._is_agent or self._is_voice_agent), vendor_env
+            self._app_data.get("processors", []),
+            self._session_id,
+            (self._is_agent or self._is_voice_agent),
+            self._vendor_env,
         )
-        output_template = app_data.get("output_template", {}).get("markdown", "")
+        output_template = self._app_data.get("output_template", {}).get("markdown", "")
 
-        self._coordinator = AppCoordinator.start(
+        coordinator = AppCoordinator.start(
             actor_configs=actor_configs,
             output_template=output_template,
             is_agent=self._is_agent,
             is_voice_agent=self._is_voice_agent,
-            env=vendor_env,
+            env=self._vendor_env,
             config=self._app_config,
-            bookkeeping_queue=self._bookkeeping_queue,
+            bookkeeping_queue=bookkeeping_collector,
             metadata={
                 "app_uuid": self._source.id,
                 "username": self._source.request_user_email,
                 "session_id": self._session_id,
             },
-            spread_output_for_keys=app_data.get("spread_output_for_keys", set()),
+            spread_output_for_keys=self._app_data.get("spread_output_for_keys", set()),
         ).proxy()
 
-    async def stop(self):
-        await self._coordinator.stop()
+        return PooledActorGraph(coordinator=coordinator, bookkeeping_collector=bookkeeping_collector)
 
-        # Check if there is any pending bookkeeping data
-        bookkeeping_data = self._get_bookkeeping_data()
-        if bookkeeping_data:
-            self._source.effects(
-                self._request_id, self._session_id, bookkeeping_data.get("output", {}), bookkeeping_data
+    async def stop(self):
+        if self._pool and self._pool_reusable:
+            self._pool.release(
+                self._pool_key,
+                PooledActorGraph(coordinator=self._coordinator, bookkeeping_collector=self._bookkeeping_collector),
             )
+        else:
+            await self._coordinator.stop()
+
+        # Persist any pending bookkeeping data
+        self._hand_off_bookkeeping_data(self._bookkeeping_collector.current_run)
 
     async def run(self, request: AppRunnerRequest):
         self._request_id = str(uuid.uuid4())
 
-        # Clear the bookkeeping queue
-        while not self._bookkeeping_queue.empty():
-            self._bookkeeping_queue.get_nowait()
-            self._bookkeeping_queue.task_done()
+        # Start collecting bookkeeping data for this run
+        self._bookkeeping_collector.new_run()
 
         # Pre-process run input to convert files to objrefs
         input_data = request.input
@@ -483,6 +527,8 @@ class AppRunner:
                     }
                     break
 
+        # Only return the actor graph to the pool if the run completes
+        self._pool_reusable = False
         self._coordinator.input(self._request_id, input_data)
 
         yield AppRunnerStreamingResponse(
@@ -495,8 +541,6 @@ class AppRunner:
                 # Received all chunks
                 break
 
-            await asyncio.sleep(0.0001)
-
             if "errors" in output:
                 yield AppRunnerStreamingResponse(
                     id=self._request_id,
@@ -524,11 +568,10 @@ class AppRunner:
 
         # Send the final output
         if "chunks" in output:
+            self._pool_reusable = True
+
             # Persist bookkeeping data
-            bookkeeping_data = self._get_bookkeeping_data()
-            self._source.effects(
-                self._request_id, self._session_id, bookkeeping_data.get("output", {}), bookkeeping_data
-            )
+            self._hand_off_bookkeeping_data(self._bookkeeping_collector.current_run)
 
             # Send the final output
             yield AppRunnerStreamingResponse(
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import time
 from typing import Any, NamedTuple
@@ -6,6 +5,7 @@ from typing import Any, NamedTuple
 from asgiref.sync import async_to_sync
 
 from llmstack.play.actor import Actor, BookKeepingData
+from llmstack.play.bookkeeping import BookkeepingCollector
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +31,12 @@ class InputRequest(NamedTuple):
 
 
 class InputActor(Actor):
+    blocking = False
+
     def __init__(
         self,
         coordinator_urn: str,
-        bookkeeping_queue: asyncio.Queue = None,
+        bookkeeping_queue: BookkeepingCollector = None,
     ):
         super().__init__(
             id="_inputs0",
@@ -1,17 +1,33 @@
 import asyncio
 import logging
+import time
 from typing import Any, Dict, List, NamedTuple, Set
 
 from pydantic import BaseModel
 
-from llmstack.common.utils.liquid import render_template
+from llmstack.common.utils.liquid import get_template
+from llmstack.common.utils.metrics import registry as metrics_registry
 from llmstack.play.actor import Actor, BookKeepingData
+from llmstack.play.bookkeeping import BookkeepingCollector
 from llmstack.play.messages import Error, Message, MessageType
 from llmstack.play.output_stream import stitch_model_objects
-from llmstack.play.utils import DiffMatchPatch
+from llmstack.play.utils import (
+    DiffMatchPatch,
+    SegmentedTemplateRenderer,
+    ThreadSafeAsyncQueue,
+)
 
 logger = logging.getLogger(__name__)
 
+time_to_first_chunk_histogram = metrics_registry.histogram(
+    "output_actor.time_to_first_chunk_seconds",
+    "Time from the start of a run to the first output chunk being handed to the consumer",
+)
+chunk_latency_histogram = metrics_registry.histogram(
+    "output_actor.chunk_latency_seconds",
+    "Time an output chunk waits between the actor thread and the consumer",
+)
+
 SENTINEL = object()
 
 
@@ -27,13 +43,15 @@ class OutputResponse(NamedTuple):
 
 
 class OutputActor(Actor):
+    blocking = False
+
     def __init__(
         self,
         coordinator_urn,
         dependencies: list = [],
         templates: Dict[str, str] = {},
         spread_output_for_keys: Set[str] = set(),
-        bookkeeping_queue: asyncio.Queue = None,
+        bookkeeping_queue: BookkeepingCollector = None,
     ):
         super().__init__(
             id="output",
@@ -42,10 +60,25 @@ class OutputActor(Actor):
             bookkeeping_queue=bookkeeping_queue,
         )
         self._templates = templates
-        self.reset()
         self._dmp = DiffMatchPatch()
         self._spread_output_for_keys = spread_output_for_keys
 
+        # Compile the output template once. Templates that can be split into segments are rendered
+        # incrementally, others are re-rendered and diffed in full on every chunk
+        self._output_renderer = None
+        self._output_template = None
+        if "output" in self._templates:
+            try:
+                self._output_renderer = SegmentedTemplateRenderer(self._templates["output"], self._dmp)
+            except Exception as e:
+                logger.debug(f"Output template cannot be rendered incrementally: {e}")
+                try:
+                    self._output_template = get_template(self._templates["output"])
+                except Exception as e:
+                    logger.error(f"Error compiling output template: {e}")
+
+        self.reset()
+
     def on_receive(self, message: Message) -> Any:
         if message.type == MessageType.ERRORS:
             self.on_error(message.sender, message.data.errors)
@@ -53,16 +86,20 @@ class OutputActor(Actor):
 
         if message.type == MessageType.CONTENT_STREAM_CHUNK:
             try:
-                self._stitched_data = stitch_model_objects(
-                    self._stitched_data,
-                    (
-                        {message.sender: message.data.chunk}
-                        if message.sender not in self._spread_output_for_keys
-                        else message.data.chunk
-                    ),
+                chunk = (
+                    {message.sender: message.data.chunk}
+                    if message.sender not in self._spread_output_for_keys
+                    else message.data.chunk
                 )
-                new_int_output = render_template(self._templates["output"], self._stitched_data)
-                delta = self._dmp.to_delta(self._int_output.get("output", ""), new_int_output)
+                self._stitched_data = stitch_model_objects(self._stitched_data, chunk)
+
+                if self._output_renderer:
+                    new_int_output, delta = self._output_renderer.render(
+                        self._stitched_data, set(chunk.keys()) if isinstance(chunk, dict) else None
+                    )
+                else:
+                    new_int_output = self._output_template.render(**self._stitched_data)
+                    delta = self._dmp.to_delta(self._int_output.get("output", ""), new_int_output)
                 self._int_output["output"] = new_int_output
 
                 self._output_stream.bookkeep(BookKeepingData(output=self._int_output))
@@ -92,16 +129,21 @@ class OutputActor(Actor):
                 )
 
     async def get_output(self):
+        first_chunk = True
         try:
             while True:
                 if not self._content_queue.empty():
-                    output = self._content_queue.get_nowait()
+                    queued_at, output = self._content_queue.get_nowait_with_timestamp()
+                    now = time.perf_counter()
+                    chunk_latency_histogram.observe(now - queued_at)
+                    if first_chunk:
+                        time_to_first_chunk_histogram.observe(now - self._run_started_at)
+                        first_chunk = False
                     yield output
-                    self._content_queue.task_done()
                 else:
                     if self._errors or self._stopped:
                         break
-                    await asyncio.sleep(0.01)
+                    await self._content_queue.wait()
 
         except asyncio.CancelledError:
             logger.info("Output stream cancelled")
@@ -113,19 +155,24 @@ class OutputActor(Actor):
 
     def on_stop(self) -> None:
         self._stopped = True
+        self._content_queue.notify()
         return super().on_stop()
 
     def on_error(self, sender, errors: List[Error]) -> None:
         logger.error(f"Error in output actor: {errors}")
         self._errors = errors
+        self._content_queue.notify()
 
     def reset(self) -> None:
         self._stitched_data = {}
         self._int_output = {}
         self._errors = None
         self._stopped = False
-        self._content_queue = asyncio.Queue()
+        self._content_queue = ThreadSafeAsyncQueue()
+        self._run_started_at = time.perf_counter()
         self._messages = {}
+        if getattr(self, "_output_renderer", None):
+            self._output_renderer.reset()
         super().reset()
 
     def get_bookkeeping_data(self):
@@ -93,9 +93,7 @@ class Assets(models.Model):
     def objref(self) -> str:
         return f"objref://{self.category}/{self.uuid}"
 
-    def finalize_streaming_asset(self, file_bytes):
-        from django.core.files.base import ContentFile
-
+    def _get_streaming_asset_file_name(self):
         file_name = self.metadata.get("file_name", str(uuid.uuid4()))
 
         # If the filename doesn't have an extension, add one based on the mime_type
@@ -107,9 +105,28 @@ class Assets(models.Model):
             # Add the extension to the filename
             file_name = f"{file_name}.{extension}"
 
-        self.file.save(file_name, ContentFile(file_bytes))
-        bytes_size = len(file_bytes)
-        self.metadata = {**self.metadata, "file_size": bytes_size}
+        return file_name
+
+    def finalize_streaming_asset(self, file_bytes):
+        from django.core.files.base import ContentFile
+
+        return self.finalize_streaming_asset_from_file(ContentFile(file_bytes), len(file_bytes))
+
+    def finalize_streaming_asset_from_file(self, file, file_size=None):
+        """
+        Saves the contents of a file object as the asset's file. Storage backends read the file in chunks, so
+        the asset is never held in memory as a whole
+        """
+        from django.core.files import File
+
+        if file_size is None:
+            file.seek(0, 2)
+            file_size = file.tell()
+            file.seek(0)
+
+        file_name = self._get_streaming_asset_file_name()
+        self.file.save(file_name, file if isinstance(file, File) else File(file, name=file_name))
+        self.metadata = {**self.metadata, "file_size": file_size}
         self.metadata["streaming"] = False
         self.save()
         return self
@@ -1,12 +1,81 @@
 import asyncio
 import logging
+import tempfile
+import threading
+import time
 
+import redis.asyncio
+from django.conf import settings
 from django_redis import get_redis_connection
 
+from llmstack.common.utils.flusher import DeferredFlusher
+
 logger = logging.getLogger(__name__)
 
 objref_stream_client = get_redis_connection("objref_stream")
 
+# Streams expire 20 minutes after their last write
+STREAM_EXPIRY = 1200
+
+# Small chunks are buffered up to ASSET_STREAM_BATCH_SIZE bytes or ASSET_STREAM_BATCH_WINDOW_MS before they are
+# added to the stream
+ASSET_STREAM_BATCH_SIZE = getattr(settings, "ASSET_STREAM_BATCH_SIZE", 8192)
+ASSET_STREAM_BATCH_WINDOW = getattr(settings, "ASSET_STREAM_BATCH_WINDOW_MS", 20) / 1000
+
+# Number of stream entries fetched per XREAD
+ASSET_STREAM_READ_PAGE_SIZE = getattr(settings, "ASSET_STREAM_READ_PAGE_SIZE", 1000)
+
+# Finalized assets are spooled in memory up to this many bytes and to a temporary file beyond that
+ASSET_STREAM_SPOOL_MAX_SIZE = getattr(settings, "ASSET_STREAM_SPOOL_MAX_SIZE", 10 * 1024 * 1024)
+
+# Connections in the async redis pool used to read streams. Every blocked reader holds a connection, and readers
+# wait for a free connection once the pool is exhausted
+ASSET_STREAM_ASYNC_MAX_CONNECTIONS = getattr(settings, "ASSET_STREAM_ASYNC_MAX_CONNECTIONS", 500)
+
+# Adds buffered chunks to their streams once the batch window has passed without further writes
+_asset_stream_flusher = DeferredFlusher("asset-stream-flusher")
+
+
+class _AsyncObjrefStreamReader:
+    """
+    Async redis clients can only be used from the event loop they were created in, and agent runs create and close
+    an event loop per run. Reads from every loop are run on one long lived event loop with one client and
+    connection pool, so no pool is left behind when a loop closes
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="objref-stream-reader", daemon=True).start()
+        return self._loop
+
+    async def _xread(self, **kwargs):
+        # Runs on the reader loop
+        if self._client is None:
+            self._client = redis.asyncio.Redis(
+                connection_pool=redis.asyncio.BlockingConnectionPool.from_url(
+                    settings.CACHES["objref_stream"]["LOCATION"],
+                    max_connections=ASSET_STREAM_ASYNC_MAX_CONNECTIONS,
+                    timeout=None,
+                ),
+            )
+        return await self._client.xread(**kwargs)
+
+    async def xread(self, **kwargs):
+        """
+        Awaits XREAD from any event loop. Cancelling the caller cancels the XREAD on the reader loop
+        """
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._xread(**kwargs), self._get_loop()))
+
+
+_async_objref_stream_reader = _AsyncObjrefStreamReader()
+
 
 class AssetStream:
     from llmstack.assets.models import Assets
@@ -15,9 +84,14 @@ class AssetStream:
     Helper class to manage streaming assets.
     """
 
-    def __init__(self, asset: Assets):
+    def __init__(self, asset: Assets, batch_size: int = None, batch_window: float = None):
         self._asset = asset
         self._id = 0
+        self._batch_size = batch_size if batch_size is not None else ASSET_STREAM_BATCH_SIZE
+        self._batch_window = batch_window if batch_window is not None else ASSET_STREAM_BATCH_WINDOW
+        self._buffer = bytearray()
+        self._last_flushed_at = None
+        self._lock = threading.Lock()
 
     @property
     def objref(self) -> str:
@@ -26,44 +100,75 @@ class AssetStream:
     def get_asset(self):
         return self._asset
 
+    def _add_to_stream(self, chunk: bytes, id: int):
+        # XADD and EXPIRE go to redis in a single round trip
+        pipeline = objref_stream_client.pipeline(transaction=False)
+        pipeline.xadd(self.objref, {"chunk": chunk, "id": id})
+        pipeline.expire(self.objref, STREAM_EXPIRY)
+        pipeline.execute()
+
+    def _flush_locked(self, now: float):
+        if self._buffer:
+            self._add_to_stream(bytes(self._buffer), self._id)
+            self._id += 1
+            self._buffer.clear()
+        self._last_flushed_at = now
+
+    def flush(self):
+        """
+        Adds the buffered chunks to the stream.
+        """
+        with self._lock:
+            if self._buffer:
+                self._flush_locked(time.monotonic())
+
     def append_chunk(self, chunk: bytes):
         if chunk == b"":
             return
 
-        objref_stream_client.xadd(
-            self.objref,
-            {"chunk": chunk, "id": self._id},
-        )
-        self._id += 1
-
-        # Expire the stream after 20 minutes
-        objref_stream_client.expire(self.objref, 1200)
-
-    def finalize(self):
-        # Read the stream and finalize the asset
-        file_bytes = b""
-
+        with self._lock:
+            self._buffer.extend(chunk)
+
+            # The first chunk goes out immediately so that readers can start, later chunks are batched
+            now = time.monotonic()
+            if (
+                self._last_flushed_at is None
+                or len(self._buffer) >= self._batch_size
+                or now - self._last_flushed_at >= self._batch_window
+            ):
+                self._flush_locked(now)
+            else:
+                _asset_stream_flusher.schedule(self, self._last_flushed_at + self._batch_window)
+
+    def _spool(self):
+        # Copies the stream into a spooled file page by page instead of concatenating the chunks
+        spool = tempfile.SpooledTemporaryFile(max_size=ASSET_STREAM_SPOOL_MAX_SIZE)
         message_index = 0
         while True:
-            stream = objref_stream_client.xread(count=10, streams={self.objref: message_index})
+            stream = objref_stream_client.xread(
+                count=ASSET_STREAM_READ_PAGE_SIZE,
+                streams={self.objref: message_index},
+            )
             if not stream:
                 break
 
             for _, messages in stream:
                 for id, message in messages:
-                    file_bytes += message[b"chunk"]
+                    spool.write(message[b"chunk"])
                     message_index = id
 
-        # Add EOF marker to the stream
-        objref_stream_client.xadd(
-            self.objref,
-            {"chunk": b"", "id": -1},
-        )
+        spool.seek(0)
+        return spool
 
-        # Expire the stream after 20 minutes
-        objref_stream_client.expire(self.objref, 1200)
+    def finalize(self):
+        # Read the stream and finalize the asset
+        self.flush()
 
-        return self._asset.finalize_streaming_asset(file_bytes)
+        with self._spool() as spool:
+            # Add EOF marker to the stream
+            self._add_to_stream(b"", -1)
+
+            return self._asset.finalize_streaming_asset_from_file(spool)
 
     def read(self, start_index=0, timeout=1000):
         """
@@ -75,7 +180,11 @@ class AssetStream:
 
         try:
             while True:
-                stream = objref_stream_client.xread(count=10, streams={self.objref: message_index}, block=timeout)
+                stream = objref_stream_client.xread(
+                    count=ASSET_STREAM_READ_PAGE_SIZE,
+                    streams={self.objref: message_index},
+                    block=timeout,
+                )
                 if not stream:
                     break
 
@@ -92,31 +201,51 @@ class AssetStream:
             logger.error(f"Error reading stream: {e}")
             yield b""
 
-    async def read_async(self, start_index=0, timeout=10, cancel_event=None):
+    async def read_async(self, start_index=0, timeout=1000, cancel_event=None):
         """
-        Subscribe to the stream, read the chunks and return an iterator.
+        Subscribe to the stream, read the chunks and return an iterator. Reads don't block the event loop, and
+        the next page is only fetched once the consumer has taken the previous one. Stops after the EOF chunk or
+        once cancel_event, an asyncio.Event, is set
         """
         message_index = start_index
-        chunk = b""
-        chunk_index = 0
 
         try:
-            while True:
-                stream = objref_stream_client.xread(count=1000, streams={self.objref: message_index}, block=timeout)
-                if cancel_event and cancel_event.is_set():
-                    break
-
-                for _, messages in stream:
+            while not (cancel_event and cancel_event.is_set()):
+                read = asyncio.ensure_future(
+                    _async_objref_stream_reader.xread(
+                        count=ASSET_STREAM_READ_PAGE_SIZE,
+                        streams={self.objref: message_index},
+                        block=timeout,
+                    ),
+                )
+                try:
+                    if cancel_event:
+                        # Stops waiting for the next page as soon as cancel_event is set
+                        cancelled = asyncio.ensure_future(cancel_event.wait())
+                        try:
+                            await asyncio.wait({read, cancelled}, return_when=asyncio.FIRST_COMPLETED)
+                        finally:
+                            cancelled.cancel()
+                        if not read.done():
+                            return
+                    stream = await read
+                finally:
+                    # Stops the XREAD on the reader loop when the read was cancelled
+                    read.cancel()
+
+                for _, messages in stream or []:
                     for id, message in messages:
-                        chunk_index = message[b"id"]
+                        if cancel_event and cancel_event.is_set():
+                            return
+
                         chunk = message[b"chunk"]
                         yield chunk
                         message_index = id
 
-                    if chunk_index == -1 or chunk == b"":
-                        break
-
-                await asyncio.sleep(0.00001)
+                        if chunk == b"" or message[b"id"] == b"-1":
+                            return
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error reading stream: {e}")
             yield b""
@@ -14,6 +14,10 @@ class BaseConfig(AppConfig):
 
         post_save.connect(create_user_profile, sender=User)
 
+        from llmstack.common.utils.metrics import start_publisher
+
+        start_publisher()
+
         # call admin user if not exists
         try:
             from .management.commands.loadfixtures import Command
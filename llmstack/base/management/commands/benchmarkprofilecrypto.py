@@ -0,0 +1,78 @@
+import json
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from llmstack.base.models import Profile, profile_secrets_cache
+from llmstack.common.utils.crypto import cipher_cache
+
+ENCRYPTED_VENDOR_KEYS = [
+    "azure_openai_api_key",
+    "openai_key",
+    "stabilityai_key",
+    "cohere_key",
+    "forefrontai_key",
+    "elevenlabs_key",
+    "google_service_account_json_key",
+    "aws_secret_access_key",
+    "localai_api_key",
+    "anthropic_api_key",
+    "mistral_api_key",
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmarks decrypting a profile's vendor env with and without the cipher and profile secrets caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Number of simulated requests")
+        parser.add_argument("--connections", type=int, default=5, help="Number of connections on the profile")
+
+    def _build_profile(self, num_connections):
+        # The profile is never saved, so this runs without touching the database
+        profile = Profile(uuid=uuid.uuid4(), token="benchmark")
+        for attrname in ENCRYPTED_VENDOR_KEYS:
+            if hasattr(profile, attrname):
+                setattr(profile, attrname, profile.encrypt_value(f"{attrname}-value").decode("utf-8"))
+
+        profile._provider_configs = profile.encrypt_value(
+            json.dumps({"openai/*/*/*": {"provider_slug": "openai", "api_key": "sk-benchmark"}}),
+        ).decode("utf-8")
+        profile._connections = {
+            str(index): profile.encrypt_value(
+                json.dumps({"id": str(index), "name": f"connection {index}", "configuration": {}}),
+            ).decode("utf-8")
+            for index in range(num_connections)
+        }
+        return profile
+
+    def _time_requests(self, profile, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            profile.get_vendor_env()
+        return (time.perf_counter() - start) / iterations
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        profile = self._build_profile(options["connections"])
+
+        cipher_cache_maxsize, secrets_cache_maxsize = cipher_cache.maxsize, profile_secrets_cache.maxsize
+        try:
+            # Without caching every decrypt derives its cipher again
+            cipher_cache.maxsize = profile_secrets_cache.maxsize = 0
+            cipher_cache.clear()
+            profile_secrets_cache.clear()
+            uncached = self._time_requests(profile, iterations)
+        finally:
+            cipher_cache.maxsize, profile_secrets_cache.maxsize = cipher_cache_maxsize, secrets_cache_maxsize
+
+        cipher_cache.clear()
+        profile_secrets_cache.clear()
+        profile.get_vendor_env()
+        cached = self._time_requests(profile, iterations)
+
+        self.stdout.write(f"get_vendor_env without caches: {uncached * 1000:.2f}ms per request")
+        self.stdout.write(f"get_vendor_env with caches: {cached * 1000:.2f}ms per request")
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {uncached / cached:.1f}x"))
+        self.stdout.write(json.dumps({"cipher_cache": cipher_cache.stats()}, indent=2))
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from llmstack.common.utils.metrics import get_published_snapshots
+
+
+class Command(BaseCommand):
+    help = "Dumps metrics published by running llmstack processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", type=str, default="", help="Only include metrics starting with this prefix")
+
+    def handle(self, *args, **options):
+        snapshots = get_published_snapshots()
+        if not snapshots:
+            self.stdout.write(self.style.WARNING("No metrics have been published yet."))
+            return
+
+        for snapshot in snapshots:
+            metrics = {
+                name: metric for name, metric in snapshot["metrics"].items() if name.startswith(options["prefix"])
+            }
+            self.stdout.write(self.style.SUCCESS(f"Process {snapshot['process']}"))
+            self.stdout.write(json.dumps(metrics, indent=2))
@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from llmstack.common.utils.metrics import get_published_snapshots
+
+TEMPLATE_CACHE_METRIC_PREFIXES = ("liquid_template_cache.", "liquid_variables_cache.")
+
+
+class Command(BaseCommand):
+    help = "Dumps liquid template and template variable cache stats published by running llmstack processes."
+
+    def handle(self, *args, **options):
+        snapshots = get_published_snapshots()
+        if not snapshots:
+            self.stdout.write(self.style.WARNING("No cache stats have been published yet."))
+            return
+
+        for snapshot in snapshots:
+            stats = {}
+            for name, metric in snapshot["metrics"].items():
+                if name.startswith(TEMPLATE_CACHE_METRIC_PREFIXES):
+                    cache_name, stat = name.split(".", 1)
+                    stats.setdefault(cache_name, {})[stat] = metric["value"]
+
+            for cache_stats in stats.values():
+                lookups = cache_stats.get("hits", 0) + cache_stats.get("misses", 0)
+                cache_stats["hit_rate"] = cache_stats.get("hits", 0) / lookups if lookups else 0
+
+            self.stdout.write(self.style.SUCCESS(f"Process {snapshot['process']}"))
+            self.stdout.write(json.dumps(stats, indent=2))
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from llmstack.play.utils import ConnectionEventQueue, run_coro_in_new_loop
+
+
+def _rss_bytes():
+    # Resident set size of the process, only available on Linux
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class _Sampler:
+    def __init__(self):
+        self.peak_threads = threading.active_count()
+        self.peak_rss = _rss_bytes()
+
+    def sample(self):
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+        rss = _rss_bytes()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the threads and memory used to dispatch websocket events with a thread and event loop per "
+        "message against per connection event queues on a single event loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=1000, help="Number of simulated connections")
+        parser.add_argument("--messages", type=int, default=2, help="Messages received per connection")
+        parser.add_argument("--work-ms", type=int, default=50, help="Time each message handler awaits")
+
+    async def _handle(self, work, handled):
+        await asyncio.sleep(work)
+        handled.append(1)
+
+    async def _run_with_threads(self, connections, messages, work):
+        sampler, handled = _Sampler(), []
+        start = time.perf_counter()
+        futures = [
+            run_coro_in_new_loop(self._handle(work, handled)) for _ in range(connections) for _ in range(messages)
+        ]
+        while not all(future.done() for future in futures):
+            sampler.sample()
+            await asyncio.sleep(0.005)
+        return sampler, time.perf_counter() - start, len(handled)
+
+    async def _run_with_queues(self, connections, messages, work):
+        sampler, handled = _Sampler(), []
+        start = time.perf_counter()
+        queues = [
+            ConnectionEventQueue(lambda: self._handle(work, handled), name=f"connection-{index}")
+            for index in range(connections)
+        ]
+        for _ in range(messages):
+            for queue in queues:
+                await queue.put()
+        while len(handled) < connections * messages:
+            sampler.sample()
+            await asyncio.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        for queue in queues:
+            await queue.close()
+        return sampler, elapsed, len(handled)
+
+    def _report(self, label, baseline_threads, baseline_rss, connections, result):
+        sampler, elapsed, handled = result
+        self.stdout.write(f"{label}: handled {handled} messages in {elapsed:.2f}s")
+        self.stdout.write(f"  peak threads: {sampler.peak_threads - baseline_threads} above baseline")
+        if sampler.peak_rss is not None and baseline_rss is not None:
+            per_connection = (sampler.peak_rss - baseline_rss) / connections
+            self.stdout.write(
+                f"  peak memory: {(sampler.peak_rss - baseline_rss) / 1024 / 1024:.1f}MiB above baseline, "
+                f"{per_connection / 1024:.1f}KiB per connection"
+            )
+
+    def handle(self, *args, **options):
+        connections, messages = options["connections"], options["messages"]
+        work = options["work_ms"] / 1000
+
+        # Event queues run first, as the process keeps memory freed by the exited threads
+        baseline_threads, baseline_rss = threading.active_count(), _rss_bytes()
+        queues_result = asyncio.run(self._run_with_queues(connections, messages, work))
+        self._report("Event queues", baseline_threads, baseline_rss, connections, queues_result)
+
+        baseline_threads, baseline_rss = threading.active_count(), _rss_bytes()
+        threads_result = asyncio.run(self._run_with_threads(connections, messages, work))
+        self._report("Thread per message", baseline_threads, baseline_rss, connections, threads_result)
@@ -1,20 +1,19 @@
-import base64
+import copy
+import hashlib
 import json
 import logging
 import uuid
 from enum import Enum
 from functools import cache
 
-from cryptography.fernet import Fernet
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils.module_loading import import_string
 from rest_framework.authtoken.models import Token
 
+from llmstack.common.utils.cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, TTLCache
+from llmstack.common.utils.crypto import get_cipher as get_cached_cipher
 from llmstack.common.utils.provider_config import validate_provider_configs
 from llmstack.connections.models import Connection
 from llmstack.emails.sender import EmailSender
@@ -23,6 +22,18 @@ from llmstack.processors.providers.promptly import SendgridEmailSenderConfig
 
 logger = logging.getLogger(__name__)
 
+# Decrypted provider configs and connections of profiles, keyed by profile uuid, the kind of secret and a
+# fingerprint of the encrypted value so that updates from other processes are never served stale
+profile_secrets_cache = TTLCache(
+    "profile_secrets_cache",
+    maxsize=getattr(settings, "PROFILE_SECRETS_CACHE_SIZE", DEFAULT_CACHE_SIZE),
+    ttl=getattr(settings, "PROFILE_SECRETS_CACHE_TTL", DEFAULT_CACHE_TTL),
+)
+
+
+def _fingerprint(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
 
 @cache
 def get_vendor_env_platform_defaults():
@@ -380,27 +391,36 @@ class AbstractProfile(models.Model):
 
         return settings.WEAVIATE_EMBEDDINGS_BATCH_SIZE
 
+    def _get_cached_secret(self, kind, encrypted_value, loader):
+        # Callers may modify the returned values, so every caller gets its own copy
+        return copy.deepcopy(
+            profile_secrets_cache.get((str(self.uuid), kind, _fingerprint(encrypted_value)), loader),
+        )
+
+    def _invalidate_cached_secrets(self):
+        profile_uuid = str(self.uuid)
+        profile_secrets_cache.invalidate(lambda key: key[0] == profile_uuid)
+
     @property
     def provider_configs(self):
-        return (
-            json.loads(
-                self.decrypt_value(self._provider_configs),
-            )
-            if self._provider_configs
-            else {}
+        if not self._provider_configs:
+            return {}
+
+        return self._get_cached_secret(
+            "provider_configs",
+            self._provider_configs,
+            lambda: json.loads(self.decrypt_value(self._provider_configs)),
         )
 
     @property
     def connections(self):
-        return (
-            {
-                k: json.loads(
-                    self.decrypt_value(v),
-                )
-                for k, v in self._connections.items()
-            }
-            if self._connections
-            else {}
+        if not self._connections:
+            return {}
+
+        return self._get_cached_secret(
+            "connections",
+            self._connections,
+            lambda: {k: json.loads(self.decrypt_value(v)) for k, v in self._connections.items()},
         )
 
     def get_connection(self, id):
@@ -444,11 +464,13 @@ class AbstractProfile(models.Model):
             connection_json,
         ).decode("utf-8")
         self.save(update_fields=["_connections"])
+        self._invalidate_cached_secrets()
 
     def delete_connection(self, id):
         if self._connections and id in self._connections:
             del self._connections[id]
             self.save(update_fields=["_connections"])
+            self._invalidate_cached_secrets()
 
     def get_connection_by_type(self, connection_type_slug):
         return [
@@ -473,6 +495,7 @@ class AbstractProfile(models.Model):
         # Once all the configs are validated, encrypt the data
         self._provider_configs = self.encrypt_value(json.dumps(provider_configs)).decode("utf-8")
         self.save(update_fields=["_provider_configs"])
+        self._invalidate_cached_secrets()
 
     def _vendor_key_or_promptly_default(self, attrname, api_key_value):
         if attrname == "azure_openai_api_key":
@@ -667,7 +690,7 @@ class AbstractProfile(models.Model):
         from llmstack.common.utils.provider_config import get_matched_provider_config
 
         return get_matched_provider_config(
-            provider_configs=self.get_vendor_env().get("provider_configs", {}),
+            provider_configs=self.get_merged_provider_configs(),
             provider_slug=provider_slug,
             processor_slug=processor_slug,
             model_slug=model_slug,
@@ -694,16 +717,7 @@ class AbstractProfile(models.Model):
 
     @staticmethod
     def get_cipher(token, salt):
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            iterations=100000,
-            length=32,
-            salt=salt,
-            backend=default_backend(),
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(token.encode()))
-        cipher = Fernet(key)
-        return cipher
+        return get_cached_cipher(token, salt)
 
     def encrypt_value(self, value):
         if not value:
@@ -0,0 +1,77 @@
+"""
+Process local caches.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 600
+
+
+class TTLCache:
+    """
+    A thread safe, bounded LRU cache whose entries expire ttl seconds after they were added
+    """
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = metrics_registry.counter(f"{name}.hits", f"Lookups served from the {name}")
+        self._misses = metrics_registry.counter(f"{name}.misses", f"Lookups that missed the {name}")
+        self._evictions = metrics_registry.counter(f"{name}.evictions", f"Entries evicted from the {name}")
+        metrics_registry.gauge(f"{name}.size", f"Number of entries in the {name}", fn=lambda: len(self._data))
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for key or loads and caches it
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self._hits.inc()
+                return entry[1]
+
+        self._misses.inc()
+        value = loader()
+
+        with self._lock:
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions.inc()
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Removes the entries whose keys match predicate
+        """
+        with self._lock:
+            for key in [key for key in self._data.keys() if predicate(key)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits.value + self._misses.value
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+            "evictions": self._evictions.value,
+            "hit_rate": self._hits.value / lookups if lookups else 0,
+        }
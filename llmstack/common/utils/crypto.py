@@ -0,0 +1,63 @@
+"""
+Ciphers used to encrypt profile and organization secrets.
+
+Deriving a cipher runs PBKDF2 with 100,000 iterations. Derived ciphers are kept in a bounded, TTL evicted
+process local cache so that decrypting a profile's keys, connections and provider configs on every run
+doesn't pay for the derivation each time. The cache is keyed by a SHA-256 digest of the token and salt so that
+the raw tokens aren't kept in memory.
+"""
+
+import base64
+import hashlib
+from typing import Optional
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from llmstack.common.utils.cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, TTLCache
+
+PBKDF2_ITERATIONS = 100000
+
+
+def _get_setting(name, default):
+    try:
+        from django.conf import settings
+
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+cipher_cache = TTLCache(
+    "cipher_cache",
+    maxsize=_get_setting("CIPHER_CACHE_SIZE", DEFAULT_CACHE_SIZE),
+    ttl=_get_setting("CIPHER_CACHE_TTL", DEFAULT_CACHE_TTL),
+)
+
+
+def derive_cipher(token: str, salt: bytes) -> Fernet:
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        iterations=PBKDF2_ITERATIONS,
+        length=32,
+        salt=salt,
+        backend=default_backend(),
+    )
+    key = base64.urlsafe_b64encode(kdf.derive(token.encode()))
+    return Fernet(key)
+
+
+def _cache_key(token: str, salt: bytes) -> bytes:
+    token_bytes = token.encode()
+    return hashlib.sha256(len(token_bytes).to_bytes(8, "big") + token_bytes + salt).digest()
+
+
+def get_cipher(token: str, salt: bytes, cache: Optional[TTLCache] = cipher_cache) -> Fernet:
+    """
+    Returns the Fernet cipher derived from token and salt, from the process wide cache when available
+    """
+    if cache is None:
+        return derive_cipher(token, salt)
+    return cache.get(_cache_key(token, salt), lambda: derive_cipher(token, salt))
@@ -0,0 +1,58 @@
+"""
+Deferred flushing for buffered writers.
+"""
+
+import logging
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredFlusher:
+    """
+    Calls flush() on buffered writers once their deadline has passed, so that buffered data isn't held back
+    when no more writes follow it. A single daemon thread serves all writers scheduled on the flusher
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._deadlines = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, writer: Any, deadline: float) -> None:
+        """
+        Flushes writer at the monotonic time deadline. Does nothing if writer is already scheduled
+        """
+        with self._condition:
+            if writer in self._deadlines:
+                return
+
+            self._deadlines[writer] = deadline
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._deadlines:
+                    self._condition.wait()
+
+                now = time.monotonic()
+                due_writers = [writer for writer, deadline in self._deadlines.items() if deadline <= now]
+                if not due_writers:
+                    self._condition.wait(timeout=min(self._deadlines.values()) - now)
+                    continue
+
+                for writer in due_writers:
+                    del self._deadlines[writer]
+
+            for writer in due_writers:
+                try:
+                    writer.flush()
+                except Exception as e:
+                    logger.error(f"Error flushing {writer} from {self.name}: {e}")
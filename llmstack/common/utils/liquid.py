@@ -1,6 +1,11 @@
 import ast
+import gc
 import json
 import logging
+import sys
+import threading
+from collections import OrderedDict
+from types import FunctionType, ModuleType
 from urllib.parse import quote_plus
 
 import lxml.etree as ET
@@ -110,8 +115,116 @@ env.add_filter("xpath", xpath_filter)
 env.add_filter("html_xpath", html_xpath_filter)
 
 
+DEFAULT_TEMPLATE_CACHE_SIZE = 1024
+
+
+def _get_cache_size_setting(name, default):
+    try:
+        from django.conf import settings
+
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+def _approximate_sizeof(objs, exclude=()):
+    """
+    Approximate memory used by objs and everything they reference, excluding shared objects
+    """
+    seen = set(id(obj) for obj in exclude)
+    pending = list(objs)
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+class LRUCache:
+    """
+    A thread safe, bounded LRU cache keyed by template source with hit/miss counters
+    """
+
+    def __init__(self, name, loader, maxsize_setting, default_maxsize=DEFAULT_TEMPLATE_CACHE_SIZE):
+        from llmstack.common.utils.metrics import registry as metrics_registry
+
+        self.name = name
+        self._loader = loader
+        self._maxsize_setting = maxsize_setting
+        self._default_maxsize = default_maxsize
+        self._maxsize = None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = metrics_registry.counter(f"{name}.hits", f"Lookups served from the {name}")
+        self._misses = metrics_registry.counter(f"{name}.misses", f"Lookups that missed the {name}")
+        self._evictions = metrics_registry.counter(f"{name}.evictions", f"Entries evicted from the {name}")
+        metrics_registry.gauge(f"{name}.size", f"Number of entries in the {name}", fn=lambda: len(self._data))
+        metrics_registry.gauge(
+            f"{name}.memory_bytes", f"Approximate memory used by the {name}", fn=lambda: self.memory_bytes()
+        )
+
+    @property
+    def maxsize(self):
+        if self._maxsize is None:
+            self._maxsize = _get_cache_size_setting(self._maxsize_setting, self._default_maxsize)
+        return self._maxsize
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._hits.inc()
+                return self._data[key]
+
+        self._misses.inc()
+        value = self._loader(key)
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions.inc()
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def memory_bytes(self):
+        with self._lock:
+            items = list(self._data.items())
+        return _approximate_sizeof([item for pair in items for item in pair], exclude=(env,))
+
+    def stats(self):
+        lookups = self._hits.value + self._misses.value
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+            "evictions": self._evictions.value,
+            "hit_rate": self._hits.value / lookups if lookups else 0,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+
+template_cache = LRUCache("liquid_template_cache", env.from_string, "LIQUID_TEMPLATE_CACHE_SIZE")
+
+
+def get_template(template):
+    """
+    Returns the compiled template for the given source from the process wide template cache
+    """
+    return template_cache.get(template)
+
+
 def render_template(template, data):
-    return env.from_string(template).render(**data)
+    return get_template(template).render(**data)
 
 
 def hydrate_input(input, values):
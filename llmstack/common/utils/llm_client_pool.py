@@ -0,0 +1,175 @@
+"""
+Process wide pool of LLM clients.
+
+Building an LLM client creates a new httpx client, so every processor run paid for new TCP and TLS handshakes to the
+provider. Pooled clients are keyed by provider, base URL and a fingerprint of their credentials, and clients for the
+same provider endpoint share one keep-alive connection pool.
+"""
+
+import hashlib
+import importlib.util
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+import orjson as json
+from django.conf import settings
+from openai._constants import DEFAULT_TIMEOUT
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+from llmstack.common.utils.sslr._client import LLM
+from llmstack.common.utils.sslr.constants import PROVIDER_OPENAI
+
+
+def _credentials_fingerprint(kwargs: Dict) -> str:
+    return hashlib.sha256(json.dumps(kwargs, option=json.OPT_SORT_KEYS, default=str)).hexdigest()
+
+
+class LLMClientPool:
+    """
+    Pool of LLM clients shared by all processors, agents and sheets in the process. Clients are safe to share
+    between threads. Clients that haven't been used for idle_timeout seconds are dropped from the pool
+    """
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        idle_timeout: float = 300,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60,
+        http2: bool = True,
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # HTTP/2 needs the optional h2 package
+        self._http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._clients: Dict[Tuple, list] = OrderedDict()
+        self._http_clients: Dict[Tuple, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+        self._hits = metrics_registry.counter("llm_client_pool.hits", "LLM clients reused from the pool")
+        self._misses = metrics_registry.counter("llm_client_pool.misses", "LLM clients created for the pool")
+        self._evictions = metrics_registry.counter("llm_client_pool.evictions", "LLM clients evicted from the pool")
+        metrics_registry.gauge("llm_client_pool.size", "LLM clients in the pool", fn=lambda: len(self._clients))
+        metrics_registry.gauge(
+            "llm_client_pool.http_clients",
+            "HTTP connection pools shared by pooled LLM clients",
+            fn=lambda: len(self._http_clients),
+        )
+
+    def _evict_idle(self, now: float) -> None:
+        # Evicted clients are only dropped, not closed, as a streaming response may still be reading from them.
+        # Their connections are closed once they are garbage collected
+        for key in [key for key, entry in self._clients.items() if now - entry[1] > self.idle_timeout]:
+            del self._clients[key]
+            self._evictions.inc()
+
+        self._drop_unused_http_clients()
+
+    def _drop_unused_http_clients(self) -> None:
+        endpoints = set(key[:2] for key in self._clients.keys())
+        for endpoint in [endpoint for endpoint in self._http_clients.keys() if endpoint not in endpoints]:
+            del self._http_clients[endpoint]
+
+    def _get_http_client(self, provider: str, base_url: Optional[str]) -> httpx.Client:
+        http_client = self._http_clients.get((provider, base_url))
+        if http_client is None:
+            http_client = httpx.Client(
+                timeout=DEFAULT_TIMEOUT,
+                limits=self._limits,
+                http2=self._http2,
+                follow_redirects=True,
+            )
+            self._http_clients[(provider, base_url)] = http_client
+        return http_client
+
+    def get(self, **kwargs) -> LLM:
+        """
+        Returns a pooled LLM client for the given LLM constructor arguments
+        """
+        provider = kwargs.get("provider", PROVIDER_OPENAI)
+        base_url = kwargs.get("openai_base_url") or kwargs.get("base_url") or kwargs.get("azure_endpoint")
+        key = (provider, base_url, _credentials_fingerprint(kwargs))
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._clients.move_to_end(key)
+                self._hits.inc()
+                return entry[0]
+
+            http_client = self._get_http_client(provider, base_url)
+
+        self._misses.inc()
+        client = LLM(**kwargs, http_client=http_client)
+
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                # Another thread created the same client first
+                return entry[0]
+
+            self._clients[key] = [client, now]
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self._evictions.inc()
+            self._drop_unused_http_clients()
+
+        return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            self._http_clients.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits.value + self._misses.value
+        return {
+            "size": len(self._clients),
+            "max_size": self.max_size,
+            "http_clients": len(self._http_clients),
+            "http2": self._http2,
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+            "evictions": self._evictions.value,
+            "hit_rate": self._hits.value / lookups if lookups else 0,
+        }
+
+
+_llm_client_pool = None
+_llm_client_pool_lock = threading.Lock()
+
+
+def get_llm_client_pool() -> LLMClientPool:
+    global _llm_client_pool
+
+    if _llm_client_pool is None:
+        with _llm_client_pool_lock:
+            if _llm_client_pool is None:
+                _llm_client_pool = LLMClientPool(
+                    max_size=getattr(settings, "LLM_CLIENT_POOL_MAX_SIZE", 256),
+                    idle_timeout=getattr(settings, "LLM_CLIENT_POOL_IDLE_TIMEOUT", 300),
+                    max_connections=getattr(settings, "LLM_CLIENT_MAX_CONNECTIONS", 100),
+                    max_keepalive_connections=getattr(settings, "LLM_CLIENT_MAX_KEEPALIVE_CONNECTIONS", 20),
+                    keepalive_expiry=getattr(settings, "LLM_CLIENT_KEEPALIVE_EXPIRY", 60),
+                    http2=getattr(settings, "LLM_CLIENT_HTTP2", True),
+                )
+    return _llm_client_pool
+
+
+def get_llm_client(**kwargs) -> LLM:
+    """
+    Returns a pooled LLM client. Takes the same keyword arguments as LLM, except http_client
+    """
+    return get_llm_client_pool().get(**kwargs)
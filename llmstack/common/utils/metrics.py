@@ -0,0 +1,238 @@
+"""
+Lightweight process-local metrics.
+
+Counters, gauges and histograms are registered by name in a process wide registry. Snapshots of the
+registry can be published to the default cache so that stats from all server and worker processes
+can be collected from a management command.
+"""
+
+import bisect
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Default latency buckets in seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+METRICS_CACHE_KEY_PREFIX = "llmstack_metrics"
+METRICS_PROCESSES_CACHE_KEY = f"{METRICS_CACHE_KEY_PREFIX}:processes"
+
+
+class Counter:
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict:
+        return {"type": "counter", "description": self.description, "value": self._value}
+
+
+class Gauge:
+    """
+    A gauge whose value is either set explicitly or computed by a callback when a snapshot is taken.
+    """
+
+    def __init__(self, name: str, description: str = "", fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.description = description
+        self._value = 0
+        self._fn = fn
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        if self._fn:
+            try:
+                return self._fn()
+            except Exception as e:
+                logger.debug(f"Error computing gauge {self.name}: {e}")
+                return 0
+        return self._value
+
+    def snapshot(self) -> Dict:
+        return {"type": "gauge", "description": self.description, "value": self.value}
+
+
+class Histogram:
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self._buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def time(self):
+        return _HistogramTimer(self)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(list(self._buckets) + [float("inf")], counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+
+        return {
+            "type": "histogram",
+            "description": self.description,
+            "count": count,
+            "sum": total,
+            "avg": total / count if count else 0,
+            "buckets": buckets,
+        }
+
+
+class _HistogramTimer:
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, cls, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = cls(name, **kwargs)
+                    self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(name, Counter, description=description)
+
+    def gauge(self, name: str, description: str = "", fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._get_or_create(name, Gauge, description=description, fn=fn)
+
+    def histogram(
+        self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(name, Histogram, description=description, buckets=buckets)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Dict]:
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items()) if name.startswith(prefix)}
+
+
+registry = MetricsRegistry()
+
+_publisher_lock = threading.Lock()
+_publisher_thread = None
+
+
+def _process_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def publish_snapshot() -> None:
+    """
+    Publishes the snapshot of this process's metrics to the default cache
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+
+    interval = getattr(settings, "METRICS_PUBLISH_INTERVAL", 60)
+    process_id = _process_id()
+
+    cache.set(
+        f"{METRICS_CACHE_KEY_PREFIX}:{process_id}",
+        {"process": process_id, "timestamp": time.time(), "metrics": registry.snapshot()},
+        timeout=interval * 3,
+    )
+
+    processes = cache.get(METRICS_PROCESSES_CACHE_KEY, [])
+    if process_id not in processes:
+        cache.set(METRICS_PROCESSES_CACHE_KEY, (processes + [process_id])[-256:], timeout=None)
+
+
+def get_published_snapshots() -> List[Dict]:
+    """
+    Returns metric snapshots published by all live processes
+    """
+    from django.core.cache import cache
+
+    processes = cache.get(METRICS_PROCESSES_CACHE_KEY, [])
+    snapshots = cache.get_many([f"{METRICS_CACHE_KEY_PREFIX}:{process_id}" for process_id in processes])
+    return list(snapshots.values())
+
+
+def _publish_loop(interval: int) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            publish_snapshot()
+        except Exception as e:
+            logger.debug(f"Failed to publish metrics snapshot: {e}")
+
+
+def start_publisher() -> None:
+    """
+    Starts a daemon thread that periodically publishes this process's metrics. Safe to call multiple times.
+    """
+    global _publisher_thread
+
+    from django.conf import settings
+
+    interval = getattr(settings, "METRICS_PUBLISH_INTERVAL", 60)
+    if not interval or _publisher_thread:
+        return
+
+    with _publisher_lock:
+        if _publisher_thread:
+            return
+        _publisher_thread = threading.Thread(target=_publish_loop, args=(interval,), daemon=True)
+        _publisher_thread.start()
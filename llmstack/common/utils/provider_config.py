@@ -1,8 +1,23 @@
+import hashlib
 import sys
+import threading
 from functools import cache
 from importlib import import_module
+from itertools import product
+from typing import Dict, Optional, Tuple
 
+import orjson as json
 from django.conf import settings
+from pydantic import ConfigDict
+
+from llmstack.common.utils.cache import TTLCache
+
+# Compiled resolvers are shared by every actor, agent and pipeline that runs with the same provider configs
+provider_config_resolver_cache = TTLCache(
+    "provider_config_resolver_cache",
+    maxsize=getattr(settings, "PROVIDER_CONFIG_RESOLVER_CACHE_SIZE", 256),
+    ttl=getattr(settings, "PROVIDER_CONFIG_RESOLVER_CACHE_TTL", 600),
+)
 
 
 @cache
@@ -76,45 +91,107 @@ def validate_provider_configs(provider_configs):
         provider_schema_cls.model_validate(provider_config)
 
 
-def get_matched_provider_config(
-    provider_configs={}, provider_slug="*", processor_slug="*", model_slug="*", deployment_key="*"
-):
-    """
-    Finds the provider config schema class and get the
-    """
-    provider_config_cls = get_provider_config_class_by_slug_cached(provider_slug)
-    provider_config_key = f"{provider_slug}/{processor_slug}/{model_slug}/{deployment_key}"
+@cache
+def get_frozen_provider_config_class(provider_config_cls):
+    # Resolved configs are shared between callers, so they are built from a frozen subclass of the provider's schema
+    return type(
+        provider_config_cls.__name__,
+        (provider_config_cls,),
+        {
+            "__module__": provider_config_cls.__module__,
+            "__qualname__": provider_config_cls.__qualname__,
+            "model_config": ConfigDict(**{**provider_config_cls.model_config, "frozen": True}),
+        },
+    )
 
-    if not provider_config_cls or not provider_configs:
-        raise Exception(f"Configuration for this provider doesn't exist: {provider_slug}")
 
-    # Get all the provider config keys for this provider
-    config_keys_with_parts = list(map(lambda key: (key, key.split("/")), provider_configs.keys()))
-    config_keys_with_parts = list(filter(lambda key: key[1][0] == provider_slug, config_keys_with_parts))
+class ProviderConfigResolver:
+    """
+    Resolves provider configs for provider/processor/model/deployment lookups.
 
-    # Filter config_keys that the processor slug matches the regex in the config key split 1
-    config_keys_with_parts = list(
-        filter(lambda key: key[1][1] == "*" or key[1][1] == processor_slug, config_keys_with_parts)
-    )
+    Config keys are indexed once by provider slug and the remaining key parts. A lookup probes the exact and wildcard
+    variants of its parts and picks the matching key with the fewest wildcards, falling back to the order of the keys
+    in provider_configs on ties. Resolved configs are memoized per lookup and must not be modified.
+    """
 
-    # Filter config_keys that the model slug matches the regex in the config key split 2
-    config_keys_with_parts = list(
-        filter(lambda key: key[1][2] == "*" or key[1][2] == model_slug, config_keys_with_parts)
-    )
+    def __init__(self, provider_configs: Dict[str, Dict]):
+        self._provider_configs = provider_configs or {}
+        self._index: Dict[str, Dict[Tuple[str, str, str], Tuple[int, int, str]]] = {}
+        self._configs = {}
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+        for position, config_key in enumerate(self._provider_configs.keys()):
+            config_key_parts = config_key.split("/")
+            if len(config_key_parts) != 4:
+                continue
+
+            self._index.setdefault(config_key_parts[0], {})[tuple(config_key_parts[1:])] = (
+                config_key_parts.count("*"),
+                position,
+                config_key,
+            )
+
+    def _match(self, provider_slug: str, processor_slug: str, model_slug: str, deployment_key: str) -> Optional[str]:
+        provider_index = self._index.get(provider_slug)
+        if not provider_index:
+            return None
+
+        matches = [
+            provider_index[candidate]
+            for candidate in set(product((processor_slug, "*"), (model_slug, "*"), (deployment_key, "*")))
+            if candidate in provider_index
+        ]
+        return min(matches)[2] if matches else None
+
+    def _get_config(self, provider_config_cls, config_key: str):
+        provider_config = self._configs.get(config_key)
+        if provider_config is None:
+            provider_config = get_frozen_provider_config_class(provider_config_cls)(
+                **self._provider_configs[config_key]
+            )
+            self._configs[config_key] = provider_config
+        return provider_config
+
+    def resolve(self, provider_slug="*", processor_slug="*", model_slug="*", deployment_key="*"):
+        lookup = (provider_slug, processor_slug, model_slug, deployment_key)
+        if lookup in self._resolved:
+            provider_config = self._resolved[lookup]
+        else:
+            provider_config_cls = get_provider_config_class_by_slug_cached(provider_slug)
+            if not provider_config_cls or not self._provider_configs:
+                raise Exception(f"Configuration for this provider doesn't exist: {provider_slug}")
+
+            with self._lock:
+                config_key = self._match(*lookup)
+                provider_config = self._get_config(provider_config_cls, config_key) if config_key else None
+                self._resolved[lookup] = provider_config
+
+        if provider_config is None:
+            raise Exception(f"Configuration for this provider doesn't exist: {'/'.join(lookup)}")
+
+        return provider_config
+
+
+def get_provider_config_resolver(provider_configs: Dict[str, Dict]) -> ProviderConfigResolver:
+    """
+    Returns the compiled resolver for provider_configs, shared with other callers using the same configs
+    """
+    fingerprint = hashlib.sha256(
+        json.dumps(provider_configs or {}, option=json.OPT_SORT_KEYS, default=str),
+    ).hexdigest()
+    return provider_config_resolver_cache.get(fingerprint, lambda: ProviderConfigResolver(provider_configs))
 
-    # Filter config_keys that the deployment key matches the regex in the config key split 3
-    config_keys_with_parts = list(
-        filter(lambda key: key[1][3] == "*" or key[1][3] == deployment_key, config_keys_with_parts)
-    )
 
-    # Sort the remaning config keys by the number of * in the key in descending order and we take the first one
-    config_key = (
-        sorted(config_keys_with_parts, key=lambda key: key[1].count("*"))[0][0]
-        if len(config_keys_with_parts) > 0
-        else None
+def get_matched_provider_config(
+    provider_configs={}, provider_slug="*", processor_slug="*", model_slug="*", deployment_key="*"
+):
+    """
+    Finds the provider config that best matches the provider, processor, model and deployment
+    """
+    return get_provider_config_resolver(provider_configs).resolve(
+        provider_slug=provider_slug,
+        processor_slug=processor_slug,
+        model_slug=model_slug,
+        deployment_key=deployment_key,
     )
-
-    if not config_key:
-        raise Exception(f"Configuration for this provider doesn't exist: {provider_config_key}")
-
-    return provider_config_cls(**provider_configs[config_key])
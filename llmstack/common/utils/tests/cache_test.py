@@ -0,0 +1,49 @@
+import time
+import unittest
+
+from llmstack.common.utils.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+
+    def _loader(self, value):
+        def _load():
+            self.loads.append(value)
+            return value
+
+        return _load
+
+    def test_loads_once_until_expired(self):
+        cache = TTLCache(f"test_ttl_cache_{id(self)}", maxsize=4, ttl=0.05)
+
+        self.assertEqual(cache.get("key", self._loader(1)), 1)
+        self.assertEqual(cache.get("key", self._loader(2)), 1)
+        time.sleep(0.06)
+        self.assertEqual(cache.get("key", self._loader(3)), 3)
+        self.assertEqual(self.loads, [1, 3])
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(f"test_ttl_cache_{id(self)}", maxsize=2, ttl=60)
+
+        cache.get("a", self._loader("a"))
+        cache.get("b", self._loader("b"))
+        cache.get("a", self._loader("a"))
+        cache.get("c", self._loader("c"))
+        cache.get("b", self._loader("b"))
+
+        self.assertEqual(self.loads, ["a", "b", "c", "b"])
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_invalidate(self):
+        cache = TTLCache(f"test_ttl_cache_{id(self)}", maxsize=4, ttl=60)
+
+        cache.get(("user", 1), self._loader(1))
+        cache.get(("user", 2), self._loader(2))
+        cache.invalidate(lambda key: key[1] == 1)
+        cache.get(("user", 1), self._loader(1))
+        cache.get(("user", 2), self._loader(2))
+
+        self.assertEqual(self.loads, [1, 2, 1])
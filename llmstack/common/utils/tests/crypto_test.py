@@ -0,0 +1,28 @@
+import unittest
+
+from llmstack.common.utils.cache import TTLCache
+from llmstack.common.utils.crypto import get_cipher
+
+
+class TestGetCipher(unittest.TestCase):
+    def setUp(self):
+        self.cache = TTLCache(f"test_cipher_cache_{id(self)}", maxsize=4, ttl=60)
+
+    def test_caches_cipher_per_token_and_salt(self):
+        cipher = get_cipher("token", b"salt", cache=self.cache)
+
+        self.assertIs(get_cipher("token", b"salt", cache=self.cache), cipher)
+        self.assertIsNot(get_cipher("token", b"other-salt", cache=self.cache), cipher)
+        self.assertIsNot(get_cipher("other-token", b"salt", cache=self.cache), cipher)
+        self.assertEqual(cipher.decrypt(get_cipher("token", b"salt", cache=None).encrypt(b"value")), b"value")
+
+    def test_does_not_keep_token_in_cache_keys(self):
+        get_cipher("secret-token", b"salt", cache=self.cache)
+
+        for key in self.cache._data.keys():
+            self.assertNotIn(b"secret-token", key)
+            self.assertNotIn(b"salt", key)
+
+
+if __name__ == "__main__":
+    unittest.main()
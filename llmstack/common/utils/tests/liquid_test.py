@@ -0,0 +1,45 @@
+import unittest
+
+from llmstack.common.utils.liquid import LRUCache, get_template, render_template
+
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+
+        def _loader(key):
+            self.loads.append(key)
+            return key.upper()
+
+        self.cache = LRUCache(f"test_lru_cache_{id(self)}", _loader, "TEST_LRU_CACHE_SIZE", default_maxsize=2)
+
+    def test_loads_once_per_key(self):
+        self.assertEqual(self.cache.get("a"), "A")
+        self.assertEqual(self.cache.get("a"), "A")
+        self.assertEqual(self.loads, ["a"])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.get("a")
+        self.cache.get("b")
+        self.cache.get("a")
+        self.cache.get("c")
+
+        self.assertEqual(self.cache.stats()["size"], 2)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.cache.get("a")
+        self.cache.get("b")
+        self.assertEqual(self.loads, ["a", "b", "c", "b"])
+
+    def test_clear(self):
+        self.cache.get("a")
+        self.cache.clear()
+        self.cache.get("a")
+        self.assertEqual(self.loads, ["a", "a"])
+
+
+class TestTemplateCache(unittest.TestCase):
+    def test_compiled_template_is_shared(self):
+        self.assertIs(get_template("Hello {{ name }}"), get_template("Hello {{ name }}"))
+        self.assertEqual(render_template("Hello {{ name }}", {"name": "World"}), "Hello World")
@@ -0,0 +1,63 @@
+import unittest
+from typing import Optional
+from unittest.mock import patch
+
+from pydantic import BaseModel
+
+from llmstack.common.utils.provider_config import (
+    ProviderConfigResolver,
+    get_matched_provider_config,
+)
+
+
+class TestProviderConfig(BaseModel):
+    provider_slug: str
+    processor_slug: str = "*"
+    model_slug: str = "*"
+    deployment_key: str = "*"
+    api_key: Optional[str] = None
+
+
+def _config(key):
+    provider_slug, processor_slug, model_slug, deployment_key = key.split("/")
+    return {
+        "provider_slug": provider_slug,
+        "processor_slug": processor_slug,
+        "model_slug": model_slug,
+        "deployment_key": deployment_key,
+        "api_key": key,
+    }
+
+
+@patch(
+    "llmstack.common.utils.provider_config.get_provider_config_class_by_slug_cached",
+    return_value=TestProviderConfig,
+)
+class TestProviderConfigResolver(unittest.TestCase):
+    def _resolve(self, keys, *lookup):
+        return ProviderConfigResolver({key: _config(key) for key in keys}).resolve(*lookup).api_key
+
+    def test_exact_match_wins_over_wildcards(self, _):
+        keys = ["openai/*/*/*", "openai/chat/*/*", "openai/chat/gpt-4/*", "openai/chat/gpt-4/default"]
+        self.assertEqual(self._resolve(keys, "openai", "chat", "gpt-4", "default"), "openai/chat/gpt-4/default")
+        self.assertEqual(self._resolve(keys, "openai", "chat", "gpt-4", "other"), "openai/chat/gpt-4/*")
+        self.assertEqual(self._resolve(keys, "openai", "chat", "gpt-3", "default"), "openai/chat/*/*")
+        self.assertEqual(self._resolve(keys, "openai", "embeddings", "ada", "default"), "openai/*/*/*")
+
+    def test_key_order_breaks_ties(self, _):
+        keys = ["openai/chat/*/*", "openai/*/gpt-4/*"]
+        self.assertEqual(self._resolve(keys, "openai", "chat", "gpt-4", "default"), "openai/chat/*/*")
+        self.assertEqual(self._resolve(list(reversed(keys)), "openai", "chat", "gpt-4", "default"), "openai/*/gpt-4/*")
+
+    def test_other_providers_are_ignored(self, _):
+        with self.assertRaises(Exception):
+            self._resolve(["azure/*/*/*"], "openai", "chat", "gpt-4", "default")
+
+    def test_matches_are_shared_and_frozen(self, _):
+        provider_configs = {"openai/*/*/*": _config("openai/*/*/*")}
+        first = get_matched_provider_config(provider_configs, "openai", "chat", "gpt-4", "default")
+        second = get_matched_provider_config(provider_configs, "openai", "chat", "gpt-4", "default")
+
+        self.assertIs(first, second)
+        with self.assertRaises(Exception):
+            first.api_key = "changed"
@@ -5,7 +5,7 @@ import logging
 import re
 import time
 from enum import Enum
-from functools import partial, wraps
+from functools import cache, partial, wraps
 from io import BytesIO
 from typing import List, Type
 from urllib.parse import urlparse
@@ -511,11 +511,34 @@ def get_tool_json_schema_from_input_fields(name="", input_fields=[]):
     return tool_schema
 
 
-def vectorize_text(text):
+@cache
+def get_text_embedding_function():
+    """
+    Returns the default embedding function. Loading its model is expensive, so it is loaded once per process
+    """
     from chromadb.utils import embedding_functions
 
-    vectors = embedding_functions.DefaultEmbeddingFunction()([text])
-    return vectors[0]
+    return embedding_functions.DefaultEmbeddingFunction()
+
+
+@cache
+def _get_text_vector_cache():
+    from llmstack.common.utils.cache import TTLCache
+
+    return TTLCache(
+        "text_vector_cache",
+        maxsize=getattr(settings, "TEXT_VECTOR_CACHE_SIZE", 1024),
+        ttl=getattr(settings, "TEXT_VECTOR_CACHE_TTL", 3600),
+    )
+
+
+def vectorize_text(text):
+    def _vectorize():
+        vectors = get_text_embedding_function()([text])
+        return [float(value) for value in vectors[0]]
+
+    # Copied so that callers can't modify the cached vector
+    return list(_get_text_vector_cache().get(text, _vectorize))
 
 
 def retry_on_db_error(func=None, max_retries=3, delay=1):
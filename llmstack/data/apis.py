@@ -303,6 +303,8 @@ class DataSourceEntryViewSet(viewsets.ModelViewSet):
                         "request_data",
                         "datasource_uuid",
                         "node_ids",
+                        "content_hash",
+                        "node_hashes",
                     ]
                 ),
             },
@@ -310,13 +312,13 @@ class DataSourceEntryViewSet(viewsets.ModelViewSet):
         )
         return DRFResponse(DataSourceEntrySerializer(instance=entry, context={"request_user": user}).data)
 
-    def process_entry(self, request, uid):
+    def process_entry(self, request, uid, pipeline=None):
         entry = get_object_or_404(DataSourceEntry, uuid=uuid.UUID(uid))
         if request and request.user != entry.datasource.has_write_permission(request.user):
             return DRFResponse(status=404)
 
         document = DataDocument(**entry.config)
-        pipeline_obj = entry.datasource.create_data_ingestion_pipeline()
+        pipeline_obj = pipeline or entry.datasource.create_data_ingestion_pipeline()
         try:
             document = pipeline_obj.process(document)
             entry.config = {
@@ -332,6 +334,8 @@ class DataSourceEntryViewSet(viewsets.ModelViewSet):
                         "request_data",
                         "datasource_uuid",
                         "node_ids",
+                        "content_hash",
+                        "node_hashes",
                     ]
                 ),
             }
@@ -339,15 +343,86 @@ class DataSourceEntryViewSet(viewsets.ModelViewSet):
         except Exception as e:
             document.processing_errors = [str(e)]
 
-        entry.status = DataSourceEntryStatus.READY if not document.processing_errors else DataSourceEntryStatus.FAILED
-        entry.save(update_fields=["config", "size", "status", "updated_at"])
+        def _save_entry(flush_error):
+            # In a batch the nodes are only written to the destination once the batch is flushed
+            if flush_error:
+                document.processing_errors = [str(flush_error)]
+                entry.config = {**entry.config, "processing_errors": document.processing_errors}
+            entry.status = (
+                DataSourceEntryStatus.READY if not document.processing_errors else DataSourceEntryStatus.FAILED
+            )
+            entry.save(update_fields=["config", "size", "status", "updated_at"])
+
+        if document.processing_errors:
+            _save_entry(None)
+        else:
+            pipeline_obj.on_flush(_save_entry)
 
         context = {}
         if request:
             context["request_user"] = request.user
         return DRFResponse(DataSourceEntrySerializer(instance=entry, context=context).data)
 
-    def resync(self, request, uid):
+    def resync_entry(self, entry, pipeline):
+        """
+        Resyncs the entry, only embedding and writing the nodes that changed. Returns the counts of changed,
+        unchanged and removed nodes
+        """
+        previous_config = entry.config
+        document = DataDocument(**{**entry.config, "processing_errors": None})
+        stats = {"changed": 0, "unchanged": 0, "removed": 0}
+        try:
+            document, stats = pipeline.resync(document)
+            entry.config = {
+                **document.model_dump(
+                    include=[
+                        "name",
+                        "text_objref",
+                        "content",
+                        "mimetype",
+                        "metadata",
+                        "extra_info",
+                        "processing_errors",
+                        "request_data",
+                        "datasource_uuid",
+                        "node_ids",
+                        "content_hash",
+                        "node_hashes",
+                    ]
+                ),
+            }
+            entry.size = len(document.node_ids) * 1536
+        except Exception as e:
+            logger.exception(f"Error resyncing datasource entry {entry.uuid}")
+            document.processing_errors = [str(e)]
+            entry.config = {**entry.config, "processing_errors": document.processing_errors}
+
+        def _save_entry(flush_error):
+            if flush_error:
+                # The destination may hold the previous nodes, the new ones or both. Keeping every node ID and
+                # dropping the hashes makes the next resync replace all of them
+                document.processing_errors = [str(flush_error)]
+                node_ids = list(previous_config.get("node_ids") or [])
+                node_ids += [node_id for node_id in document.node_ids or [] if node_id not in node_ids]
+                entry.config = {
+                    **previous_config,
+                    "node_ids": node_ids,
+                    "content_hash": None,
+                    "node_hashes": None,
+                    "processing_errors": document.processing_errors,
+                }
+            entry.status = (
+                DataSourceEntryStatus.READY if not document.processing_errors else DataSourceEntryStatus.FAILED
+            )
+            entry.save(update_fields=["config", "size", "status", "updated_at"])
+
+        if document.processing_errors:
+            _save_entry(None)
+        else:
+            pipeline.on_flush(_save_entry)
+        return stats
+
+    def resync(self, request, uid, pipeline=None):
         datasource_entry_object = get_object_or_404(DataSourceEntry, uuid=uuid.UUID(uid))
 
         if datasource_entry_object.datasource.owner != request.user:
@@ -355,19 +430,21 @@ class DataSourceEntryViewSet(viewsets.ModelViewSet):
 
         old_size = datasource_entry_object.size
 
-        entry_config = {**datasource_entry_object.config}
-        document = DataDocument(**entry_config)
-
-        pipeline = datasource_entry_object.datasource.create_data_ingestion_pipeline()
+        pipeline = pipeline or datasource_entry_object.datasource.create_data_ingestion_pipeline()
+        stats = self.resync_entry(datasource_entry_object, pipeline)
 
-        pipeline.delete_entry(document=document)
-        result = self.process_entry(request, uid)
-
-        new_size = result.data["size"]
-        datasource_entry_object.datasource.size = max(datasource_entry_object.datasource.size - old_size + new_size, 0)
-        datasource_entry_object.datasource.save()
+        datasource = datasource_entry_object.datasource
+        datasource.size = max(datasource.size - old_size + datasource_entry_object.size, 0)
+        datasource.save()
 
-        return self.process_entry(request, uid)
+        return DRFResponse(
+            {
+                **DataSourceEntrySerializer(
+                    instance=datasource_entry_object, context={"request_user": request.user}
+                ).data,
+                "resync_stats": stats,
+            }
+        )
 
     def resync_async(self, request, uid):
         job = AddDataSourceEntryJob.create(
@@ -597,10 +674,15 @@ class DataSourceViewSet(viewsets.ModelViewSet):
             return DRFResponse({"errors": ["No source_data provided"]}, status=400)
 
         documents = self.process_add_entry_request(datasource, source_data, request=request)
-        for document in documents:
-            create_result = DataSourceEntryViewSet().create_entry(user=request.user, document=document)
-            process_result = DataSourceEntryViewSet().process_entry(request=None, uid=str(create_result.data["uuid"]))
-            datasource.size += process_result.data["size"]
+        # Entries share one pipeline so that file backed destinations are written once for the whole request
+        pipeline = datasource.create_data_ingestion_pipeline()
+        with pipeline.batch():
+            for document in documents:
+                create_result = DataSourceEntryViewSet().create_entry(user=request.user, document=document)
+                process_result = DataSourceEntryViewSet().process_entry(
+                    request=None, uid=str(create_result.data["uuid"]), pipeline=pipeline
+                )
+                datasource.size += process_result.data["size"]
 
         datasource.save()
 
@@ -626,11 +708,22 @@ class DataSourceViewSet(viewsets.ModelViewSet):
             return DRFResponse(status=403)
 
         entries = DataSourceEntry.objects.filter(datasource=datasource)
-        for entry in entries:
-            DataSourceEntryViewSet().resync(request, str(entry.uuid))
-
+        stats = {"changed": 0, "unchanged": 0, "removed": 0}
+        # Entries share one pipeline so that file backed destinations are written once for the whole datasource
+        pipeline = datasource.create_data_ingestion_pipeline()
+        with pipeline.batch():
+            for entry in entries:
+                result = DataSourceEntryViewSet().resync(request, str(entry.uuid), pipeline=pipeline)
+                for key, value in (result.data or {}).get("resync_stats", {}).items():
+                    stats[key] += value
+
+        datasource.refresh_from_db()
         return DRFResponse(
-            DataSourceSerializer(instance=datasource, context={"request_user": request.user}).data, status=200
+            {
+                **DataSourceSerializer(instance=datasource, context={"request_user": request.user}).data,
+                "resync_stats": stats,
+            },
+            status=200,
         )
 
     def resync_async(self, request, uid):
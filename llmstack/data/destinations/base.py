@@ -38,6 +38,12 @@ class BaseDestination(BaseModel):
     def delete(self, document: DataDocument) -> DataDocument:
         raise NotImplementedError
 
+    def flush(self):
+        """
+        Persists writes buffered by add and delete. Called once per ingestion batch
+        """
+        pass
+
     def search(self, query: str, **kwargs):
         raise NotImplementedError
 
@@ -2,8 +2,9 @@ import base64
 import io
 import json
 import logging
+import os
 import uuid
-from typing import List
+from typing import List, Literal
 
 import pandas as pd
 from llama_index.core.schema import TextNode
@@ -11,6 +12,11 @@ from llama_index.core.vector_stores.types import VectorStoreQueryResult
 from pydantic import BaseModel, Field, PrivateAttr
 
 from llmstack.data.destinations.base import BaseDestination
+from llmstack.data.destinations.stores.working_copy import (
+    WorkingCopyCache,
+    get_working_copy_cache_size,
+    update_asset_version,
+)
 from llmstack.data.sources.base import DataDocument
 
 logger = logging.getLogger(__name__)
@@ -22,6 +28,31 @@ def create_empty_csv(headers=[]):
     return f"data:text/csv;name={filename};base64,{empty_str}"
 
 
+def create_empty_parquet(headers=[]):
+    filename = f"pandas_destination_{str(uuid.uuid4())[:4]}.parquet"
+    buffer = io.BytesIO()
+    pd.DataFrame(columns=headers).to_parquet(buffer, index=False)
+    empty_str = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return f"data:application/vnd.apache.parquet;name={filename};base64,{empty_str}"
+
+
+def is_parquet_asset(asset):
+    return asset.metadata.get("file_name", "").endswith(".parquet")
+
+
+def read_dataframe_from_asset(asset):
+    with asset.file.open("rb") as f:
+        file_content = io.BytesIO(f.read())
+    if is_parquet_asset(asset):
+        return pd.read_parquet(file_content)
+    return pd.read_csv(file_content)
+
+
+# Parsed dataframes of the pandas destinations in the process. They are shared by destinations and never modified
+# in place
+_working_copies = WorkingCopyCache("pandas_destination_working_copies", maxsize=get_working_copy_cache_size())
+
+
 def create_destination_document_asset(file, document_id, datasource_uuid):
     from llmstack.data.models import DataSourceEntryFiles
 
@@ -59,9 +90,15 @@ class PandasStore(BaseDestination):
     mapping: List[MappingEntry] = Field(
         description="Mapping for the table", default=[MappingEntry(source="text", target="text")]
     )
+    file_format: Literal["csv", "parquet"] = Field(
+        description="Format the table is stored in. Parquet is columnar and faster to load for large tables",
+        default="csv",
+    )
 
     _asset = PrivateAttr(default=None)
     _dataframe = PrivateAttr(default=None)
+    _pending_rows = PrivateAttr(default_factory=list)
+    _dirty = PrivateAttr(default=False)
     _name = PrivateAttr(default="pandas")
 
     @classmethod
@@ -79,17 +116,18 @@ class PandasStore(BaseDestination):
         asset = get_destination_document_asset_by_document_id(document_id)
 
         if asset is None:
-            file = create_empty_csv(headers=[schema_entry.name for schema_entry in self.schema])
+            headers = [schema_entry.name for schema_entry in self.schema]
+            if self.file_format == "parquet":
+                file = create_empty_parquet(headers=headers)
+            else:
+                file = create_empty_csv(headers=headers)
             self._asset = create_destination_document_asset(file, document_id, str(datasource.uuid))
         else:
             self._asset = asset
 
-        file_content = io.BytesIO(self._asset.file.read())
-        self._dataframe = pd.read_csv(file_content)
+        self._dataframe = _working_copies.get(self._asset, lambda: read_dataframe_from_asset(self._asset))
 
     def add(self, document):
-        filename = self._asset.metadata.get("file_name")
-
         ids = [r.node_id for r in document.nodes]
         extra_data = {
             k: v for k, v in document.extra_info.get("extra_data", {}).items() if k in [m.target for m in self.mapping]
@@ -117,24 +155,50 @@ class PandasStore(BaseDestination):
                 "id": node.id_,
                 **{mapping.source: document_dict.get(mapping.target) for mapping in self.mapping},
             }
-            self._dataframe = self._dataframe._append(entry_dict, ignore_index=True)
+            self._pending_rows.append(entry_dict)
 
-        buffer = io.BytesIO()
-        self._dataframe.to_csv(buffer, index=False)
-        buffer.seek(0)
-        self._asset.update_file(buffer.getvalue(), filename)
+        self._dirty = True
         return ids
 
     def delete(self, document: DataDocument):
-        buffer = io.BytesIO()
-        filename = self._asset.metadata.get("file_name")
-        for node_id in document.node_ids:
-            self._dataframe = self._dataframe[self._dataframe["id"] != node_id]
+        node_ids = set(document.node_ids)
+        self._pending_rows = [row for row in self._pending_rows if row["id"] not in node_ids]
+        self._dataframe = self._dataframe[~self._dataframe["id"].isin(node_ids)]
+        self._dirty = True
+
+    def flush(self):
+        """
+        Appends the rows added since the last flush and uploads the table once per ingestion batch
+        """
+        if not self._dirty:
+            return
+
+        if self._pending_rows:
+            self._dataframe = pd.concat([self._dataframe, pd.DataFrame(self._pending_rows)], ignore_index=True)
+            self._pending_rows = []
 
+        filename = self._asset.metadata.get("file_name")
+        name, extension = os.path.splitext(filename)
         buffer = io.BytesIO()
-        self._dataframe.to_csv(buffer, index=False)
-        buffer.seek(0)
-        self._asset.update_file(buffer.getvalue(), filename)
+        if self.file_format == "parquet":
+            self._dataframe.to_parquet(buffer, index=False)
+            extension, mime_type = ".parquet", "application/vnd.apache.parquet"
+        else:
+            self._dataframe.to_csv(buffer, index=False)
+            extension, mime_type = ".csv", "text/csv"
+        filename = f"{name}{extension}"
+
+        version = update_asset_version(
+            self._asset, buffer.getvalue(), filename, metadata={"file_name": filename, "mime_type": mime_type}
+        )
+        _working_copies.put(self._asset, self._dataframe, version=version)
+        self._dirty = False
+
+    def close_client(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.exception(f"Error flushing pandas store {e}")
 
     def search(self, query: str, **kwargs):
         result = self._dataframe.query(query).to_dict(orient="records")
@@ -148,7 +212,10 @@ class PandasStore(BaseDestination):
         return self._store.create_collection()
 
     def delete_collection(self):
+        self._pending_rows = []
+        self._dirty = False
         if self._asset:
+            _working_copies.invalidate(self._asset)
             self._asset.file.delete()
             self._asset.delete()
 
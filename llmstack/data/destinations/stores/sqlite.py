@@ -1,8 +1,8 @@
 import base64
-import io
 import json
 import logging
 import os
+import shutil
 import sqlite3
 import uuid
 from typing import List, Literal, Optional, Union
@@ -12,10 +12,20 @@ from llama_index.core.vector_stores.types import VectorStoreQueryResult
 from pydantic import BaseModel, Field, PrivateAttr
 
 from llmstack.data.destinations.base import BaseDestination
+from llmstack.data.destinations.stores.working_copy import (
+    AssetVersionConflict,
+    WorkingCopyCache,
+    get_asset_version,
+    get_working_copy_cache_size,
+    update_asset_version,
+)
 from llmstack.data.sources.base import DataDocument
 
 logger = logging.getLogger(__name__)
 
+# Flushes replay their writes onto the latest database this many times when another process uploads it first
+SQLITE_FLUSH_ATTEMPTS = 3
+
 
 def create_empty_sqlite_db():
     filename = f"sqlite_{str(uuid.uuid4())[:4]}.db"
@@ -44,13 +54,33 @@ def get_destination_document_asset_by_document_id(document_id):
 def create_temp_file_from_asset(asset):
     import tempfile
 
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.write(asset.file.read())
-    temp_file.flush()
-    temp_file.seek(0)
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    with temp_file:
+        shutil.copyfileobj(asset.file.open("rb"), temp_file)
+    asset.file.close()
     return temp_file.name
 
 
+def copy_database(database):
+    import tempfile
+
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    with temp_file, open(database, "rb") as f:
+        shutil.copyfileobj(f, temp_file)
+    return temp_file.name
+
+
+def remove_database(database):
+    if database and os.path.exists(database):
+        os.remove(database)
+
+
+# Local copies of the sqlite databases, shared by all SqliteDatabase destinations in the process
+_working_copies = WorkingCopyCache(
+    "sqlite_destination_working_copies", maxsize=get_working_copy_cache_size(), on_evict=remove_database
+)
+
+
 def get_sqlite_data_type(_type: str):
     if _type == "string":
         return "TEXT"
@@ -75,21 +105,35 @@ class FullTextSearchPlugin(BaseModel):
     type: Literal["fts5"] = "fts5"
 
 
+def get_database_from_asset(asset):
+    """
+    Returns the path to the process local copy of the database in the asset
+    """
+    return _working_copies.get(asset, lambda: create_temp_file_from_asset(asset))
+
+
 def load_database_from_asset(asset):
-    local_db = create_temp_file_from_asset(asset)
-    conn = sqlite3.connect(local_db)
+    local_db = get_database_from_asset(asset)
+    try:
+        conn = sqlite3.connect(f"file:{local_db}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        # The copy was evicted by another thread, load it again
+        _working_copies.invalidate(asset)
+        local_db = get_database_from_asset(asset)
+        conn = sqlite3.connect(f"file:{local_db}?mode=ro", uri=True)
     return conn, local_db
 
 
-def update_asset_from_database(asset, database):
-    # Read the database content
-    buffer = io.BytesIO()
+def update_asset_from_database(asset, database, expected_version=None):
+    """
+    Uploads the database to the asset and makes it the process local copy for the new version. Raises
+    AssetVersionConflict if expected_version is set and the asset has a different version
+    """
     with open(database, "rb") as f:
-        buffer.write(f.read())
-    buffer.seek(0)
-    asset.update_file(buffer.getvalue(), asset.metadata.get("file_name"))
-    # Delete the temporary file
-    os.remove(database)
+        version = update_asset_version(
+            asset, f.read(), asset.metadata.get("file_name"), expected_version=expected_version
+        )
+    _working_copies.put(asset, database, version=version)
 
 
 class SqliteDatabase(BaseDestination):
@@ -109,6 +153,7 @@ class SqliteDatabase(BaseDestination):
 
     _asset = PrivateAttr(default=None)
     _name = PrivateAttr(default="sqlite")
+    _writer = PrivateAttr(default=None)
 
     @classmethod
     def slug(cls):
@@ -130,10 +175,7 @@ class SqliteDatabase(BaseDestination):
         else:
             self._asset = asset
 
-    def add(self, document):
-        conn, local_db = load_database_from_asset(self._asset)
-        c = conn.cursor()
-
+    def _create_table(self, conn):
         create_table_query = f"CREATE TABLE IF NOT EXISTS {self.table_name} ({','.join([f'{item.name} {get_sqlite_data_type(item.type)}' for item in self.schema])})"
         if self.search_plugin:
             if self.search_plugin.type == "fts5":
@@ -147,42 +189,113 @@ class SqliteDatabase(BaseDestination):
 
                 create_table_query = f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table_name} USING vec0({','.join([f'{item.name} {get_sqlite_data_type(item.type)}' for item in self.schema])}, embedding float[1536])"
 
-        c.execute(create_table_query)
+        conn.execute(create_table_query)
 
+    def _open_writer(self):
+        # Writes go to a private copy of the latest version of the database, which flush uploads if the asset is
+        # still at that version
+        self._asset.refresh_from_db()
+        version = get_asset_version(self._asset)
+        local_db = copy_database(get_database_from_asset(self._asset))
+        conn = sqlite3.connect(local_db)
         try:
-            for node in document.nodes:
-                document_dict = {"text": node.text, "metadata_json": json.dumps(node.metadata)}
-                for schema_entry in self.schema:
-                    if schema_entry.name == "id" or schema_entry.name == "text" or schema_entry.name == "metadata_json":
-                        continue
-                    if schema_entry.name in node.metadata:
-                        document_dict[schema_entry.name] = node.metadata[schema_entry.name]
-                if self.search_plugin and self.search_plugin.type == "semantic":
-                    document_dict["embedding"] = node.embedding
-
-                entry_dict = {"id": node.id_, **document_dict}
-                c.execute(
-                    f"INSERT INTO {self.table_name} ({','.join(entry_dict.keys())}) VALUES ({','.join(['?'] * len(entry_dict))})",
-                    list(entry_dict.values()),
-                )
+            self._create_table(conn)
+        except Exception:
+            conn.close()
+            remove_database(local_db)
+            raise
+        # The writes are kept so that they can be replayed if another process uploads the database first
+        return conn, local_db, version, []
+
+    def _get_writer(self):
+        if self._writer is None:
+            self._writer = self._open_writer()
+        return self._writer[0]
+
+    def _write(self, query, rows):
+        conn = self._get_writer()
+        try:
+            conn.executemany(query, rows)
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        self._writer[3].append((query, rows))
+
+    def _discard_writer(self):
+        if self._writer is not None:
+            conn, local_db, _, _ = self._writer
+            self._writer = None
             conn.close()
+            remove_database(local_db)
+
+    def add(self, document):
+        columns = ["id", "text", "metadata_json"]
+        metadata_columns = [entry.name for entry in self.schema if entry.name not in columns]
+        columns += metadata_columns
+        is_semantic = self.search_plugin and self.search_plugin.type == "semantic"
+        if is_semantic:
+            columns.append("embedding")
+
+        rows = []
+        for node in document.nodes:
+            row = [node.id_, node.text, json.dumps(node.metadata)]
+            row += [node.metadata.get(name) for name in metadata_columns]
+            if is_semantic:
+                row.append(node.embedding)
+            rows.append(row)
+
+        # All nodes of the document are inserted in one transaction
+        try:
+            self._write(
+                f"INSERT INTO {self.table_name} ({','.join(columns)}) VALUES ({','.join(['?'] * len(columns))})",
+                rows,
+            )
         except Exception as e:
             logger.exception(f"Error adding nodes to sqlite store {e}")
             raise e
 
-        update_asset_from_database(self._asset, local_db)
         ids = [r.node_id for r in document.nodes]
         return ids
 
     def delete(self, document: DataDocument):
-        conn, local_db = load_database_from_asset(self._asset)
-        c = conn.cursor()
-        for node_id in document.node_ids:
-            c.execute(f"DELETE FROM {self.table_name} WHERE id = ?", (node_id,))
-        conn.commit()
-        conn.close()
-        update_asset_from_database(self._asset, local_db)
+        self._write(f"DELETE FROM {self.table_name} WHERE id = ?", [(node_id,) for node_id in document.node_ids])
+
+    def flush(self):
+        """
+        Uploads the database once all the documents of an ingestion batch are written. If another process
+        uploaded the database since the writer copied it, the writes are replayed onto the latest version
+        """
+        for attempt in range(SQLITE_FLUSH_ATTEMPTS):
+            if self._writer is None:
+                return
+
+            conn, local_db, version, writes = self._writer
+            try:
+                conn.close()
+                update_asset_from_database(self._asset, local_db, expected_version=version)
+                self._writer = None
+                return
+            except AssetVersionConflict:
+                self._writer = None
+                remove_database(local_db)
+                if attempt == SQLITE_FLUSH_ATTEMPTS - 1:
+                    raise
+                logger.info(f"Sqlite store {self._name} was updated by another process, replaying writes")
+                self._writer = self._open_writer()
+                for query, rows in writes:
+                    self._write(query, rows)
+            except Exception:
+                self._writer = None
+                remove_database(local_db)
+                raise
+
+    def close_client(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.exception(f"Error flushing sqlite store {e}")
+            self._discard_writer()
 
     def search(self, query: str, **kwargs):
         conn, _ = load_database_from_asset(self._asset)
@@ -199,7 +312,9 @@ class SqliteDatabase(BaseDestination):
         pass
 
     def delete_collection(self):
+        self._discard_writer()
         if self._asset:
+            _working_copies.invalidate(self._asset)
             self._asset.file.delete()
             self._asset.delete()
 
@@ -0,0 +1,140 @@
+"""
+Process local working copies of the assets that back file based destinations.
+
+Stores like SqliteDatabase and PandasStore keep their table in an asset. Downloading and parsing the asset on every
+query is expensive, so each process keeps a working copy per asset and reloads it only when the asset's version
+changes. Stores bump the version every time they upload their table.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+def get_asset_version(asset) -> str:
+    """
+    Returns the version of the asset. Assets written before versions were tracked are identified by their file
+    name and size
+    """
+    version = (asset.metadata or {}).get("version")
+    if version:
+        return version
+    return f"{asset.file.name}:{(asset.metadata or {}).get('file_size')}"
+
+
+class AssetVersionConflict(Exception):
+    """
+    Raised when an asset was uploaded by someone else since the version an update was based on
+    """
+
+
+def update_asset_version(asset, file_bytes, filename, metadata=None, expected_version=None):
+    """
+    Uploads file_bytes as the asset's file with a new version and returns the version. When expected_version is
+    set, the asset row is locked and the upload is only made if the stored asset is still at that version, and
+    AssetVersionConflict is raised otherwise
+    """
+    with transaction.atomic():
+        if expected_version is not None:
+            type(asset).objects.select_for_update().filter(pk=asset.pk).first()
+            asset.refresh_from_db()
+            if get_asset_version(asset) != expected_version:
+                raise AssetVersionConflict(
+                    f"Asset {asset.uuid} is at version {get_asset_version(asset)}, expected {expected_version}"
+                )
+
+        version = str(uuid.uuid4())
+        asset.metadata = {**(asset.metadata or {}), **(metadata or {}), "version": version}
+        asset.update_file(file_bytes, filename)
+    return version
+
+
+class WorkingCopyCache:
+    """
+    A thread safe, bounded LRU cache of working copies keyed by asset UUID. Each entry remembers the version of
+    the asset it was loaded from and is reloaded once the asset has a different version. on_evict is called with
+    the working copies that are replaced or evicted
+    """
+
+    def __init__(self, name: str, maxsize: int, on_evict: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self._on_evict = on_evict
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Loads are serialized so that concurrent misses for an asset download it once
+        self._load_lock = threading.Lock()
+        self._hits = metrics_registry.counter(f"{name}.hits", f"Working copies served from the {name}")
+        self._misses = metrics_registry.counter(f"{name}.misses", f"Working copies loaded into the {name}")
+        metrics_registry.gauge(f"{name}.size", f"Number of working copies in the {name}", fn=lambda: len(self._data))
+
+    def _evict(self, value: Any) -> None:
+        if self._on_evict:
+            try:
+                self._on_evict(value)
+            except Exception as e:
+                logger.warning(f"Error evicting working copy from {self.name}: {e}")
+
+    def get(self, asset, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the working copy for the current version of asset, loading it if needed
+        """
+        key, version = str(asset.uuid), get_asset_version(asset)
+        value = self._get(key, version)
+        if value is not None:
+            self._hits.inc()
+            return value
+
+        with self._load_lock:
+            value = self._get(key, version)
+            if value is None:
+                self._misses.inc()
+                value = loader()
+                self.put(asset, value, version=version)
+        return value
+
+    def _get(self, key: str, version: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == version:
+                self._data.move_to_end(key)
+                return entry[1]
+        return None
+
+    def put(self, asset, value: Any, version: Optional[str] = None) -> None:
+        """
+        Stores value as the working copy for asset at version, which defaults to the asset's current version
+        """
+        key = str(asset.uuid)
+        version = version or get_asset_version(asset)
+        evicted = []
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None and entry[1] is not value:
+                evicted.append(entry[1])
+            self._data[key] = (version, value)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[1][1])
+
+        for evicted_value in evicted:
+            self._evict(evicted_value)
+
+    def invalidate(self, asset) -> None:
+        with self._lock:
+            entry = self._data.pop(str(asset.uuid), None)
+
+        if entry is not None:
+            self._evict(entry[1])
+
+
+def get_working_copy_cache_size() -> int:
+    return getattr(settings, "DATA_DESTINATION_WORKING_COPY_CACHE_SIZE", 32)
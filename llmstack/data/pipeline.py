@@ -1,5 +1,8 @@
+import hashlib
+import json
 import logging
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
 
 from llama_index.core.ingestion import IngestionPipeline
 from llama_index.core.schema import Document as LlamaDocument
@@ -16,6 +19,10 @@ class LlamaDocumentShim(LlamaDocument):
     mimetype: str = "text/plain"
 
 
+def _hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
 class DataIngestionPipeline:
     def __init__(self, datasource):
         self.datasource = datasource
@@ -23,6 +30,9 @@ class DataIngestionPipeline:
         self._destination_cls = self.datasource.pipeline_obj.destination_cls
 
         self._destination = None
+        self._batch_depth = 0
+        self._flush_callbacks = []
+        self._embedding = None
         self._transformations = self.datasource.pipeline_obj.transformation_objs
         embedding_cls = self.datasource.pipeline_obj.embedding_cls
         if embedding_cls:
@@ -30,14 +40,23 @@ class DataIngestionPipeline:
                 **self.datasource.pipeline_obj.embedding.data.get("additional_kwargs", {}),
                 **{"datasource": datasource},
             }
-            self._transformations.append(
-                embedding_cls(
-                    **{
-                        **self.datasource.pipeline_obj.embedding.data,
-                        **{"additional_kwargs": embedding_additional_kwargs},
-                    }
-                )
+            self._embedding = embedding_cls(
+                **{
+                    **self.datasource.pipeline_obj.embedding.data,
+                    **{"additional_kwargs": embedding_additional_kwargs},
+                }
             )
+            self._transformations.append(self._embedding)
+
+        # Content and node hashes change with the transformation and embedding config, so that changing either
+        # reprocesses every node on resync
+        pipeline_config = self.datasource.config.get("pipeline", {})
+        self._config_hash = _hash(
+            {
+                "transformations": pipeline_config.get("transformations"),
+                "embedding": pipeline_config.get("embedding"),
+            }
+        )
 
         if self._destination_cls:
             self._destination = self._destination_cls(**self.datasource.pipeline_obj.destination_data)
@@ -47,25 +66,138 @@ class DataIngestionPipeline:
         if self._destination:
             self._destination.close_client()
 
-    def process(self, document: DataDocument) -> DataDocument:
-        document = self._source_cls.process_document(document)
-        ingestion_pipeline = IngestionPipeline(transformations=self._transformations)
+    def _get_content_hash(self, document: DataDocument) -> str:
+        return _hash([self._config_hash, document.text if document.text is not None else document.content])
+
+    def _get_node_hash(self, node) -> str:
+        return _hash([self._config_hash, node.text, node.metadata])
+
+    def _run_transformations(self, document: DataDocument, transformations) -> List:
+        ingestion_pipeline = IngestionPipeline(transformations=transformations)
         ldoc = LlamaDocumentShim(**document.model_dump())
         ldoc.metadata = {**ldoc.metadata, **document.metadata}
-        document.nodes = ingestion_pipeline.run(documents=[ldoc])
+        return ingestion_pipeline.run(documents=[ldoc])
+
+    def process(self, document: DataDocument) -> DataDocument:
+        document = self._source_cls.process_document(document)
+        document.nodes = self._run_transformations(document, self._transformations)
         document.node_ids = list(map(lambda x: x.id_, document.nodes))
+        document.content_hash = self._get_content_hash(document)
+        document.node_hashes = {node.id_: self._get_node_hash(node) for node in document.nodes}
 
         if self._destination:
             self._destination.add(document=document)
+            if not self._batch_depth:
+                self._destination.flush()
 
         return document
 
     def delete_entry(self, document: DataDocument) -> None:
         if self._destination:
             self._destination.delete(document=document)
+            if not self._batch_depth:
+                self._destination.flush()
 
-    def resync_entry(self, data: dict):
-        raise NotImplementedError
+    def on_flush(self, callback: Callable[[Optional[Exception]], None]) -> None:
+        """
+        Calls callback once the documents written so far are flushed to the destination, with the exception the
+        flush raised if it failed. Outside of a batch every write is flushed as it happens, so callback runs
+        right away
+        """
+        if not self._batch_depth:
+            callback(None)
+        else:
+            self._flush_callbacks.append(callback)
+
+    def _run_flush_callbacks(self, error: Optional[Exception]) -> None:
+        callbacks, self._flush_callbacks = self._flush_callbacks, []
+        for callback in callbacks:
+            try:
+                callback(error)
+            except Exception:
+                logger.exception("Error running flush callback")
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers flushing the destination until all the documents processed or deleted in the block are written
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                try:
+                    if self._destination:
+                        self._destination.flush()
+                except Exception as e:
+                    self._run_flush_callbacks(e)
+                    raise
+                self._run_flush_callbacks(None)
+
+    def resync(self, document: DataDocument) -> Tuple[DataDocument, Dict[str, int]]:
+        """
+        Reprocesses a document that was processed before. Nodes whose content hash hasn't changed keep their
+        IDs and embeddings, only new and changed nodes are embedded and added, and nodes that no longer exist
+        are deleted. Returns the document and the counts of changed, unchanged and removed nodes
+        """
+        previous_node_ids = list(document.node_ids or [])
+        previous_node_hashes = {
+            node_id: (document.node_hashes or {})[node_id]
+            for node_id in previous_node_ids
+            if node_id in (document.node_hashes or {})
+        }
+        previous_content_hash = document.content_hash
+
+        document = self._source_cls.process_document(document)
+        document.content_hash = self._get_content_hash(document)
+        if previous_content_hash == document.content_hash and len(previous_node_hashes) == len(previous_node_ids):
+            document.nodes = []
+            return document, {"changed": 0, "unchanged": len(previous_node_ids), "removed": 0}
+
+        # Split without embedding, so that only the nodes that changed are embedded
+        splitters = [t for t in self._transformations if t is not self._embedding]
+        nodes = self._run_transformations(document, splitters)
+
+        previous_ids_by_hash = {}
+        for node_id in previous_node_ids:
+            if node_id in previous_node_hashes:
+                previous_ids_by_hash.setdefault(previous_node_hashes[node_id], []).append(node_id)
+
+        node_ids, node_hashes, changed_nodes = [], {}, []
+        for node in nodes:
+            node_hash = self._get_node_hash(node)
+            if previous_ids_by_hash.get(node_hash):
+                node_id = previous_ids_by_hash[node_hash].pop(0)
+            else:
+                node_id = node.id_
+                changed_nodes.append(node)
+            node_ids.append(node_id)
+            node_hashes[node_id] = node_hash
+
+        removed_node_ids = [node_id for node_id in previous_node_ids if node_id not in node_hashes]
+
+        if changed_nodes and self._embedding:
+            changed_nodes = self._embedding(changed_nodes)
+
+        document.nodes = changed_nodes
+        document.node_ids = node_ids
+        document.node_hashes = node_hashes
+
+        if self._destination:
+            if removed_node_ids:
+                self._destination.delete(document=DataDocument(node_ids=removed_node_ids))
+            if changed_nodes:
+                self._destination.add(document=document)
+            if not self._batch_depth:
+                self._destination.flush()
+
+        return document, {
+            "changed": len(changed_nodes),
+            "unchanged": len(node_ids) - len(changed_nodes),
+            "removed": len(removed_node_ids),
+        }
 
     def delete_all_entries(self) -> None:
         if self._destination:
@@ -95,17 +227,39 @@ class DataQueryPipeline:
         if self._destination:
             self._destination.close_client()
 
-    def search(self, query: str, use_hybrid_search=True, **kwargs) -> List[dict]:
+    @property
+    def embedding_key(self) -> Optional[Tuple]:
+        """
+        Identifies the embedding model and the owner whose provider configs are used to embed queries.
+        Pipelines with the same key produce the same query embedding
+        """
+        if not self._embedding_generator:
+            return None
+
+        embedding = self.datasource.pipeline_obj.embedding
+        embedding_data = {key: value for key, value in embedding.data.items() if key != "additional_kwargs"}
+        return (
+            embedding.provider_slug,
+            embedding.slug,
+            json.dumps(embedding_data, sort_keys=True, default=str),
+            self.datasource.owner_id,
+        )
+
+    def get_query_embedding(self, query: str) -> Optional[List[float]]:
+        if self._embedding_generator:
+            return self._embedding_generator.get_embedding(query)
+        return None
+
+    def search(self, query: str, use_hybrid_search=True, query_embedding=None, **kwargs) -> List[dict]:
         content_key = self.datasource.destination_text_content_key
-        query_embedding = None
 
         if kwargs.get("search_filters", None):
             raise NotImplementedError("Search filters are not supported for this data source.")
 
         documents = []
 
-        if self._embedding_generator:
-            query_embedding = self._embedding_generator.get_embedding(query)
+        if query_embedding is None:
+            query_embedding = self.get_query_embedding(query)
 
         if self._destination:
             query_result = self._destination.search(
@@ -24,6 +24,8 @@ class DataDocument(BaseModel):
     datasource_uuid: Optional[str] = None
     request_data: Optional[dict] = {}
     node_ids: Optional[List[str]] = []
+    content_hash: Optional[str] = Field(default=None, description="Hash of the processed content of the document.")
+    node_hashes: Optional[dict] = Field(default={}, description="Hash of the content of each node by node ID.")
 
 
 class ExtraData(BaseModel):
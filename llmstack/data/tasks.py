@@ -70,8 +70,9 @@ def process_datasource_resync_request(user_email, datasource_uuid, **kwargs):
         format="json",
     )
     request.user = user
-    DataSourceViewSet().resync(request, datasource_uuid)
+    response = DataSourceViewSet().resync(request, datasource_uuid)
 
     return {
-        "status_code": 200,
+        "status_code": response.status_code,
+        "resync_stats": (response.data or {}).get("resync_stats"),
     }
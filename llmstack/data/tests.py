@@ -1 +1,281 @@
-# Create your tests here.
+import io
+import sqlite3
+import tempfile
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from llmstack.data.destinations.stores.sqlite import SqliteDatabase
+from llmstack.data.destinations.stores.working_copy import (
+    AssetVersionConflict,
+    WorkingCopyCache,
+)
+from llmstack.data.pipeline import DataIngestionPipeline
+from llmstack.data.sources.base import DataDocument
+
+
+def _asset(uuid, version):
+    return SimpleNamespace(uuid=uuid, metadata={"version": version}, file=None)
+
+
+class WorkingCopyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.evicted = []
+        self.cache = WorkingCopyCache(f"test_working_copy_cache_{id(self)}", maxsize=2, on_evict=self.evicted.append)
+
+    def test_reloads_when_version_changes(self):
+        self.assertEqual(self.cache.get(_asset("a", "1"), lambda: "a1"), "a1")
+        self.assertEqual(self.cache.get(_asset("a", "1"), lambda: "unused"), "a1")
+        self.assertEqual(self.cache.get(_asset("a", "2"), lambda: "a2"), "a2")
+        self.assertEqual(self.evicted, ["a1"])
+
+    def test_put_stores_the_uploaded_version(self):
+        self.cache.get(_asset("a", "1"), lambda: "a1")
+        self.cache.put(_asset("a", "2"), "a2")
+
+        self.assertEqual(self.cache.get(_asset("a", "2"), lambda: "unused"), "a2")
+        self.assertEqual(self.evicted, ["a1"])
+
+    def test_evicts_least_recently_used(self):
+        self.cache.get(_asset("a", "1"), lambda: "a1")
+        self.cache.get(_asset("b", "1"), lambda: "b1")
+        self.cache.get(_asset("a", "1"), lambda: "unused")
+        self.cache.get(_asset("c", "1"), lambda: "c1")
+
+        self.assertEqual(self.evicted, ["b1"])
+        self.cache.invalidate(_asset("a", "1"))
+        self.assertEqual(self.evicted, ["b1", "a1"])
+
+
+class _Destination:
+    def __init__(self, error=None):
+        self.error = error
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        if self.error:
+            raise self.error
+
+    def close_client(self):
+        pass
+
+
+class DataIngestionPipelineBatchTest(unittest.TestCase):
+    def _pipeline(self, destination):
+        pipeline = DataIngestionPipeline.__new__(DataIngestionPipeline)
+        pipeline._destination = destination
+        pipeline._batch_depth = 0
+        pipeline._flush_callbacks = []
+        return pipeline
+
+    def test_flush_callbacks_run_after_the_batch_is_flushed(self):
+        destination, errors = _Destination(), []
+        pipeline = self._pipeline(destination)
+
+        with pipeline.batch():
+            with pipeline.batch():
+                pipeline.on_flush(errors.append)
+            pipeline.on_flush(errors.append)
+            self.assertEqual((destination.flushes, errors), (0, []))
+
+        self.assertEqual((destination.flushes, errors), (1, [None, None]))
+
+        pipeline.on_flush(errors.append)
+        self.assertEqual(errors, [None, None, None])
+
+    def test_flush_callbacks_get_the_flush_error(self):
+        error, errors = RuntimeError("upload failed"), []
+        pipeline = self._pipeline(_Destination(error))
+
+        with self.assertRaises(RuntimeError):
+            with pipeline.batch():
+                pipeline.on_flush(errors.append)
+
+        self.assertEqual(errors, [error])
+
+
+class _LineSplitPipeline(DataIngestionPipeline):
+    """
+    Splits documents into one node per line instead of running llama index transformations
+    """
+
+    def _run_transformations(self, document, transformations):
+        nodes = [SimpleNamespace(id_=str(uuid.uuid4()), text=line, metadata={}) for line in document.text.split("\n")]
+        for transformation in transformations:
+            nodes = transformation(nodes)
+        return nodes
+
+
+class _Embedding:
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, nodes):
+        self.embedded.extend(node.text for node in nodes)
+        for node in nodes:
+            node.embedding = [float(len(node.text))]
+        return nodes
+
+
+class _RecordingDestination(_Destination):
+    def __init__(self):
+        super().__init__()
+        self.added = []
+        self.deleted = []
+
+    def add(self, document):
+        self.added.append([node.text for node in document.nodes])
+
+    def delete(self, document):
+        self.deleted.append(list(document.node_ids))
+
+
+class DataIngestionPipelineResyncTest(unittest.TestCase):
+    def setUp(self):
+        self.embedding = _Embedding()
+        self.destination = _RecordingDestination()
+        self.pipeline = _LineSplitPipeline.__new__(_LineSplitPipeline)
+        self.pipeline._source_cls = SimpleNamespace(process_document=lambda document: document)
+        self.pipeline._destination = self.destination
+        self.pipeline._batch_depth = 0
+        self.pipeline._flush_callbacks = []
+        self.pipeline._embedding = self.embedding
+        self.pipeline._transformations = [self.embedding]
+        self.pipeline._config_hash = "config"
+
+    def _process(self, text):
+        document = self.pipeline.process(DataDocument(text=text))
+        self.embedding.embedded, self.destination.added = [], []
+        return document
+
+    def _resync(self, document, text):
+        return self.pipeline.resync(DataDocument(**{**document.model_dump(exclude={"nodes"}), "text": text}))
+
+    def test_unchanged_content_is_not_reprocessed(self):
+        document = self._process("a\nb")
+
+        resynced, stats = self._resync(document, "a\nb")
+
+        self.assertEqual(stats, {"changed": 0, "unchanged": 2, "removed": 0})
+        self.assertEqual(resynced.node_ids, document.node_ids)
+        self.assertEqual((self.embedding.embedded, self.destination.added, self.destination.deleted), ([], [], []))
+
+    def test_only_changed_nodes_are_embedded_and_written(self):
+        document = self._process("a\nb\nc")
+        a_id, b_id, c_id = document.node_ids
+
+        resynced, stats = self._resync(document, "a\nB\nc\nd")
+
+        self.assertEqual(stats, {"changed": 2, "unchanged": 2, "removed": 1})
+        self.assertEqual(resynced.node_ids[0], a_id)
+        self.assertEqual(resynced.node_ids[2], c_id)
+        self.assertEqual(self.embedding.embedded, ["B", "d"])
+        self.assertEqual(self.destination.added, [["B", "d"]])
+        self.assertEqual(self.destination.deleted, [[b_id]])
+        self.assertEqual(set(resynced.node_hashes), set(resynced.node_ids))
+
+    def test_duplicate_nodes_reuse_ids_in_order(self):
+        document = self._process("x\nx")
+
+        resynced, stats = self._resync(document, "x\nx\nx\ny")
+        self.assertEqual(stats, {"changed": 2, "unchanged": 2, "removed": 0})
+        self.assertEqual(resynced.node_ids[:2], document.node_ids)
+        self.assertEqual(self.destination.added, [["x", "y"]])
+
+        resynced, stats = self._resync(resynced, "x")
+        self.assertEqual(stats, {"changed": 0, "unchanged": 1, "removed": 3})
+        self.assertEqual(resynced.node_ids, document.node_ids[:1])
+
+    def test_entries_without_hashes_are_fully_resynced(self):
+        document = self._process("a\nb")
+        document = document.model_copy(update={"content_hash": None, "node_hashes": {}})
+
+        resynced, stats = self._resync(document, "a\nb")
+
+        self.assertEqual(stats, {"changed": 2, "unchanged": 0, "removed": 2})
+        self.assertEqual(self.embedding.embedded, ["a", "b"])
+        self.assertEqual(self.destination.deleted, [document.node_ids])
+        self.assertFalse(set(resynced.node_ids) & set(document.node_ids))
+
+
+class _StoredAsset:
+    """
+    The stored row and file of an asset, shared by the asset objects of different processes
+    """
+
+    def __init__(self, data=b""):
+        self.uuid = uuid.uuid4()
+        self.data = data
+        self.version = "1"
+
+    def update(self, asset, file_bytes, filename, metadata=None, expected_version=None):
+        if expected_version is not None and self.version != expected_version:
+            raise AssetVersionConflict(f"Asset is at version {self.version}, expected {expected_version}")
+        self.data, self.version = file_bytes, str(uuid.uuid4())
+        asset.refresh_from_db()
+        return self.version
+
+
+class _Asset:
+    def __init__(self, stored):
+        self._stored = stored
+        self.uuid = stored.uuid
+        self.refresh_from_db()
+
+    def refresh_from_db(self):
+        self.metadata = {"version": self._stored.version, "file_name": "data.db"}
+        self.file = SimpleNamespace(open=lambda mode: io.BytesIO(self._stored.data), close=lambda: None)
+
+
+def _node(id):
+    return SimpleNamespace(id_=id, node_id=id, text=f"text {id}", metadata={}, embedding=None)
+
+
+class SqliteDatabaseFlushTest(unittest.TestCase):
+    def setUp(self):
+        self.stored = _StoredAsset()
+        patcher = patch("llmstack.data.destinations.stores.sqlite.update_asset_version", self.stored.update)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _store(self):
+        store = SqliteDatabase()
+        store._asset = _Asset(self.stored)
+        return store
+
+    def _stored_ids(self):
+        with tempfile.NamedTemporaryFile(suffix=".db") as f:
+            f.write(self.stored.data)
+            f.flush()
+            conn = sqlite3.connect(f.name)
+            ids = sorted(row[0] for row in conn.execute("SELECT id FROM data"))
+            conn.close()
+        return ids
+
+    def test_concurrent_flushes_keep_both_batches(self):
+        first, second = self._store(), self._store()
+        first.add(SimpleNamespace(nodes=[_node("a1"), _node("a2")]))
+        second.add(SimpleNamespace(nodes=[_node("b1")]))
+        second.delete(SimpleNamespace(node_ids=["b1"]))
+        second.add(SimpleNamespace(nodes=[_node("b2")]))
+
+        first.flush()
+        # Based on the version before the first flush, so its writes are replayed onto the new database
+        second.flush()
+
+        self.assertEqual(self._stored_ids(), ["a1", "a2", "b2"])
+
+    def test_flush_fails_when_conflicts_persist(self):
+        store = self._store()
+        store.add(SimpleNamespace(nodes=[_node("a1")]))
+        with patch(
+            "llmstack.data.destinations.stores.sqlite.update_asset_version",
+            side_effect=AssetVersionConflict("conflict"),
+        ):
+            with self.assertRaises(AssetVersionConflict):
+                store.flush()
+
+        self.assertIsNone(store._writer)
+        self.assertEqual(self.stored.data, b"")
@@ -0,0 +1,94 @@
+"""
+Cache for text embeddings.
+
+Re-syncing a datasource re-embeds every chunk even if most of them haven't changed. Embeddings are cached under a
+hash of the chunk's text, the embedding model and endpoint, and the datasource owner, so unchanged chunks are not
+sent to the provider again.
+"""
+
+import hashlib
+import logging
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import caches
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_CACHE_ALIAS = "embeddings_cache"
+
+
+def _dumps(embedding: List[float]) -> bytes:
+    return array("d", embedding).tobytes()
+
+
+def _loads(value: bytes) -> List[float]:
+    embedding = array("d")
+    embedding.frombytes(value)
+    return embedding.tolist()
+
+
+class EmbeddingsCache:
+    def __init__(self, alias: str = EMBEDDINGS_CACHE_ALIAS):
+        self._alias = alias
+
+        self._hits = metrics_registry.counter("embeddings_cache.hits", "Text embeddings served from cache")
+        self._misses = metrics_registry.counter("embeddings_cache.misses", "Text embeddings not found in cache")
+        self._errors = metrics_registry.counter("embeddings_cache.errors", "Failed embeddings cache reads and writes")
+
+    @property
+    def _cache(self):
+        return caches[self._alias]
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, "EMBEDDINGS_CACHE_ENABLED", True) and self._alias in settings.CACHES
+
+    def get_key(self, scope: str, text: str) -> str:
+        """
+        Key for the embedding of text. scope identifies the model, endpoint and owner the text is embedded for
+        """
+        digest = hashlib.sha256(f"{scope}\n{text}".encode("utf-8")).hexdigest()
+        return f"embedding:{digest}"
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        if not self.enabled or not keys:
+            return {}
+
+        try:
+            values = self._cache.get_many(keys)
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"Error reading embeddings cache: {e}")
+            values = {}
+
+        self._hits.inc(len(values))
+        self._misses.inc(len(keys) - len(values))
+        return {key: _loads(value) for key, value in values.items()}
+
+    def set_many(self, embeddings: Dict[str, List[float]], ttl: Optional[int] = None) -> None:
+        if not self.enabled or not embeddings:
+            return
+
+        try:
+            self._cache.set_many(
+                {key: _dumps(embedding) for key, embedding in embeddings.items()},
+                timeout=ttl or getattr(settings, "EMBEDDINGS_CACHE_TTL", 7 * 24 * 3600),
+            )
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"Error writing embeddings cache: {e}")
+
+
+_embeddings_cache = None
+
+
+def get_embeddings_cache() -> EmbeddingsCache:
+    global _embeddings_cache
+
+    if _embeddings_cache is None:
+        _embeddings_cache = EmbeddingsCache()
+    return _embeddings_cache
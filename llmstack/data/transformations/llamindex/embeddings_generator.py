@@ -1,42 +1,138 @@
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
+import openai
+from django.conf import settings
 from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
 from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 
+from llmstack.common.utils.cache import TTLCache
 from llmstack.data.transformations.llamindex.base import LlamaIndexTransformers
+from llmstack.data.transformations.llamindex.embeddings_cache import (
+    get_embeddings_cache,
+)
 
 logger = logging.getLogger(__name__)
 
+# Texts sent to the provider in one embeddings request and requests in flight at once
+EMBEDDINGS_BATCH_SIZE = getattr(settings, "EMBEDDINGS_BATCH_SIZE", 100)
+EMBEDDINGS_MAX_CONCURRENCY = getattr(settings, "EMBEDDINGS_MAX_CONCURRENCY", 4)
 
-def get_embedding_client(datasource, embedding_provider_slug, embedding_model_name):
-    embedding_model = "text-embedding-ada-002" if embedding_model_name == "ada" else embedding_model_name
+# Times a rate limited or failed request is retried once the client's own retries are exhausted
+EMBEDDINGS_MAX_RETRIES = getattr(settings, "EMBEDDINGS_MAX_RETRIES", 5)
+
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+# Embedding clients keep their HTTP connection pool, so they are shared by all generators in the process
+embedding_client_cache = TTLCache(
+    "embedding_client_cache",
+    maxsize=getattr(settings, "EMBEDDING_CLIENT_CACHE_SIZE", 256),
+    ttl=getattr(settings, "EMBEDDING_CLIENT_CACHE_TTL", 600),
+)
 
-    if not embedding_provider_slug:
-        raise ValueError("embedding_provider_slug is required")
 
+def _get_client_kwargs(datasource, embedding_provider_slug, embedding_model):
     if embedding_provider_slug == "openai":
         provider_config = datasource.profile.get_provider_config(model_slug=embedding_model, provider_slug="openai")
-        return OpenAIEmbedding(
-            api_key=provider_config.api_key, model=embedding_model, api_base=provider_config.base_url
-        )
+        return {"api_key": provider_config.api_key, "model": embedding_model, "api_base": provider_config.base_url}
     elif embedding_provider_slug == "azure-openai":
         provider_config = datasource.profile.get_provider_config(model_slug=embedding_model, provider_slug="azure")
-        return AzureOpenAIEmbedding(
-            model=embedding_model,
-            api_key=provider_config.api_key,
-            azure_endpoint=provider_config.azure_endpoint if provider_config.azure_endpoint else None,
-            deployment_name=provider_config.azure_deployment if provider_config.azure_deployment else None,
-            api_version=provider_config.api_version if provider_config.api_version else "2024-02-01",
-        )
+        return {
+            "model": embedding_model,
+            "api_key": provider_config.api_key,
+            "azure_endpoint": provider_config.azure_endpoint if provider_config.azure_endpoint else None,
+            "deployment_name": provider_config.azure_deployment if provider_config.azure_deployment else None,
+            "api_version": provider_config.api_version if provider_config.api_version else "2024-02-01",
+        }
+    return None
+
+
+def get_embedding_client(datasource, embedding_provider_slug, embedding_model_name):
+    embedding_model = "text-embedding-ada-002" if embedding_model_name == "ada" else embedding_model_name
+
+    if not embedding_provider_slug:
+        raise ValueError("embedding_provider_slug is required")
+
+    client_kwargs = _get_client_kwargs(datasource, embedding_provider_slug, embedding_model)
+    if client_kwargs is None:
+        return None
+
+    client_cls = OpenAIEmbedding if embedding_provider_slug == "openai" else AzureOpenAIEmbedding
+    key = (
+        embedding_provider_slug,
+        hashlib.sha256(json.dumps(client_kwargs, sort_keys=True, default=str).encode("utf-8")).hexdigest(),
+    )
+    return embedding_client_cache.get(
+        key, lambda: client_cls(**client_kwargs, embed_batch_size=min(EMBEDDINGS_BATCH_SIZE, 2048))
+    )
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Returns the delay in seconds the provider asked for in the error response, if any
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class _RateLimitGate:
+    """
+    Shared by the concurrent requests of a generator. Once a request is rate limited, all requests wait until the
+    provider's retry delay has passed instead of adding to the load
+    """
+
+    def __init__(self):
+        self._resume_at = 0
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        return max(self._resume_at - time.monotonic(), 0)
+
+    def backoff(self, error: Exception, attempt: int) -> float:
+        delay = get_retry_after(error)
+        if delay is None:
+            delay = min(2**attempt, 30) + random.uniform(0, 1)
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        return self.delay()
 
 
 class EmbeddingsGenerator(BaseEmbedding, LlamaIndexTransformers):
     embedding_provider_slug: Optional[str] = None
     embedding_model_name: str = "ada"
     additional_kwargs: Optional[Dict[str, Any]] = None
+    # Texts handed to _get_text_embeddings at once. They are embedded in concurrent requests of
+    # EMBEDDINGS_BATCH_SIZE texts
+    embed_batch_size: int = Field(
+        default=min(EMBEDDINGS_BATCH_SIZE * EMBEDDINGS_MAX_CONCURRENCY, 2048),
+        gt=0,
+        le=2048,
+    )
+
+    _client = PrivateAttr(default=None)
+    _rate_limit_gate = PrivateAttr(default_factory=_RateLimitGate)
 
     @classmethod
     def slug(cls):
@@ -60,28 +156,146 @@ class EmbeddingsGenerator(BaseEmbedding, LlamaIndexTransformers):
     def class_name(cls) -> str:
         return "EmbeddingsGenerator"
 
-    def _get_query_embedding(self, query: str) -> List[float]:
-        """Get query embedding."""
-        client = get_embedding_client(
-            datasource=self.additional_kwargs["datasource"],
-            embedding_provider_slug=self.embedding_provider_slug,
-            embedding_model_name=self.embedding_model_name,
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_embedding_client(
+                datasource=self.additional_kwargs["datasource"],
+                embedding_provider_slug=self.embedding_provider_slug,
+                embedding_model_name=self.embedding_model_name,
+            )
+        return self._client
+
+    @property
+    def _cache_scope(self) -> str:
+        # Embeddings are only shared between datasources of the same owner that use the same model and endpoint
+        client = self.client
+        return json.dumps(
+            [
+                self.embedding_provider_slug,
+                client.model_name,
+                getattr(client, "api_base", None),
+                getattr(client, "azure_endpoint", None),
+                getattr(client, "azure_deployment", None),
+                self.additional_kwargs["datasource"].owner_id,
+            ],
+            default=str,
         )
 
-        return client._get_query_embedding(query)
+    def _with_retries(self, fn: Callable, *args):
+        for attempt in range(EMBEDDINGS_MAX_RETRIES + 1):
+            delay = self._rate_limit_gate.delay()
+            if delay:
+                time.sleep(delay)
+            try:
+                return fn(*args)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == EMBEDDINGS_MAX_RETRIES:
+                    raise
+                delay = self._rate_limit_gate.backoff(e, attempt)
+                logger.warning(f"Embeddings request failed, retrying in {delay:.1f}s: {e}")
+
+    async def _awith_retries(self, fn: Callable, *args):
+        for attempt in range(EMBEDDINGS_MAX_RETRIES + 1):
+            delay = self._rate_limit_gate.delay()
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                return await fn(*args)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == EMBEDDINGS_MAX_RETRIES:
+                    raise
+                delay = self._rate_limit_gate.backoff(e, attempt)
+                logger.warning(f"Embeddings request failed, retrying in {delay:.1f}s: {e}")
+
+    def _get_cached_embeddings(self, texts: List[str]):
+        cache = get_embeddings_cache()
+        scope = self._cache_scope
+        keys = [cache.get_key(scope, text) for text in texts]
+        return keys, cache.get_many(list(set(keys)))
+
+    def _get_batches(self, keys: List[str], texts: List[str], embeddings: Dict[str, List[float]]):
+        # Texts that aren't cached, without duplicates, in batches of EMBEDDINGS_BATCH_SIZE
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in embeddings:
+                missing.setdefault(key, text)
+        missing_keys, missing_texts = list(missing.keys()), list(missing.values())
+        return [
+            (missing_keys[i : i + EMBEDDINGS_BATCH_SIZE], missing_texts[i : i + EMBEDDINGS_BATCH_SIZE])
+            for i in range(0, len(missing_keys), EMBEDDINGS_BATCH_SIZE)
+        ]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        """Get query embedding."""
+        return self._with_retries(self.client._get_query_embedding, query)
 
     async def _aget_query_embedding(self, query: str) -> List[float]:
-        raise NotImplementedError
+        """Get query embedding asynchronously."""
+        return await self._awith_retries(self.client._aget_query_embedding, query)
 
     def _get_text_embedding(self, text: str) -> List[float]:
         """Get text embedding."""
-        client = get_embedding_client(
-            datasource=self.additional_kwargs["datasource"],
-            embedding_provider_slug=self.embedding_provider_slug,
-            embedding_model_name=self.embedding_model_name,
-        )
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        """Get text embedding asynchronously."""
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Get text embeddings. Cached embeddings are reused and the rest are requested in concurrent batches
+        """
+        if not texts:
+            return []
+
+        client = self.client
+        keys, embeddings = self._get_cached_embeddings(texts)
+        batches = self._get_batches(keys, texts, embeddings)
+
+        def _embed(batch):
+            return self._with_retries(client._get_text_embeddings, batch[1])
+
+        if len(batches) > 1 and EMBEDDINGS_MAX_CONCURRENCY > 1:
+            with ThreadPoolExecutor(max_workers=min(len(batches), EMBEDDINGS_MAX_CONCURRENCY)) as executor:
+                results = list(executor.map(_embed, batches))
+        else:
+            results = [_embed(batch) for batch in batches]
+
+        new_embeddings = {}
+        for (batch_keys, _), batch_embeddings in zip(batches, results):
+            new_embeddings.update(zip(batch_keys, batch_embeddings))
+        get_embeddings_cache().set_many(new_embeddings)
+
+        embeddings.update(new_embeddings)
+        return [embeddings[key] for key in keys]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Get text embeddings asynchronously. Cached embeddings are reused and the rest are requested in concurrent
+        batches
+        """
+        if not texts:
+            return []
+
+        client = self.client
+        keys, embeddings = await asyncio.to_thread(self._get_cached_embeddings, texts)
+        batches = self._get_batches(keys, texts, embeddings)
+        semaphore = asyncio.Semaphore(max(EMBEDDINGS_MAX_CONCURRENCY, 1))
+
+        async def _embed(batch):
+            async with semaphore:
+                return await self._awith_retries(client._aget_text_embeddings, batch[1])
+
+        results = await asyncio.gather(*[_embed(batch) for batch in batches])
+
+        new_embeddings = {}
+        for (batch_keys, _), batch_embeddings in zip(batches, results):
+            new_embeddings.update(zip(batch_keys, batch_embeddings))
+        await asyncio.to_thread(get_embeddings_cache().set_many, new_embeddings)
 
-        return client._get_text_embedding(text)
+        embeddings.update(new_embeddings)
+        return [embeddings[key] for key in keys]
 
     def get_embedding(self, query: str) -> List[float]:
         return self._get_query_embedding(query)
@@ -38,6 +38,8 @@ class JSONEncoder(json.JSONEncoder):
 
 
 class EventProcessingJob(ProcessingJob):
+    priority = 1
+
     @classmethod
     def generate_job_id(cls):
         return "{}".format(str(uuid.uuid4()))
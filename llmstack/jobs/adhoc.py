@@ -1,11 +1,12 @@
 import uuid
-from concurrent.futures import ThreadPoolExecutor
-from queue import Queue
+from typing import Optional
 
 import django_rq
 from django.conf import settings
 from rq.command import send_stop_job_command
-from rq.job import Job
+from rq.job import Job, JobStatus
+
+from llmstack.jobs.local import get_local_job_executor
 
 
 class ProcessingJob(Job):
@@ -17,6 +18,9 @@ class ProcessingJob(Job):
         )
         else True
     )
+    # Jobs with a lower priority run first when jobs run in process. Jobs a user is waiting on keep the default,
+    # bookkeeping jobs run after them and long running datasource ingestion runs last
+    priority = 0
 
     @property
     def queue_name(self):
@@ -27,7 +31,7 @@ class ProcessingJob(Job):
         if self._use_redis:
             return django_rq.queues.get_queue(self.queue_name)
         else:
-            return Queue()
+            return get_local_job_executor()
 
     @classmethod
     def generate_job_id(self):
@@ -54,25 +58,40 @@ class ProcessingJob(Job):
             conn = django_rq.get_connection("default")
             send_stop_job_command(conn, job_id)
         else:
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                executor.submit(cls.func, *cls.args, **cls.kwargs).cancel()
+            get_local_job_executor().cancel(job_id)
+
+    @classmethod
+    def get_job_status(cls, job_id: str) -> Optional[JobStatus]:
+        if cls._use_redis:
+            return Job.fetch(job_id, connection=cls.get_connection()).get_status()
+        else:
+            return get_local_job_executor().get_status(job_id)
+
+    def get_status(self, refresh: bool = True) -> Optional[JobStatus]:
+        if self._use_redis:
+            return super().get_status(refresh=refresh)
+        else:
+            return get_local_job_executor().get_status(self.id)
 
     def add_to_queue(self, *args, **kwargs) -> Job:
         if self._use_redis:
             queue = django_rq.get_queue(self.queue_name)
-            return queue.enqueue_job(job=self)
+            return queue.enqueue_job(job=self, at_front=kwargs.get("at_front", False))
         else:
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                return executor.submit(self.func, *self.args, **self.kwargs)
+            return get_local_job_executor().submit(self, priority=self.priority, at_front=kwargs.get("at_front", False))
 
 
 class DataSourceEntryProcessingJob(ProcessingJob):
+    priority = 2
+
     @classmethod
     def generate_job_id(cls):
         return "{}".format(str(uuid.uuid4()))
 
 
 class HistoryPersistenceJob(ProcessingJob):
+    priority = 1
+
     @classmethod
     def generate_job_id(cls):
         return "{}".format(str(uuid.uuid4()))
@@ -85,6 +104,8 @@ class ExtractURLJob(ProcessingJob):
 
 
 class AddDataSourceEntryJob(ProcessingJob):
+    priority = 2
+
     @classmethod
     def generate_job_id(cls):
         return "{}".format(str(uuid.uuid4()))
@@ -156,7 +156,7 @@ class JobsViewSet(viewsets.ViewSet):
                 },
             )
 
-        task_run_logs = TaskRunLog.objects.filter(task_id=job.id).order_by("-id")
+        task_run_logs = TaskRunLog.objects.filter(task_id=job.id).order_by("-id").prefetch_related("subtask_results")
         tasks = filter(lambda task: task.task_uuid() == job.uuid, task_run_logs)
         serializer = TaskRunLogSerializer(tasks, many=True)
         return DRFResponse(status=200, data=serializer.data)
@@ -165,7 +165,7 @@ class JobsViewSet(viewsets.ViewSet):
         # Create a csv file with the task data job.callable_args[1] as input
         # data and task.result as output data
         input_data = json.loads(job.callable_args)[1]  # Array of input objects
-        output_data = task.result  # Array of output objects
+        output_data = task.get_results()  # Array of output objects
 
         assert (
             len(input_data) == len(output_data)
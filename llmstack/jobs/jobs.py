@@ -1,19 +1,34 @@
 import datetime
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, List, Optional
 
 import django_rq
+from django import db
 from django.conf import settings
 from django.test import RequestFactory
 from pydantic import BaseModel
 
 from llmstack.apps.apis import AppViewSet
 from llmstack.apps.models import App
-from llmstack.jobs.models import TaskRunLog, TaskStatus
+from llmstack.common.utils.cache import TTLCache
+from llmstack.jobs.models import (
+    TaskRunLog,
+    TaskRunResult,
+    TaskStatus,
+    get_scheduled_task,
+)
 
 logger = logging.getLogger(__name__)
 
+# Inputs of a task run are read from its job once per process instead of being passed along with every batch
+task_run_input_cache = TTLCache(
+    "task_run_input_cache",
+    maxsize=getattr(settings, "TASK_RUN_INPUT_CACHE_SIZE", 16),
+    ttl=getattr(settings, "TASK_RUN_INPUT_CACHE_TTL", 3600),
+)
+
 
 class SubTaskResult(BaseModel):
     status: TaskStatus = TaskStatus.NOT_STARTED
@@ -34,19 +49,42 @@ class TaskRunner:
     def get_input_data_batch(input_data, input_data_index, batch_size):
         return input_data[input_data_index : input_data_index + batch_size]
 
+    @staticmethod
+    def load_input_data(task_run_log_uuid) -> List[Any]:
+        def _load():
+            task_run_log = TaskRunLog.objects.get(uuid=uuid.UUID(task_run_log_uuid))
+            task = get_scheduled_task(task_run_log.task_type, task_run_log.task_id)
+            return task.parse_args()[1]
+
+        return task_run_input_cache.get(task_run_log_uuid, _load)
+
     @staticmethod
     def update_task_run_log_results(task_run_log_uuid, start_index, results):
-        task_run_log = TaskRunLog.objects.get(uuid=uuid.UUID(task_run_log_uuid))
-        for idx in range(len(results)):
-            logger.info(f"Type: {type(results[idx])}, Result: {results[idx]}")
-            task_run_log.result[start_index + idx] = results[idx]
-        task_run_log.save()
+        # Results are upserted per input instead of rewriting the whole result of the task run
+        task_run_log = TaskRunLog.objects.only("id").get(uuid=uuid.UUID(task_run_log_uuid))
+        TaskRunResult.objects.bulk_create(
+            [
+                TaskRunResult(task_run_log=task_run_log, index=start_index + idx, result=result)
+                for idx, result in enumerate(results)
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["task_run_log", "index"],
+            update_fields=["result"],
+        )
+
+
+def _get_input_data_count(job_meta) -> int:
+    # Jobs enqueued before inputs were read by offset carry the whole input list
+    if "input_data_count" in job_meta:
+        return job_meta["input_data_count"]
+    return len(job_meta.get("input_data", []))
 
 
 class TaskRunJobMeta(BaseModel):
     task_run_type: str
     task_run_log_uuid: str
-    input_data: List[Any]
+    input_data_count: int
     input_data_index: int
     batch_size: int
     queue_name: str
@@ -63,38 +101,65 @@ class AppRunTaskRunner(TaskRunner):
         use_session: bool
 
     @staticmethod
-    def run_subtask(input_data_batch, *args, **kwargs) -> List[SubTaskResult]:
-        app_id = kwargs["app_id"]
-        use_session = kwargs["use_session"]
-
-        session_id = None
-        result = []
-        for input_data in input_data_batch:
-            app = App.objects.get(uuid=app_id)
+    def _run_input(app, input_data, session_id=None):
+        try:
             request_input_data = {"input": input_data, "stream": False}
-            request = RequestFactory().post(f"/api/apps/{app_id}/run", data=request_input_data, format="json")
+            request = RequestFactory().post(f"/api/apps/{app.uuid}/run", content_type="application/json")
             request.user = app.owner
             request.data = request_input_data
-            response = AppViewSet().run(request=request, uid=app_id, session_id=session_id)
+            response = AppViewSet().run(request=request, uid=str(app.uuid), session_id=session_id)
             if response.status_code == 200:
-                result.append(SubTaskResult(status=TaskStatus.SUCCESS, output=response.data["output"]))
-            else:
-                result.append(
-                    SubTaskResult(
-                        status=TaskStatus.FAILURE,
-                        error={"status_code": response.status_code, "data": response.data},
-                    )
-                )
-            if use_session and session_id is None:
-                if "session" in response.data:
+                return SubTaskResult(status=TaskStatus.SUCCESS, output=response.data["output"]), response
+            return (
+                SubTaskResult(
+                    status=TaskStatus.FAILURE,
+                    error={"status_code": response.status_code, "data": response.data},
+                ),
+                response,
+            )
+        except Exception as e:
+            logger.exception(f"Error running app {app.uuid}")
+            return SubTaskResult(status=TaskStatus.FAILURE, error=f"Exception: {type(e)}, detail: {e}"), None
+
+    @staticmethod
+    def _run_input_in_thread(app, input_data):
+        try:
+            return AppRunTaskRunner._run_input(app, input_data)[0]
+        finally:
+            db.connection.close()
+
+    @staticmethod
+    def run_subtask(input_data_batch, *args, **kwargs) -> List[SubTaskResult]:
+        app_id = kwargs["app_id"]
+        use_session = kwargs["use_session"]
+
+        app = App.objects.select_related("owner").get(uuid=app_id)
+
+        # Inputs that share a session have to run in order
+        if use_session:
+            session_id = None
+            result = []
+            for input_data in input_data_batch:
+                subtask_result, response = AppRunTaskRunner._run_input(app, input_data, session_id=session_id)
+                result.append(subtask_result)
+                if session_id is None and response is not None and "session" in response.data:
                     session_id = response.data["session"]["id"]
+            return result
 
-        return result
+        max_workers = min(len(input_data_batch), getattr(settings, "TASK_RUN_MAX_CONCURRENCY", 4))
+        if max_workers <= 1:
+            return [AppRunTaskRunner._run_input(app, input_data)[0] for input_data in input_data_batch]
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="app_run_task") as executor:
+            return list(
+                executor.map(AppRunTaskRunner._run_input_in_thread, [app] * len(input_data_batch), input_data_batch)
+            )
 
     @staticmethod
     def schedule_next_batch(job, start_after_secs):
-        job_meta = AppRunTaskRunner.JobMetadata(**job.meta)
+        job_meta = AppRunTaskRunner.JobMetadata(**{**job.meta, "input_data_count": _get_input_data_count(job.meta)})
 
+        # Only the offset of the next batch is passed along, its inputs are read from the job when it runs
         django_rq.get_queue(job_meta.queue_name).enqueue_in(
             datetime.timedelta(seconds=start_after_secs),
             run_subtask,
@@ -103,9 +168,7 @@ class AppRunTaskRunner(TaskRunner):
                 job_meta.task_run_log_uuid,
                 job_meta.input_data_index + job_meta.batch_size,
                 job_meta.batch_size,
-                TaskRunner.get_input_data_batch(
-                    job_meta.input_data, job_meta.input_data_index + job_meta.batch_size, job_meta.batch_size
-                ),
+                None,
             ),
             kwargs=AppRunTaskRunner.SubTaskArgs(
                 app_id=job_meta.app_id,
@@ -120,22 +183,23 @@ class AppRunTaskRunner(TaskRunner):
         )
 
 
-def _schedule_next_batch(task_run_log_uuid, input_data, input_data_index, batch_size, job, *args, **kwargs):
-    task_run_log = TaskRunLog.objects.get(uuid=uuid.UUID(task_run_log_uuid))
+def _schedule_next_batch(task_run_log_uuid, input_data_count, input_data_index, batch_size, job, *args, **kwargs):
+    task_run_log = TaskRunLog.objects.only("status").get(uuid=uuid.UUID(task_run_log_uuid))
 
     if task_run_log.status == "cancelled":
+        # The inputs of this batch already have their results
         TaskRunner.update_task_run_log_results(
             task_run_log_uuid,
-            input_data_index,
+            input_data_index + batch_size,
             [
                 SubTaskResult(status=TaskStatus.FAILURE, output="Task cancelled by user").model_dump()
-                for _ in range(input_data_index, len(input_data))
+                for _ in range(input_data_index + batch_size, input_data_count)
             ],
         )
         return
 
     # If we have any more tasks to run, schedule the next task
-    if input_data_index + batch_size < len(input_data):
+    if input_data_index + batch_size < input_data_count:
         time_remaining_to_schedule_next_task = max(
             (settings.TASK_RUN_DELAY - (job.ended_at - job.started_at).total_seconds()), 1
         )
@@ -147,14 +211,18 @@ def _schedule_next_batch(task_run_log_uuid, input_data, input_data_index, batch_
     else:
         # All tasks are completed. Update the task status to completed
         task_run_log.status = "succeeded"
-        task_run_log.save()
+        task_run_log.save(update_fields=["status"])
 
 
 def on_success_callback(job, connection, result, *args, **kwargs):
     TaskRunner.update_task_run_log_results(job.meta["task_run_log_uuid"], job.meta["input_data_index"], result)
 
     _schedule_next_batch(
-        job.meta["task_run_log_uuid"], job.meta["input_data"], job.meta["input_data_index"], job.meta["batch_size"], job
+        job.meta["task_run_log_uuid"],
+        _get_input_data_count(job.meta),
+        job.meta["input_data_index"],
+        job.meta["batch_size"],
+        job,
     )
 
 
@@ -167,16 +235,25 @@ def on_failure_callback(job, connection, type, value, traceback):
         job.meta["input_data_index"],
         [
             SubTaskResult(status=TaskStatus.FAILURE, error=f"Exception: {type}, detail: {value}").model_dump()
-            for _ in range(job.meta["batch_size"])
+            for _ in range(min(job.meta["batch_size"], _get_input_data_count(job.meta) - job.meta["input_data_index"]))
         ],
     )
 
     _schedule_next_batch(
-        job.meta["task_run_log_uuid"], job.meta["input_data"], job.meta["input_data_index"], job.meta["batch_size"], job
+        job.meta["task_run_log_uuid"],
+        _get_input_data_count(job.meta),
+        job.meta["input_data_index"],
+        job.meta["batch_size"],
+        job,
     )
 
 
-def run_subtask(task_run_type, task_run_log_uuid, input_data_index, batch_size, input_data_batch, *args, **kwargs):
+def run_subtask(task_run_type, task_run_log_uuid, input_data_index, batch_size, input_data_batch=None, *args, **kwargs):
+    if input_data_batch is None:
+        input_data_batch = TaskRunner.get_input_data_batch(
+            TaskRunner.load_input_data(task_run_log_uuid), input_data_index, batch_size
+        )
+
     subtask_results = []
     if task_run_type == "app_run":
         subtask_results = AppRunTaskRunner.run_subtask(input_data_batch, *args, **kwargs)
@@ -194,6 +271,8 @@ def run_app_task(app_id=None, input_data=None, *args, **kwargs):
 
     result_ttl = 86400
 
+    task_run_input_cache.get(task_run_log_uuid, lambda: input_data)
+
     django_rq.get_queue("default").enqueue(
         run_subtask,
         args=(
@@ -201,7 +280,7 @@ def run_app_task(app_id=None, input_data=None, *args, **kwargs):
             task_run_log_uuid,
             input_data_index,
             batch_size,
-            TaskRunner.get_input_data_batch(input_data, input_data_index, batch_size),
+            None,
         ),
         kwargs=AppRunTaskRunner.SubTaskArgs(
             app_id=app_id,
@@ -212,7 +291,7 @@ def run_app_task(app_id=None, input_data=None, *args, **kwargs):
         meta=AppRunTaskRunner.JobMetadata(
             task_run_type="app_run",
             task_run_log_uuid=task_run_log_uuid,
-            input_data=input_data,
+            input_data_count=len(input_data),
             input_data_index=input_data_index,
             batch_size=batch_size,
             queue_name="default",
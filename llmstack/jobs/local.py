@@ -0,0 +1,228 @@
+"""
+In-process executor for ProcessingJob when USE_REMOTE_JOB_QUEUE is off.
+
+Single node deployments run adhoc jobs in the web process instead of on RQ workers. Jobs are queued by priority
+on a bounded queue and run on a long lived pool of worker threads, so enqueuing returns right away. Jobs keep
+their RQ semantics: they are looked up by ID, report an RQ JobStatus, call their on_success, on_failure and
+on_stopped callbacks and can be cancelled while queued or running. Queued and running jobs are drained when the
+process exits.
+"""
+
+import atexit
+import ctypes
+import itertools
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django import db
+from django.conf import settings
+from rq.job import JobStatus
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class LocalJobStopped(Exception):
+    """
+    Raised in the worker thread of a running job that was cancelled
+    """
+
+
+def _raise_in_thread(thread_id: int, exception: Optional[type]) -> None:
+    # Passing None clears an exception that was set but not raised yet
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id),
+        ctypes.py_object(exception) if exception else None,
+    )
+
+
+class LocalJobExecutor:
+    """
+    A bounded priority queue of jobs run by max_workers threads. Jobs with a lower priority run first and jobs
+    with the same priority run in the order they were added. The status of the last history_size jobs that
+    completed is kept for lookups
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_size: int = 1000, history_size: int = 1000):
+        self.max_workers = max_workers
+        self.history_size = history_size
+        self._queue = queue.PriorityQueue(maxsize=max_queue_size)
+        self._counter = itertools.count()
+        self._jobs = {}
+        self._statuses = OrderedDict()
+        # Worker thread IDs of running jobs, by job ID
+        self._running = {}
+        self._workers = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+        self._completed = metrics_registry.counter("local_job_executor.completed", "Jobs completed in process")
+        self._failed = metrics_registry.counter("local_job_executor.failed", "Jobs failed in process")
+        self._cancelled = metrics_registry.counter("local_job_executor.cancelled", "Jobs cancelled in process")
+        metrics_registry.gauge("local_job_executor.queued", "Jobs waiting to run in process", fn=self._queue.qsize)
+        metrics_registry.gauge("local_job_executor.running", "Jobs running in process", fn=lambda: len(self._running))
+
+    def _start_workers(self) -> None:
+        # Workers are started with the first job and live as long as the process
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"local_job_executor_{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _set_status(self, job_id: str, status: JobStatus) -> None:
+        self._statuses[job_id] = status
+        self._statuses.move_to_end(job_id)
+        if status in (JobStatus.FINISHED, JobStatus.FAILED, JobStatus.STOPPED, JobStatus.CANCELED):
+            self._jobs.pop(job_id, None)
+            while len(self._statuses) > self.history_size + len(self._jobs):
+                oldest = next(iter(self._statuses))
+                if oldest in self._jobs:
+                    break
+                self._statuses.pop(oldest)
+
+    def submit(self, job, priority: int = 0, at_front: bool = False):
+        """
+        Queues job and returns it. Blocks while the queue is full
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Local job executor is shut down")
+            self._jobs[job.id] = job
+            self._set_status(job.id, JobStatus.QUEUED)
+
+        self._queue.put((0 if at_front else 1, priority, next(self._counter), job))
+        with self._lock:
+            self._start_workers()
+        return job
+
+    def fetch(self, job_id: str):
+        """
+        Returns the job with job_id if it is queued or running
+        """
+        return self._jobs.get(job_id)
+
+    def get_status(self, job_id: str) -> Optional[JobStatus]:
+        return self._statuses.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued job or stops a running one. A running job is stopped by raising LocalJobStopped in its
+        thread, which happens at the next Python instruction it runs. Returns False if the job isn't queued or
+        running
+        """
+        with self._lock:
+            status = self._statuses.get(job_id)
+            if status == JobStatus.QUEUED:
+                # Dropped by the worker that takes it off the queue
+                self._set_status(job_id, JobStatus.CANCELED)
+                self._cancelled.inc()
+                return True
+            if status == JobStatus.STARTED and job_id in self._running:
+                _raise_in_thread(self._running[job_id], LocalJobStopped)
+                return True
+        return False
+
+    def _run_callback(self, name: str, job, *args) -> None:
+        try:
+            callback = getattr(job, name, None)
+            if callback:
+                callback(job, job.connection, *args)
+        except Exception:
+            logger.exception(f"Error running {name} of job {job.id}")
+
+    def _run(self, job) -> None:
+        with self._lock:
+            if self._statuses.get(job.id) != JobStatus.QUEUED:
+                return
+            self._set_status(job.id, JobStatus.STARTED)
+            self._running[job.id] = threading.get_ident()
+
+        status = JobStatus.FAILED
+        try:
+            try:
+                result = job.func(*job.args, **job.kwargs)
+                status = JobStatus.FINISHED
+            finally:
+                with self._lock:
+                    self._running.pop(job.id, None)
+                    # A stop requested just as the job returned is not raised anymore
+                    _raise_in_thread(threading.get_ident(), None)
+                    self._set_status(job.id, status)
+        except LocalJobStopped:
+            with self._lock:
+                self._set_status(job.id, JobStatus.STOPPED)
+            self._cancelled.inc()
+            self._run_callback("stopped_callback", job)
+            return
+        except Exception:
+            logger.exception(f"Error running job {job.id}")
+            self._failed.inc()
+            self._run_callback("failure_callback", job, *sys.exc_info())
+            return
+
+        self._completed.inc()
+        self._run_callback("success_callback", job, result)
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item[3] is None:
+                    return
+                self._run(item[3])
+            except LocalJobStopped:
+                # Raised after the job had already completed
+                pass
+            finally:
+                try:
+                    db.connection.close()
+                except Exception as e:
+                    logger.warning(f"Error closing database connection of local job worker: {e}")
+                self._queue.task_done()
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops accepting jobs and waits up to timeout seconds for the queued and running jobs to complete
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            workers = list(self._workers)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for _ in workers:
+            # Sorts after every job, so workers exit once the queue is drained
+            self._queue.put((2, 0, next(self._counter), None))
+        for worker in workers:
+            worker.join(max(deadline - time.monotonic(), 0) if deadline is not None else None)
+
+        pending = self._queue.qsize() - len(workers) + len(self._running)
+        if pending > 0:
+            logger.warning(f"Local job executor shut down with {pending} jobs pending")
+
+
+_local_job_executor = None
+_local_job_executor_lock = threading.Lock()
+
+
+def get_local_job_executor() -> LocalJobExecutor:
+    global _local_job_executor
+
+    if _local_job_executor is None:
+        with _local_job_executor_lock:
+            if _local_job_executor is None:
+                _local_job_executor = LocalJobExecutor(
+                    max_workers=getattr(settings, "LOCAL_JOB_QUEUE_MAX_WORKERS", 4),
+                    max_queue_size=getattr(settings, "LOCAL_JOB_QUEUE_SIZE", 1000),
+                )
+                atexit.register(
+                    _local_job_executor.shutdown, timeout=getattr(settings, "LOCAL_JOB_QUEUE_DRAIN_TIMEOUT", 30)
+                )
+    return _local_job_executor
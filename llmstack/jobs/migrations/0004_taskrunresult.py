@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-17 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_alter_taskrunlog_task_type_adhocjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRunResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task_run_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subtask_results', to='jobs.taskrunlog')),
+            ],
+            options={
+                'ordering': ('index',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskrunresult',
+            constraint=models.UniqueConstraint(fields=('task_run_log', 'index'), name='unique_task_run_result_index'),
+        ),
+    ]
@@ -111,6 +111,21 @@ class TaskRunLog(models.Model):
         )
         return entry.owner if entry else ""
 
+    def get_results(self):
+        """
+        Returns the results of the task run. Results of app run tasks are stored per input in TaskRunResult as
+        batches complete and take precedence over the placeholders in result. Uses subtask_results prefetched with
+        prefetch_related when listing task runs
+        """
+        results = list(self.result) if isinstance(self.result, list) else self.result
+        for subtask_result in self.subtask_results.all():
+            if not isinstance(results, list):
+                results = []
+            if subtask_result.index >= len(results):
+                results.extend([None] * (subtask_result.index + 1 - len(results)))
+            results[subtask_result.index] = subtask_result.result
+        return results
+
     def __str__(self) -> str:
         return self.job_id
 
@@ -118,6 +133,23 @@ class TaskRunLog(models.Model):
         ordering = ("-created_at",)
 
 
+class TaskRunResult(models.Model):
+    """
+    Result of running a task on the input at index of its input list
+    """
+
+    task_run_log = models.ForeignKey(TaskRunLog, on_delete=models.CASCADE, related_name="subtask_results")
+    index = models.PositiveIntegerField()
+    result = models.JSONField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("index",)
+        constraints = [
+            models.UniqueConstraint(fields=["task_run_log", "index"], name="unique_task_run_result_index"),
+        ]
+
+
 def get_scheduled_task(task_model: str, task_id: int):
     if not task_model:
         return None
@@ -6,10 +6,14 @@ from llmstack.jobs.models import CronJob, RepeatableJob, ScheduledJob, TaskRunLo
 
 class TaskRunLogSerializer(serializers.ModelSerializer):
     task_uuid = serializers.SerializerMethodField()
+    result = serializers.SerializerMethodField()
 
     def get_task_uuid(self, obj):
         return obj.task_uuid()
 
+    def get_result(self, obj):
+        return obj.get_results()
+
     class Meta:
         model = TaskRunLog
         fields = [
@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from rq.job import JobStatus
+
+from llmstack.jobs.local import LocalJobExecutor
+
+
+def _job(id, func, *args, **callbacks):
+    return SimpleNamespace(id=id, func=func, args=args, kwargs={}, connection=None, **callbacks)
+
+
+class LocalJobExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = LocalJobExecutor(max_workers=1, max_queue_size=10)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.ran = []
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown(timeout=5)
+
+    def _block(self):
+        self.started.set()
+        self.release.wait(5)
+
+    def _wait_for_status(self, job_id, status):
+        deadline = time.monotonic() + 5
+        while self.executor.get_status(job_id) != status and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.executor.get_status(job_id), status)
+
+    def test_runs_jobs_by_priority(self):
+        self.executor.submit(_job("blocker", self._block))
+        self.started.wait(5)
+        self.executor.submit(_job("bookkeeping", self.ran.append, "bookkeeping"), priority=1)
+        self.executor.submit(_job("ingestion", self.ran.append, "ingestion"), priority=2)
+        self.executor.submit(_job("app_run", self.ran.append, "app_run"), priority=0)
+        self.executor.submit(_job("urgent", self.ran.append, "urgent"), priority=2, at_front=True)
+        self.release.set()
+
+        self._wait_for_status("ingestion", JobStatus.FINISHED)
+        self.assertEqual(self.ran, ["urgent", "app_run", "bookkeeping", "ingestion"])
+
+    def test_reports_status_and_calls_callbacks(self):
+        results, failures = [], []
+        self.executor.submit(
+            _job("succeeds", lambda: "done", success_callback=lambda job, conn, result: results.append(result))
+        )
+        self.executor.submit(
+            _job("fails", lambda: 1 / 0, failure_callback=lambda job, conn, *exc_info: failures.append(exc_info[0]))
+        )
+
+        self._wait_for_status("succeeds", JobStatus.FINISHED)
+        self._wait_for_status("fails", JobStatus.FAILED)
+        self.assertEqual(results, ["done"])
+        self.assertEqual(failures, [ZeroDivisionError])
+        self.assertIsNone(self.executor.fetch("succeeds"))
+
+    def test_cancels_queued_job(self):
+        self.executor.submit(_job("blocker", self._block))
+        self.started.wait(5)
+        self.executor.submit(_job("queued", self.ran.append, "queued"))
+
+        self.assertEqual(self.executor.get_status("queued"), JobStatus.QUEUED)
+        self.assertTrue(self.executor.cancel("queued"))
+        self.assertEqual(self.executor.get_status("queued"), JobStatus.CANCELED)
+        self.release.set()
+
+        self._wait_for_status("blocker", JobStatus.FINISHED)
+        self.executor.submit(_job("after", self.ran.append, "after"))
+        self._wait_for_status("after", JobStatus.FINISHED)
+        self.assertEqual(self.ran, ["after"])
+        self.assertFalse(self.executor.cancel("queued"))
+
+    def test_stops_running_job(self):
+        stopped = []
+
+        def _spin():
+            self.started.set()
+            while True:
+                time.sleep(0.01)
+
+        self.executor.submit(_job("running", _spin, stopped_callback=lambda job, conn: stopped.append(job.id)))
+        self.started.wait(5)
+        self.assertEqual(self.executor.get_status("running"), JobStatus.STARTED)
+
+        self.assertTrue(self.executor.cancel("running"))
+        self._wait_for_status("running", JobStatus.STOPPED)
+        self.assertEqual(stopped, ["running"])
@@ -1,10 +1,5 @@
-import base64
 import json
 
-from cryptography.fernet import Fernet
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField as PGArrayField
 from django.db import connection, models
@@ -12,6 +7,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from llmstack.apps.models import AppAccessPermission, AppVisibility
+from llmstack.common.utils.crypto import get_cipher as get_cached_cipher
 from llmstack.common.utils.db_models import ArrayField
 from llmstack.data.models import DataSourceAccessPermission, DataSourceVisibility
 
@@ -284,16 +280,7 @@ class OrganizationSettings(models.Model):
 
     @staticmethod
     def get_cipher(token, salt):
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            iterations=100000,
-            length=32,
-            salt=salt,
-            backend=default_backend(),
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(token.encode()))
-        cipher = Fernet(key)
-        return cipher
+        return get_cached_cipher(token, salt)
 
     def encrypt_value(self, value):
         if not value:
@@ -1,14 +1,14 @@
-import asyncio
 import logging
 import time
 from types import TracebackType
 from typing import Any, Dict, Optional, Type
 
 from pydantic import BaseModel, model_validator
-from pykka import ThreadingActor
 
+from llmstack.play.bookkeeping import BookkeepingCollector
 from llmstack.play.messages import Message, MessageType
 from llmstack.play.output_stream import OutputStream
+from llmstack.play.runtime import ActorBase
 
 logger = logging.getLogger(__name__)
 
@@ -50,14 +50,14 @@ class ActorConfig(BaseModel):
     tool_schema: Optional[Dict] = None  # Tool schema for the actor
 
 
-class Actor(ThreadingActor):
+class Actor(ActorBase):
     def __init__(
         self,
         id: str,
         coordinator_urn: str,
         output_cls: Type = None,
         dependencies: list = [],
-        bookkeeping_queue: asyncio.Queue = None,
+        bookkeeping_queue: BookkeepingCollector = None,
     ):
         super().__init__()
         self._id = id
@@ -120,6 +120,11 @@ class Actor(ThreadingActor):
         # Resets the current state so we can reuse this actor with new input
         self._messages = {}
 
+    def rebind(self, session_id: str = None, request_user: Any = None, output_cache: Optional[Dict] = None):
+        # Rebinds the actor to a new session and the run's output cache options when a pooled
+        # actor graph is reused. Called before reset
+        pass
+
     @property
     def dependencies(self):
         return []
@@ -0,0 +1,85 @@
+"""
+Collects bookkeeping data from the actors of an app run.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class BookkeepingRun:
+    """
+    Bookkeeping entries for a single run. The coordinator registers a placeholder for each actor it
+    sends input to, and the run is complete once every registered actor has reported its data.
+    Streaming snapshots are coalesced so only the latest entry per actor is kept.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Any] = {}
+        self._pending = set()
+        self._condition = threading.Condition()
+        self.handed_off = False
+
+    def put(self, actor_id: str, data: Any) -> None:
+        with self._condition:
+            if data is None:
+                if actor_id not in self._entries:
+                    self._entries[actor_id] = None
+                    self._pending.add(actor_id)
+                return
+
+            self._entries[actor_id] = data
+            self._pending.discard(actor_id)
+            if not self._pending:
+                self._condition.notify_all()
+
+    def is_empty(self) -> bool:
+        return not self._entries
+
+    def is_complete(self) -> bool:
+        return not self._pending
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Blocks until all registered actors have reported their data or timeout expires and returns
+        the collected entries. Entries for actors that haven't reported are None
+        """
+        with self._condition:
+            if not self._condition.wait_for(self.is_complete, timeout=timeout):
+                logger.warning(f"Timed out waiting for bookkeeping data from {self._pending}")
+            entries = dict(self._entries)
+
+        return {
+            actor_id: data.model_dump() if isinstance(data, BaseModel) else data for actor_id, data in entries.items()
+        }
+
+
+class BookkeepingCollector:
+    """
+    Replaces the bookkeeping queue shared by the actors of an app runner. Actors keep calling
+    put_nowait((actor_id, data)) and entries are routed to the current run.
+    """
+
+    def __init__(self):
+        self._run = BookkeepingRun()
+        self._lock = threading.Lock()
+
+    def put_nowait(self, item: Tuple[str, Any]) -> None:
+        actor_id, data = item
+        self._run.put(actor_id, data)
+
+    @property
+    def current_run(self) -> BookkeepingRun:
+        return self._run
+
+    def new_run(self) -> BookkeepingRun:
+        """
+        Starts collecting a new run and returns the previous one
+        """
+        with self._lock:
+            previous_run, self._run = self._run, BookkeepingRun()
+        return previous_run
@@ -4,15 +4,20 @@ This module contains the OutputStream class.
 
 import asyncio
 import logging
+import threading
 import time
 import uuid
 from collections import defaultdict
-from typing import Any, Dict, Type
+from typing import Any, Dict, Optional, Type
 
+from django.conf import settings
 from pydantic import BaseModel
 from pykka import ActorProxy, ActorRegistry
 
 from llmstack.common.blocks.base.schema import StrEnum
+from llmstack.common.utils.flusher import DeferredFlusher
+from llmstack.common.utils.metrics import registry as metrics_registry
+from llmstack.play.bookkeeping import BookkeepingCollector
 from llmstack.play.messages import (
     ContentData,
     ContentStreamChunkData,
@@ -26,6 +31,12 @@ __all__ = ["OutputStream"]
 
 logger = logging.getLogger(__name__)
 
+writes_counter = metrics_registry.counter("output_stream.writes", "Chunks written to output streams")
+relayed_chunks_counter = metrics_registry.counter(
+    "output_stream.relayed_chunks",
+    "Chunk messages relayed from output streams to coordinators",
+)
+
 
 def stitch_model_objects(obj1: Any, obj2: Any) -> Any:
     """Stitch two objects together.
@@ -92,6 +103,21 @@ def stitch_model_objects(obj1: Any, obj2: Any) -> Any:
         return obj2 if obj2 else obj1
 
 
+def _chunk_size(chunk: Any) -> int:
+    # Approximates the size of a chunk by the length of the text in it
+    if isinstance(chunk, str):
+        return len(chunk)
+    if isinstance(chunk, dict):
+        return sum(_chunk_size(value) for value in chunk.values())
+    if isinstance(chunk, (list, tuple)):
+        return sum(_chunk_size(value) for value in chunk)
+    return 0
+
+
+# Relays pending chunks once their window has passed, so that a chunk isn't held back when no more writes follow it
+_pending_chunk_flusher = DeferredFlusher("output-stream-flusher")
+
+
 class OutputStream:
     """
     OutputStream class.
@@ -102,10 +128,16 @@ class OutputStream:
         stream_id: str = None,
         coordinator_urn: str = None,
         output_cls: Type = None,
-        bookkeeping_queue: asyncio.Queue = None,
+        bookkeeping_queue: BookkeepingCollector = None,
+        coalesce_window: Optional[float] = None,
+        coalesce_max_size: Optional[int] = None,
     ) -> None:
         """
         Initializes the OutputStream class.
+
+        When coalesce_window is set, chunks written within the window are stitched together and relayed to the
+        coordinator as one message. The first chunk of a message is relayed immediately, and pending chunks are
+        relayed early once their text reaches coalesce_max_size characters.
         """
         self._message_id = str(uuid.uuid4())
         self._data = None
@@ -115,6 +147,21 @@ class OutputStream:
         self._coordinator_proxy = None
         self._bookkeeping_queue = bookkeeping_queue
 
+        self._coalesce_window = (
+            coalesce_window
+            if coalesce_window is not None
+            else getattr(settings, "OUTPUT_STREAM_COALESCE_WINDOW_MS", 0) / 1000
+        )
+        self._coalesce_max_size = (
+            coalesce_max_size
+            if coalesce_max_size is not None
+            else getattr(settings, "OUTPUT_STREAM_COALESCE_MAX_SIZE", 2048)
+        )
+        self._pending_chunk = None
+        self._pending_size = 0
+        self._last_relayed_at = None
+        self._lock = threading.Lock()
+
     @property
     def _coordinator(self) -> ActorProxy:
         """
@@ -130,39 +177,59 @@ class OutputStream:
 
         return self._coordinator_proxy
 
-    async def write(self, data: Any) -> None:
-        """
-        Stitches fields from data to _data.
-        """
-
+    def _relay_chunk(self, chunk: Any) -> None:
         self._coordinator.relay(
             Message(
                 id=self._message_id,
                 type=MessageType.CONTENT_STREAM_CHUNK,
                 sender=self._stream_id,
                 receiver="coordinator",
-                data=ContentStreamChunkData(
-                    chunk=(
-                        data.model_dump()
-                        if isinstance(
-                            data,
-                            BaseModel,
-                        )
-                        else data
-                    ),
-                ),
+                data=ContentStreamChunkData(chunk=chunk),
             ),
         )
+        relayed_chunks_counter.inc()
+
+    def _flush_locked(self, now: float) -> None:
+        if self._pending_chunk is not None:
+            self._relay_chunk(self._pending_chunk)
+        self._pending_chunk = None
+        self._pending_size = 0
+        self._last_relayed_at = now
+
+    def flush(self) -> None:
+        """
+        Relays the chunks pending in a coalescing stream to the coordinator.
+        """
+        with self._lock:
+            if self._pending_chunk is not None:
+                self._flush_locked(time.monotonic())
+
+    async def write(self, data: Any) -> None:
+        """
+        Stitches fields from data to _data.
+        """
+        chunk = data.model_dump() if isinstance(data, BaseModel) else data
+        writes_counter.inc()
+
+        if not self._coalesce_window:
+            self._relay_chunk(chunk)
+        else:
+            with self._lock:
+                self._pending_chunk = stitch_model_objects(self._pending_chunk, chunk)
+                self._pending_size += _chunk_size(chunk)
+
+                now = time.monotonic()
+                if (
+                    self._last_relayed_at is None
+                    or now - self._last_relayed_at >= self._coalesce_window
+                    or self._pending_size >= self._coalesce_max_size
+                ):
+                    self._flush_locked(now)
+                else:
+                    _pending_chunk_flusher.schedule(self, self._last_relayed_at + self._coalesce_window)
 
         if self._data is None:
-            self._data = (
-                data.model_dump()
-                if isinstance(
-                    data,
-                    BaseModel,
-                )
-                else data
-            )
+            self._data = chunk
         else:
             self._data = stitch_model_objects(self._data, data)
         await asyncio.sleep(0.0001)
@@ -171,6 +238,7 @@ class OutputStream:
         """
         Writes raw message to the output stream.
         """
+        self.flush()
         response = self._coordinator.relay(message)
 
         await asyncio.sleep(0.0001)
@@ -189,6 +257,10 @@ class OutputStream:
         """
         Closes the output stream and returns stitched data.
         """
+        with self._lock:
+            self._flush_locked(time.monotonic())
+            self._last_relayed_at = None
+
         output = (
             self._data if not self._output_cls or isinstance(self._data, BaseModel) else self._output_cls(**self._data)
         )
@@ -231,15 +303,14 @@ class OutputStream:
         """
         Bookkeeping entry.
         """
-        timestamp = time.time()
-        timestamped_data = {**data.model_dump(), "timestamp": timestamp}
-
-        self._bookkeeping_queue.put_nowait((self._stream_id, timestamped_data))
+        # Entries are only serialized once the run completes, as streaming actors bookkeep every chunk
+        self._bookkeeping_queue.put_nowait((self._stream_id, data.model_copy(update={"timestamp": time.time()})))
 
     def error(self, error: Exception) -> None:
         """
         Error entry.
         """
+        self.flush()
         self._coordinator.relay(
             Message(
                 type=MessageType.ERRORS,
@@ -0,0 +1,203 @@
+"""
+Actor runtimes.
+
+By default actors are pykka ThreadingActors, each running its message loop on a dedicated thread. With
+ACTOR_RUNTIME set to "asyncio", actors instead run their message loops as tasks on a single shared
+event loop and only borrow a thread from a bounded executor while handling a message, so idle or
+waiting actors don't hold a thread.
+"""
+
+import asyncio
+import functools
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, ClassVar, Optional, Type
+
+from pykka import Actor as PykkaActor
+from pykka import ActorRegistry, ThreadingActor, ThreadingFuture
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+from llmstack.play.utils import ThreadSafeAsyncQueue
+
+logger = logging.getLogger(__name__)
+
+THREADING_RUNTIME = "threading"
+ASYNCIO_RUNTIME = "asyncio"
+
+
+class _ActorInbox(ThreadSafeAsyncQueue):
+    """
+    pykka actor inbox that can be awaited from the runtime's event loop
+    """
+
+    def put(self, envelope) -> None:
+        self.put_nowait(envelope)
+
+    def get(self):
+        return self.get_nowait()
+
+
+class AsyncioActorRuntime:
+    """
+    Runs actor message loops as tasks on a shared event loop. Messages for blocking actors (processors)
+    are handled in a bounded executor, messages for coordination actors in a separate executor so that
+    coordinators waiting on processors can't starve them. Messages for actors that wait on runs of other
+    apps get a thread of their own, since the nested run needs workers from the same bounded executor.
+    """
+
+    def __init__(self, max_workers: int = 64, max_coordination_workers: int = 256):
+        self._loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="actor-worker")
+        self._coordination_executor = ThreadPoolExecutor(
+            max_workers=max_coordination_workers,
+            thread_name_prefix="actor-coordinator",
+        )
+        self._num_actors = 0
+        self._thread = threading.Thread(target=self._run_loop, name="actor-runtime", daemon=True)
+        self._thread.start()
+
+        metrics_registry.gauge(
+            "actor_runtime.actors",
+            "Actors running on the asyncio runtime",
+            fn=self._get_num_actors,
+        )
+
+    def _get_num_actors(self) -> int:
+        return self._num_actors
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def spawn(self, actor: "AsyncioActor") -> None:
+        asyncio.run_coroutine_threadsafe(self._run_actor(actor), self._loop)
+
+    async def _run_in_thread(self, fn, *args) -> Any:
+        future = self._loop.create_future()
+
+        def _set_result(result, exception):
+            if future.done():
+                return
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+        def _run():
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                self._loop.call_soon_threadsafe(_set_result, None, e)
+            else:
+                self._loop.call_soon_threadsafe(_set_result, result, None)
+
+        threading.Thread(target=_run, name="actor-nested-run", daemon=True).start()
+        return await future
+
+    async def _run_actor(self, actor: "AsyncioActor") -> None:
+        if actor.nested_runs:
+            run = self._run_in_thread
+        else:
+            executor = self._executor if actor.blocking else self._coordination_executor
+            run = functools.partial(self._loop.run_in_executor, executor)
+        self._num_actors += 1
+        try:
+            await run(actor._actor_loop_setup)
+            while not actor.actor_stopped.is_set():
+                if actor.actor_inbox.empty():
+                    await actor.actor_inbox.wait()
+                    continue
+
+                envelope = actor.actor_inbox.get()
+                await run(actor._handle_envelope, envelope)
+            # Teardown only fails futures of unhandled messages and doesn't need a worker
+            actor._actor_loop_teardown()
+        except Exception as e:
+            logger.exception(f"Error running actor {actor}: {e}")
+        finally:
+            self._num_actors -= 1
+
+
+class AsyncioActor(PykkaActor):
+    """
+    pykka Actor implementation that runs on the shared AsyncioActorRuntime
+    """
+
+    # Whether message handling may block for long, like processors making network calls.
+    # Coordination actors set this to False and run in their own executor
+    blocking: ClassVar[bool] = True
+    # Whether message handling waits on runs of other apps, like the promptly app processor. Those runs need
+    # workers from the bounded executor, so these actors handle messages on their own threads instead
+    nested_runs: ClassVar[bool] = False
+
+    @staticmethod
+    def _create_actor_inbox():
+        return _ActorInbox()
+
+    @staticmethod
+    def _create_future():
+        return ThreadingFuture()
+
+    def _start_actor_loop(self) -> None:
+        get_runtime().spawn(self)
+
+    def _handle_envelope(self, envelope) -> None:
+        # Handles one message the same way pykka's _actor_loop_running does
+        try:
+            response = self._handle_receive(envelope.message)
+            if envelope.reply_to is not None:
+                envelope.reply_to.set(response)
+        except Exception:
+            if envelope.reply_to is not None:
+                logger.info(f"Exception returned from {self} to caller:", exc_info=sys.exc_info())
+                envelope.reply_to.set_exception()
+            else:
+                self._handle_failure(*sys.exc_info())
+                try:
+                    self.on_failure(*sys.exc_info())
+                except Exception:
+                    self._handle_failure(*sys.exc_info())
+        except BaseException:
+            logger.debug(f"{sys.exc_info()[1]!r} in {self}. Stopping all actors.")
+            self._stop()
+            ActorRegistry.stop_all()
+
+
+_runtime: Optional[AsyncioActorRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AsyncioActorRuntime:
+    global _runtime
+
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                from django.conf import settings
+
+                _runtime = AsyncioActorRuntime(
+                    max_workers=getattr(settings, "ACTOR_RUNTIME_MAX_WORKERS", 64),
+                    max_coordination_workers=getattr(settings, "ACTOR_RUNTIME_MAX_COORDINATION_WORKERS", 256),
+                )
+    return _runtime
+
+
+def get_actor_base_class() -> Type[Any]:
+    """
+    Returns the pykka actor class to build actors on for this deployment
+    """
+    try:
+        from django.conf import settings
+
+        runtime = getattr(settings, "ACTOR_RUNTIME", THREADING_RUNTIME)
+    except Exception:
+        runtime = THREADING_RUNTIME
+
+    if runtime == ASYNCIO_RUNTIME:
+        return AsyncioActor
+    return ThreadingActor
+
+
+ActorBase = get_actor_base_class()
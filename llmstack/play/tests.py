@@ -1,4 +1,18 @@
-from llmstack.play.utils import extract_variables_from_liquid_template
+import asyncio
+import threading
+import time
+import unittest
+
+from diff_match_patch import diff_match_patch
+
+from llmstack.common.utils.liquid import get_template
+from llmstack.play.messages import MessageType
+from llmstack.play.output_stream import OutputStream, stitch_model_objects
+from llmstack.play.utils import (
+    SegmentedTemplateRenderer,
+    ThreadSafeAsyncQueue,
+    extract_variables_from_liquid_template,
+)
 
 # Define the Liquid template
 liquid_template = """
@@ -19,3 +33,135 @@ liquid_template = """
 """
 
 print(extract_variables_from_liquid_template(liquid_template))
+
+
+class ThreadSafeAsyncQueueTest(unittest.TestCase):
+    def test_notify_before_wait_is_not_lost(self):
+        async def _consume():
+            queue = ThreadSafeAsyncQueue()
+            # Notified after the consumer checked its stop conditions but before it started waiting
+            queue.notify()
+            await asyncio.wait_for(queue.wait(), timeout=1)
+            # The notification is consumed by the first wait
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(queue.wait(), timeout=0.05)
+
+        asyncio.run(_consume())
+
+    def test_put_from_thread_wakes_waiter(self):
+        async def _consume():
+            queue = ThreadSafeAsyncQueue()
+            threading.Timer(0.01, queue.put_nowait, args=("item",)).start()
+            await asyncio.wait_for(queue.wait(), timeout=1)
+            return queue.get_nowait()
+
+        self.assertEqual(asyncio.run(_consume()), "item")
+
+
+class SegmentedTemplateRendererTest(unittest.TestCase):
+    def _assert_matches_full_render(self, template, updates):
+        renderer = SegmentedTemplateRenderer(template)
+        dmp = diff_match_patch()
+        data, previous_output = {}, ""
+        for changes in updates:
+            data = {**data, **changes}
+            output, delta = renderer.render(data, changed_roots=set(changes.keys()))
+
+            self.assertEqual(output, get_template(template).render(**data))
+            # Applied the way clients apply deltas, which fails for a delta that doesn't span the previous output
+            self.assertEqual(dmp.diff_text2(dmp.diff_fromDelta(previous_output, delta)), output)
+            previous_output = output
+
+    def test_incremental_render_matches_full_render(self):
+        self._assert_matches_full_render(
+            "Answer: {{ a.text }} / {{ b.text }}!",
+            [
+                {"a": {"text": "x"}, "b": {"text": ""}},
+                {"a": {"text": "xy"}},
+                {"b": {"text": "z"}},
+                {"a": {"text": "xy"}},
+                {"c": "unused"},
+            ],
+        )
+
+    def test_filter_arguments_are_dependencies(self):
+        self._assert_matches_full_render(
+            "{{ a.text | append: b }} / {{ c | default: 'none' }}",
+            [{"a": {"text": "x"}, "b": "", "c": ""}, {"b": "y"}, {"a": {"text": "xz"}}, {"c": "set"}],
+        )
+
+
+class _RecordingCoordinator:
+    def __init__(self):
+        self.messages = []
+
+    def relay(self, message):
+        self.messages.append(message)
+
+    def chunks(self):
+        return [message.data.chunk for message in self.messages if message.type == MessageType.CONTENT_STREAM_CHUNK]
+
+
+class OutputStreamCoalescingTest(unittest.TestCase):
+    def _output_stream(self, coalesce_window, coalesce_max_size=2048):
+        coordinator = _RecordingCoordinator()
+        output_stream = OutputStream(
+            stream_id="processor1",
+            coalesce_window=coalesce_window,
+            coalesce_max_size=coalesce_max_size,
+        )
+        output_stream._coordinator_proxy = coordinator
+        return output_stream, coordinator
+
+    def _write(self, output_stream, chunks):
+        async def _write_all():
+            for chunk in chunks:
+                await output_stream.write(chunk)
+
+        asyncio.run(_write_all())
+
+    def _stitch(self, chunks):
+        stitched = None
+        for chunk in chunks:
+            stitched = stitch_model_objects(stitched, chunk)
+        return stitched
+
+    def test_coalesced_chunks_stitch_to_the_same_output(self):
+        chunks = [{"text": f"{i} ", "choices": [{"text": str(i)}]} for i in range(50)]
+        output_stream, coordinator = self._output_stream(coalesce_window=60)
+
+        self._write(output_stream, chunks)
+        output_stream.finalize()
+
+        # The first chunk is relayed right away and the rest once the stream is finalized
+        self.assertEqual(len(coordinator.chunks()), 2)
+        self.assertEqual(coordinator.chunks()[0], chunks[0])
+        self.assertEqual(self._stitch(coordinator.chunks()), self._stitch(chunks))
+
+    def test_pending_chunks_are_relayed_past_max_size(self):
+        chunks = [{"text": "ab"} for _ in range(10)]
+        output_stream, coordinator = self._output_stream(coalesce_window=60, coalesce_max_size=6)
+
+        self._write(output_stream, chunks)
+
+        self.assertEqual(
+            coordinator.chunks(), [{"text": "ab"}, {"text": "ababab"}, {"text": "ababab"}, {"text": "ababab"}]
+        )
+
+    def test_pending_chunks_are_relayed_after_window(self):
+        output_stream, coordinator = self._output_stream(coalesce_window=0.01)
+
+        self._write(output_stream, [{"text": "a"}, {"text": "b"}, {"text": "c"}])
+        deadline = time.monotonic() + 1
+        while len(coordinator.chunks()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(coordinator.chunks(), [{"text": "a"}, {"text": "bc"}])
+
+    def test_chunks_are_relayed_as_written_without_window(self):
+        chunks = [{"text": "a"}, {"text": "b"}, {"text": "c"}]
+        output_stream, coordinator = self._output_stream(coalesce_window=0)
+
+        self._write(output_stream, chunks)
+
+        self.assertEqual(coordinator.chunks(), chunks)
@@ -2,7 +2,9 @@ import asyncio
 import logging
 import re
 import threading
-from concurrent.futures import CancelledError
+import time
+from collections import deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from urllib.parse import quote
 
 from diff_match_patch import diff_match_patch
@@ -14,13 +16,16 @@ from liquid.expression import (
     Continue,
     Empty,
     FilteredExpression,
+    FloatLiteral,
     Identifier,
     InfixExpression,
+    IntegerLiteral,
     LoopExpression,
     Nil,
+    StringLiteral,
 )
 
-from llmstack.common.utils.liquid import env as liquid_env
+from llmstack.common.utils.liquid import LRUCache, get_template
 
 logger = logging.getLogger(__name__)
 
@@ -88,11 +93,16 @@ def run_coro_in_new_loop(coro, name=None):
         except Exception as e:
             logger.exception(f"Task in loop {name} failed with error: {e}")
         finally:
-            # Find and cancel all pending tasks before stopping the loop
-            for task in asyncio.all_tasks(loop):
-                task.cancel()
+            # The callback runs in the calling thread when the coroutine is already done, so the loop is
+            # stopped from its own thread
+            loop.call_soon_threadsafe(_stop_loop)
 
-            loop.stop()
+    def _stop_loop():
+        # Find and cancel all pending tasks before stopping the loop
+        for task in asyncio.all_tasks(loop):
+            task.cancel()
+
+        loop.stop()
 
     loop = asyncio.new_event_loop()
     t = threading.Thread(target=start_loop, args=(loop,))
@@ -137,10 +147,193 @@ class ResettableTimer(threading.Thread):
             self.condition.notify_all()
 
 
-def extract_variables_from_liquid_template(liquid_template):
+class ThreadSafeAsyncQueue:
+    """
+    A queue that can be written to from any thread and consumed from an asyncio event loop.
+
+    Producers append items and wake up the waiting consumer via call_soon_threadsafe, so consumers
+    never have to poll. Each item is timestamped on put so consumers can measure queueing latency.
+    """
+
+    def __init__(self):
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._waiter = None
+        # Set by notify() when there is no waiter yet, so that the next wait() returns right away
+        self._notified = False
+
+    def _wake(self, waiter):
+        if not waiter:
+            return
+
+        loop, future = waiter
+
+        def _set_result():
+            if not future.done():
+                future.set_result(None)
+
+        try:
+            loop.call_soon_threadsafe(_set_result)
+        except RuntimeError:
+            # Consumer loop is closed
+            pass
+
+    def put_nowait(self, item) -> None:
+        with self._lock:
+            self._items.append((time.perf_counter(), item))
+            waiter, self._waiter = self._waiter, None
+        self._wake(waiter)
+
+    def notify(self) -> None:
+        """
+        Wakes up the consumer without adding an item, so it can re-check its stop conditions. If the consumer
+        isn't waiting yet, its next wait() returns right away
+        """
+        with self._lock:
+            waiter, self._waiter = self._waiter, None
+            if waiter is None:
+                self._notified = True
+        self._wake(waiter)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def get_nowait_with_timestamp(self):
+        """
+        Returns a tuple of (time the item was put, item). Raises asyncio.QueueEmpty if there are no items
+        """
+        try:
+            return self._items.popleft()
+        except IndexError:
+            raise asyncio.QueueEmpty
+
+    def get_nowait(self):
+        return self.get_nowait_with_timestamp()[1]
+
+    async def wait(self) -> None:
+        """
+        Waits until an item is available or notify() is called. Returns right away if notify() was called since
+        the last wait()
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._notified:
+                self._notified = False
+                return
+            if self._items:
+                return
+            future = loop.create_future()
+            self._waiter = (loop, future)
+
+        try:
+            await future
+        finally:
+            with self._lock:
+                if self._waiter and self._waiter[1] is future:
+                    self._waiter = None
+
+
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_shared_executor() -> ThreadPoolExecutor:
+    """
+    Returns the process wide executor used for blocking work started from websocket consumers
+    """
+    global _shared_executor
+
+    if _shared_executor is None:
+        with _shared_executor_lock:
+            if _shared_executor is None:
+                from django.conf import settings
+
+                _shared_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "CONSUMER_EXECUTOR_MAX_WORKERS", 32),
+                    thread_name_prefix="consumer-executor",
+                )
+    return _shared_executor
+
+
+async def run_in_shared_executor(fn, *args):
+    """
+    Runs a blocking function in the shared executor without blocking the event loop
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_shared_executor(), fn, *args)
+
+
+class ConnectionEventQueue:
+    """
+    Processes the events received on a websocket connection as tasks on the connection's event loop.
+
+    Events are handled one at a time in the order they were received. The queue is bounded, so a client
+    sending events faster than they are handled is slowed down by put() instead of growing the queue.
+    Handlers start long running work, like streaming a run's output, with spawn() so that later events
+    such as stop are still handled while it runs. close() cancels pending events and spawned tasks.
+    """
+
+    def __init__(self, handler, maxsize: int = None, name: str = None):
+        if maxsize is None:
+            from django.conf import settings
+
+            maxsize = getattr(settings, "CONSUMER_EVENT_QUEUE_SIZE", 100)
+
+        self._handler = handler
+        self._name = name or "connection"
+        self._queue = asyncio.Queue(maxsize=maxsize)
+        self._worker = None
+        self._tasks = set()
+        self._closed = False
+
+    async def put(self, *args) -> None:
+        if self._closed:
+            return
+
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run(), name=f"{self._name}-events")
+        await self._queue.put(args)
+
+    def spawn(self, coro, name: str = None) -> asyncio.Task:
+        """
+        Runs coro as a task that is cancelled when the connection closes
+        """
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.exception(f"Task {task.get_name()} of {self._name} failed", exc_info=task.exception())
+
+    async def _run(self) -> None:
+        while True:
+            args = await self._queue.get()
+            try:
+                await self._handler(*args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Error handling event for {self._name}: {e}")
+
+    async def close(self) -> None:
+        self._closed = True
+        current_task = asyncio.current_task()
+        tasks = [task for task in list(self._tasks) + [self._worker] if task and task is not current_task]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _extract_variables_from_liquid_template(liquid_template):
     variables = []
 
-    template = liquid_env.from_string(liquid_template)
+    template = get_template(liquid_template)
 
     nodes = extract_nodes(template.tree)
     for node in nodes:
@@ -154,6 +347,16 @@ def extract_variables_from_liquid_template(liquid_template):
     return variables
 
 
+liquid_variables_cache = LRUCache(
+    "liquid_variables_cache", _extract_variables_from_liquid_template, "LIQUID_VARIABLES_CACHE_SIZE"
+)
+
+
+def extract_variables_from_liquid_template(liquid_template):
+    # Return a copy so callers can't mutate the cached list
+    return list(liquid_variables_cache.get(liquid_template))
+
+
 # A utility function to recursively convert template vars of type
 # _inputs[0].xyz to _inputs0.xyz for backward compatibility in a
 # dictionary with nested string values
@@ -213,3 +416,152 @@ class DiffMatchPatch:
     def to_delta(self, text1, text2):
         diffs = self._diff_match_patch.diff_main(text1, text2)
         return self.diff_toDelta(diffs)
+
+    def splice_delta(self, prefix_length, old_text, new_text, suffix_length):
+        """Delta for replacing old_text with new_text when it is surrounded by
+        prefix_length and suffix_length (utf-16 units) of unchanged text.
+        Appends are encoded directly, other changes are diffed within old_text only.
+        """
+        if new_text.startswith(old_text):
+            diffs = [
+                (self._diff_match_patch.DIFF_EQUAL, old_text),
+                (self._diff_match_patch.DIFF_INSERT, new_text[len(old_text) :]),
+            ]
+        else:
+            diffs = self._diff_match_patch.diff_main(old_text, new_text)
+
+        text = []
+        if prefix_length:
+            text.append("=%d" % prefix_length)
+        inner = self.diff_toDelta(diffs)
+        if inner:
+            text.append(inner)
+        if suffix_length:
+            text.append("=%d" % suffix_length)
+
+        return _merge_delta_equalities(text)
+
+
+def _merge_delta_equalities(ops):
+    merged = []
+    for op in "\t".join(ops).split("\t") if ops else []:
+        if merged and op.startswith("=") and merged[-1].startswith("="):
+            merged[-1] = "=%d" % (int(merged[-1][1:]) + int(op[1:]))
+        elif op and op != "=0":
+            merged.append(op)
+    return "\t".join(merged)
+
+
+def utf16_len(text):
+    return len(text.encode("utf-16-be")) // 2
+
+
+class SegmentedTemplateRenderer:
+    """
+    Renders an output template as independent segments of static text and {{ expressions }}.
+
+    The template is compiled once. On each render only expressions that reference the changed top
+    level variables are re-rendered, and the delta against the previous output is computed from the
+    changed segments alone. Templates with tags or whitespace control can't be split this way and
+    raise ValueError so callers can fall back to rendering the whole template.
+    """
+
+    _EXPRESSION_RE = re.compile(r"{{(.*?)}}", re.DOTALL)
+
+    def __init__(self, template: str, dmp: "DiffMatchPatch" = None):
+        if "{%" in template or "{{-" in template or "-}}" in template:
+            raise ValueError("Template with tags or whitespace control cannot be segmented")
+
+        self._dmp = dmp or DiffMatchPatch()
+
+        # List of (static text, compiled expression, referenced root variables)
+        self._segments = []
+        position = 0
+        for match in self._EXPRESSION_RE.finditer(template):
+            if match.start() > position:
+                self._segments.append((template[position : match.start()], None, None))
+            self._segments.append((None, get_template(match.group(0)), self._get_root_variables(match.group(0))))
+            position = match.end()
+        if position < len(template):
+            self._segments.append((template[position:], None, None))
+
+        self.reset()
+
+    @staticmethod
+    def _get_root_variables(expression):
+        try:
+            variables = extract_variables_from_liquid_template(expression)
+        except NotImplementedError:
+            # Unknown expression type, re-render on every change
+            return None
+
+        # Variables passed to filters, like b in {{ a | append: b }}, aren't extracted with the filtered variable
+        for node in extract_nodes(get_template(expression).tree):
+            if not isinstance(node.expression, FilteredExpression):
+                continue
+            for _filter in node.expression.filters:
+                for arg in list(_filter.args) + list((_filter.kwargs or {}).values()):
+                    if isinstance(arg, Identifier):
+                        variables.append(extract_variables(arg))
+                    elif not isinstance(arg, (StringLiteral, IntegerLiteral, FloatLiteral, Nil, Empty, Blank)):
+                        # Arguments that may reference variables in other ways, re-render on every change
+                        return None
+
+        roots = set()
+        for variable in variables:
+            while isinstance(variable, list) and variable:
+                variable = variable[0]
+            if isinstance(variable, str):
+                roots.add(variable)
+        return roots
+
+    def reset(self):
+        self._values = [text or "" for text, _, _ in self._segments]
+        self._lengths = [utf16_len(value) for value in self._values]
+        self._rendered = False
+
+    @property
+    def output(self):
+        return "".join(self._values)
+
+    def render(self, data, changed_roots=None):
+        """
+        Returns a tuple of the rendered output and the delta from the previous render.
+        changed_roots is the set of top level variables that changed since the last render,
+        None re-renders every expression.
+        """
+        if not self._rendered:
+            for index, (_, compiled, _) in enumerate(self._segments):
+                if compiled is not None:
+                    self._values[index] = compiled.render(**data)
+                    self._lengths[index] = utf16_len(self._values[index])
+            self._rendered = True
+            output = self.output
+            return output, self._dmp.splice_delta(0, "", output, 0)
+
+        changes = []
+        for index, (_, compiled, roots) in enumerate(self._segments):
+            if compiled is None:
+                continue
+            if changed_roots is not None and roots is not None and not (roots & changed_roots):
+                continue
+
+            new_value = compiled.render(**data)
+            if new_value != self._values[index]:
+                changes.append((index, new_value))
+
+        if not changes:
+            # Clients apply every delta to their copy of the output, so an unchanged output is one equality
+            return self.output, _merge_delta_equalities(["=%d" % sum(self._lengths)])
+
+        delta_ops = []
+        position = 0
+        for index, new_value in changes:
+            prefix_length = sum(self._lengths[position:index])
+            delta_ops.append(self._dmp.splice_delta(prefix_length, self._values[index], new_value, 0))
+            self._values[index] = new_value
+            self._lengths[index] = utf16_len(new_value)
+            position = index + 1
+        delta_ops.append("=%d" % sum(self._lengths[position:]))
+
+        return self.output, _merge_delta_equalities(delta_ops)
@@ -1,9 +1,9 @@
 import logging
 import time
-from functools import cache
 from typing import Any, Dict, Optional
 
 import ujson as json
+from asgiref.sync import async_to_sync
 from django import db
 from django.shortcuts import get_object_or_404
 from pydantic import BaseModel
@@ -19,10 +19,16 @@ from llmstack.common.blocks.base.processor import (
 )
 from llmstack.common.blocks.base.schema import BaseSchema as _Schema
 from llmstack.common.utils.liquid import hydrate_input
-from llmstack.common.utils.provider_config import get_matched_provider_config
+from llmstack.common.utils.provider_config import get_provider_config_resolver
 from llmstack.play.actor import Actor, BookKeepingData
 from llmstack.processors.providers.config import ProviderConfig, ProviderConfigSource
 from llmstack.processors.providers.metrics import MetricType
+from llmstack.processors.providers.output_cache import (
+    OutputCacheOptions,
+    get_env_fingerprint,
+    get_output_cache_key,
+    get_processor_output_cache,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -157,6 +163,7 @@ class ApiProcessorInterface(
         id=None,
         is_tool=False,
         session_enabled=True,
+        output_cache=None,
     ):
         Actor.__init__(
             self,
@@ -172,6 +179,7 @@ class ApiProcessorInterface(
         self._config_template = self._get_configuration_class()(**config)
         self._input_template = self._get_input_class()(**input)
         self._env = env
+        self._provider_config_resolver = None
         self._session_id = session_id
         self._request_user = request_user
         self._app_uuid = app_uuid
@@ -179,12 +187,26 @@ class ApiProcessorInterface(
         self._is_tool = is_tool
         self._session_enabled = session_enabled
         self._output_template = output_template
+        self._output_cache_options = OutputCacheOptions.model_validate(output_cache) if output_cache else None
+        self._env_fingerprint = None
         self._usage_data = [("promptly/*/*/*", MetricType.INVOCATION, (ProviderConfigSource.PLATFORM_DEFAULT, 1))]
 
         session_data = get_app_session_data(self._session_id, self._id)
         if self._session_enabled:
             self.process_session_data(session_data or {})
 
+    def reset(self):
+        super().reset()
+        self._usage_data = [("promptly/*/*/*", MetricType.INVOCATION, (ProviderConfigSource.PLATFORM_DEFAULT, 1))]
+
+    def rebind(self, session_id=None, request_user=None, output_cache=None):
+        self._session_id = session_id
+        self._request_user = request_user
+        self._output_cache_options = OutputCacheOptions.model_validate(output_cache) if output_cache else None
+
+        if self._session_enabled:
+            self.process_session_data(get_app_session_data(self._session_id, self._id) or {})
+
     @classmethod
     def get_output_schema(cls) -> dict:
         schema = json.loads(cls._get_output_schema())
@@ -254,15 +276,17 @@ class ApiProcessorInterface(
             }
         ]
 
-    @cache
     def get_provider_config(
         self, model_slug: str = "*", deployment_key: str = "*", provider_slug=None, processor_slug=None
     ) -> ProviderConfig:
         """
         Finds the provider config schema class and get the
         """
-        return get_matched_provider_config(
-            provider_configs=self._env.get("provider_configs", {}),
+        # The env doesn't change for the lifetime of the actor, so its provider configs are compiled once
+        if self._provider_config_resolver is None:
+            self._provider_config_resolver = get_provider_config_resolver(self._env.get("provider_configs", {}))
+
+        return self._provider_config_resolver.resolve(
             provider_slug=provider_slug or self.provider_slug(),
             processor_slug=processor_slug or self.slug(),
             model_slug=model_slug,
@@ -284,8 +308,65 @@ class ApiProcessorInterface(
         return {"credits": 1000, "usage_metrics": self._usage_data}
 
     def is_output_cacheable(self) -> bool:
+        """
+        Whether outputs can be replayed for identical inputs. Processors with side effects or whose output
+        depends on more than their input, config and session data should return False
+        """
         return True
 
+    def _get_output_cache_key(self) -> Optional[str]:
+        """
+        Returns the output cache key for the current input or None if the output should not be cached
+        """
+        options = self._output_cache_options
+        if not options or not self.is_output_cacheable():
+            return None
+
+        if self._env_fingerprint is None:
+            self._env_fingerprint = get_env_fingerprint(self._env)
+
+        user_id = self._request_user.id if self._request_user and self._request_user.is_authenticated else ""
+        return get_output_cache_key(
+            provider_slug=self.provider_slug(),
+            processor_slug=self.slug(),
+            scope=f"{self._app_uuid}:{user_id}:{self._env_fingerprint}",
+            input=self._input.model_dump() if isinstance(self._input, BaseModel) else self._input,
+            config=self._config.model_dump() if isinstance(self._config, BaseModel) else self._config,
+            session_data=self.session_data_to_persist() if self._session_enabled else {},
+        )
+
+    def _replay_cached_output(self, entry: dict) -> Any:
+        """
+        Restores session data from a cached run and sends its output through the output stream
+        """
+        if self._session_enabled and entry.get("session_data"):
+            self.process_session_data(entry["session_data"])
+
+        async_to_sync(self._output_stream.write)(entry.get("output", {}))
+        return self._output_stream.finalize()
+
+    def _cache_output(self, cache_key: str, output: Any) -> None:
+        if not output:
+            return
+
+        try:
+            output_dict = output.model_dump() if isinstance(output, BaseModel) else output
+
+            # Assets are scoped to the session that created them and can't be shared with other runs
+            if "objref://" in json.dumps(output_dict):
+                return
+
+            get_processor_output_cache().set(
+                cache_key,
+                {
+                    "output": output_dict,
+                    "session_data": self.session_data_to_persist() if self._session_enabled else {},
+                },
+                self._output_cache_options,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache output of {self.provider_slug()}/{self.slug()}: {e}")
+
     def validate(self, input: dict):
         """
         Validate the input
@@ -350,7 +431,16 @@ class ApiProcessorInterface(
                     if self._config and message
                     else self._config_template
                 )
-            output = self.process()
+            cache_key = self._get_output_cache_key()
+            cached_entry = None
+            if cache_key:
+                cached_entry = get_processor_output_cache().get(cache_key, self._output_cache_options)
+            if cached_entry:
+                output = self._replay_cached_output(cached_entry)
+            else:
+                output = self.process()
+                if cache_key:
+                    self._cache_output(cache_key, output)
         except Exception as e:
             logger.exception("Error processing input")
             output = {
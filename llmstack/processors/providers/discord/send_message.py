@@ -78,6 +78,9 @@ class DiscordSendMessageProcessor(
         )
         return response
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         input = self._input.model_dump()
         self._send_message(
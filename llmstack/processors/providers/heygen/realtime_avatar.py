@@ -215,6 +215,9 @@ class RealtimeAvatarProcessor(
                 if response.status_code != 200:
                     logger.error(f"Error creating task for input stream: {response.text}")
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         output_stream = self._output_stream
         self._disable_history = True
@@ -63,6 +63,9 @@ class JunosDevice(
     def provider_slug() -> str:
         return "juniper"
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         output_stream = self._output_stream
         command = self._input.command
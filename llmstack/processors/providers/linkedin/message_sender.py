@@ -141,6 +141,9 @@ class MessageSenderProcessor(
             jsonpath="$.code",
         )
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         from django.conf import settings
 
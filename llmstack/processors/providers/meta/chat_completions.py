@@ -153,7 +153,7 @@ class MessagesProcessor(ApiProcessorInterface[MessagesInput, MessagesOutput, Mes
         return {}
 
     def process(self) -> MessagesOutput:
-        from llmstack.common.utils.sslr import LLM
+        from llmstack.common.utils.llm_client_pool import get_llm_client
 
         deployment_config = self.get_provider_config(model_slug=self._config.model)
         if not deployment_config:
@@ -171,7 +171,9 @@ class MessagesProcessor(ApiProcessorInterface[MessagesInput, MessagesOutput, Mes
         for message in self._input.messages:
             messages.append({"role": str(message.role), "content": str(message.message)})
 
-        client = LLM(provider="custom", deployment_config=deployment_config.model_dump().get("deployment_config"))
+        client = get_llm_client(
+            provider="custom", deployment_config=deployment_config.model_dump().get("deployment_config")
+        )
 
         result = client.chat.completions.create(
             messages=messages,
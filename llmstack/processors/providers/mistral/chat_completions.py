@@ -129,10 +129,10 @@ class MessagesProcessor(ApiProcessorInterface[MessagesInput, MessagesOutput, Mes
         return {}
 
     def process(self) -> MessagesOutput:
-        from llmstack.common.utils.sslr import LLM
+        from llmstack.common.utils.llm_client_pool import get_llm_client
 
         mistral_provider_config = self.get_provider_config(model_slug=self._config.model.model_name())
-        client = LLM(
+        client = get_llm_client(
             provider="mistral",
             mistral_api_key=mistral_provider_config.api_key,
         )
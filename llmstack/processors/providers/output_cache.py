@@ -0,0 +1,169 @@
+"""
+Cache for processor outputs.
+
+Sheets and batch runs often invoke a processor with the exact same input and configuration. When an app
+opts in, the output of a processor run is cached under a key derived from the processor, the hydrated
+input and config and the processor's session state, and replayed through the output stream when the
+same invocation is seen again.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson as json
+from django.conf import settings
+from django.core.cache import caches
+from pydantic import BaseModel
+
+from llmstack.common.utils.metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+PROCESSOR_OUTPUT_CACHE_ALIAS = "processor_output_cache"
+
+# Request header to skip cached outputs for a run
+CACHE_BYPASS_HEADER = "X-Promptly-Cache-Bypass"
+
+
+class OutputCacheOptions(BaseModel):
+    ttl: int
+    max_entry_size: int
+    bypass: bool = False
+
+
+def get_output_cache_options(app_config: Dict, source_type: str, bypass: bool = False) -> Optional[OutputCacheOptions]:
+    """
+    Returns the output cache options for runs of an app or None if its processor outputs are not cached.
+    processor_cache_ttl in the app config takes precedence over the default for the run's source
+    """
+    if not getattr(settings, "PROCESSOR_OUTPUT_CACHE_ENABLED", False):
+        return None
+
+    app_config = app_config or {}
+    ttl = app_config.get("processor_cache_ttl")
+    if ttl is None and str(source_type) in settings.PROCESSOR_OUTPUT_CACHE_SOURCES:
+        ttl = settings.PROCESSOR_OUTPUT_CACHE_DEFAULT_TTL
+
+    try:
+        ttl = int(ttl or 0)
+        max_entry_size = int(
+            app_config.get("processor_cache_max_entry_size") or settings.PROCESSOR_OUTPUT_CACHE_MAX_ENTRY_SIZE
+        )
+    except (TypeError, ValueError):
+        logger.warning("Invalid processor cache settings in app config")
+        return None
+
+    if ttl <= 0:
+        return None
+
+    return OutputCacheOptions(
+        ttl=ttl,
+        max_entry_size=min(max_entry_size, settings.PROCESSOR_OUTPUT_CACHE_MAX_ENTRY_SIZE),
+        bypass=bypass,
+    )
+
+
+def is_cache_bypass_requested(headers) -> bool:
+    value = headers.get(CACHE_BYPASS_HEADER, "") or ""
+    return value.lower() in ("1", "true", "yes") or "no-cache" in (headers.get("Cache-Control", "") or "")
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, option=json.OPT_SORT_KEYS, default=str)
+
+
+def get_env_fingerprint(env: Dict) -> str:
+    return hashlib.sha256(_dumps(env or {})).hexdigest()
+
+
+def get_output_cache_key(
+    provider_slug: str,
+    processor_slug: str,
+    scope: str,
+    input: Dict,
+    config: Dict,
+    session_data: Dict,
+) -> str:
+    """
+    Key for a processor invocation. scope identifies the app, user and provider configs the processor ran
+    with so outputs are never shared across them
+    """
+    digest = hashlib.sha256(
+        _dumps({"scope": scope, "input": input, "config": config, "session_data": session_data}),
+    ).hexdigest()
+    return f"processor_output:{provider_slug}:{processor_slug}:{digest}"
+
+
+class ProcessorOutputCache:
+    def __init__(self, alias: str = PROCESSOR_OUTPUT_CACHE_ALIAS):
+        self._alias = alias
+
+        self._hits = metrics_registry.counter("processor_output_cache.hits", "Processor runs served from cache")
+        self._misses = metrics_registry.counter("processor_output_cache.misses", "Cacheable processor runs not cached")
+        self._bypasses = metrics_registry.counter(
+            "processor_output_cache.bypasses", "Processor runs that skipped the cache on request"
+        )
+        self._stores = metrics_registry.counter("processor_output_cache.stores", "Processor outputs written to cache")
+        self._oversized = metrics_registry.counter(
+            "processor_output_cache.oversized", "Processor outputs too large to cache"
+        )
+        self._errors = metrics_registry.counter("processor_output_cache.errors", "Failed cache reads and writes")
+        metrics_registry.gauge("processor_output_cache.hit_rate", "Ratio of cache hits to lookups", fn=self.hit_rate)
+
+    @property
+    def _cache(self):
+        return caches[self._alias]
+
+    def hit_rate(self) -> float:
+        lookups = self._hits.value + self._misses.value
+        return self._hits.value / lookups if lookups else 0
+
+    def get(self, key: str, options: OutputCacheOptions) -> Optional[Dict]:
+        """
+        Returns the cached entry for key. Bypassed lookups always miss, but their outputs are still cached
+        """
+        if options.bypass:
+            self._bypasses.inc()
+            return None
+
+        try:
+            value = self._cache.get(key)
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"Error reading processor output cache: {e}")
+            value = None
+
+        if value is None:
+            self._misses.inc()
+            return None
+
+        self._hits.inc()
+        return json.loads(value)
+
+    def set(self, key: str, entry: Dict, options: OutputCacheOptions) -> bool:
+        value = _dumps(entry)
+        if len(value) > options.max_entry_size:
+            self._oversized.inc()
+            return False
+
+        try:
+            self._cache.set(key, value, timeout=options.ttl)
+        except Exception as e:
+            self._errors.inc()
+            logger.warning(f"Error writing processor output cache: {e}")
+            return False
+
+        self._stores.inc()
+        return True
+
+
+_processor_output_cache = None
+
+
+def get_processor_output_cache() -> ProcessorOutputCache:
+    global _processor_output_cache
+
+    if _processor_output_cache is None:
+        _processor_output_cache = ProcessorOutputCache()
+    return _processor_output_cache
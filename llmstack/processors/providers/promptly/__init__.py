@@ -3,7 +3,7 @@ from typing import Literal, Optional, Union
 from pydantic import BaseModel, Field
 
 from llmstack.common.blocks.base.schema import StrEnum
-from llmstack.common.utils.sslr._client import LLM
+from llmstack.common.utils.llm_client_pool import get_llm_client
 from llmstack.processors.providers.config import ProviderConfig
 from llmstack.processors.providers.google import get_google_credentials_from_json_key
 
@@ -177,7 +177,7 @@ def get_llm_client_from_provider_config(provider, model_slug, get_provider_confi
     if openai_provider_config and openai_provider_config.base_url:
         openai_base_url = openai_provider_config.base_url
 
-    return LLM(
+    return get_llm_client(
         provider=provider,
         openai_api_key=openai_provider_config.api_key if openai_provider_config else "",
         stabilityai_api_key=stability_provider_config.api_key if stability_provider_config else "",
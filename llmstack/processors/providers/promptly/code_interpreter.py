@@ -163,6 +163,9 @@ class CodeInterpreterProcessor(
 
         return asset
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         content_files = []
         for file in self._input.files.split("|"):
@@ -1,13 +1,19 @@
+import concurrent.futures
 import logging
+import threading
+import time
 import urllib.parse
 import uuid
+from collections import defaultdict
 from typing import List, Optional
 
 from asgiref.sync import async_to_sync
-from django.shortcuts import get_object_or_404
+from django.db import close_old_connections
+from django.http import Http404
 from pydantic import BaseModel, Field
 
 from llmstack.apps.schemas import OutputTemplate
+from llmstack.common.blocks.base.schema import StrEnum
 from llmstack.data.models import DataSource
 from llmstack.processors.providers.api_processor_interface import (
     ApiProcessorInterface,
@@ -16,6 +22,62 @@ from llmstack.processors.providers.api_processor_interface import (
 
 logger = logging.getLogger(__name__)
 
+# Datasource searches from all runs share this pool so a slow store can't pile up threads
+_search_executor = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="datasource-search")
+
+# Constant from the reciprocal rank fusion paper, dampens the weight of top ranks
+RRF_K = 60
+
+
+class DocumentMergeMode(StrEnum):
+    SCORE = "score"
+    RECIPROCAL_RANK_FUSION = "reciprocal_rank_fusion"
+
+
+def reciprocal_rank_fusion(ranked_lists, k=RRF_K):
+    """
+    Merges ranked lists of documents by the sum of 1 / (k + rank) of each document across the lists.
+    Unlike raw scores, ranks are comparable across stores. Documents with the same source and content
+    are merged.
+    """
+    scores = {}
+    documents = {}
+    for ranked_documents in ranked_lists:
+        for rank, document in enumerate(ranked_documents, start=1):
+            key = (document.metadata.get("source"), document.page_content)
+            documents.setdefault(key, document)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+    fused = sorted(scores.keys(), key=lambda key: scores[key], reverse=True)
+    for key in fused:
+        documents[key].metadata["rrf_score"] = scores[key]
+    return [documents[key] for key in fused]
+
+
+class QueryEmbeddings:
+    """
+    Computes the query embedding once per embedding model and owner, shared by the datasource searches of a run
+    """
+
+    def __init__(self, query: str):
+        self._query = query
+        self._embeddings = {}
+        self._locks = defaultdict(threading.Lock)
+        self._lock = threading.Lock()
+
+    def get(self, pipeline) -> Optional[List[float]]:
+        key = pipeline.embedding_key
+        if key is None:
+            return None
+
+        with self._lock:
+            key_lock = self._locks[key]
+
+        with key_lock:
+            if key not in self._embeddings:
+                self._embeddings[key] = pipeline.get_query_embedding(self._query)
+        return self._embeddings[key]
+
 
 class DataSourceSearchInput(ApiProcessorSchema):
     query: str
@@ -65,6 +127,17 @@ class DataSourceSearchConfigurations(ApiProcessorSchema):
         le=1.0,
         multiple_of=0.01,
     )
+    merge_mode: DocumentMergeMode = Field(
+        default=DocumentMergeMode.SCORE,
+        description="How to merge results from multiple datasources. Scores are not comparable across stores, "
+        "reciprocal rank fusion merges by each document's rank in its datasource",
+        json_schema_extra={"widget": "customselect"},
+    )
+    search_timeout: Optional[float] = Field(
+        default=30,
+        description="Seconds to wait for each datasource. Datasources that don't respond in time are skipped",
+        gt=0,
+    )
 
 
 class DataSourceSearchProcessor(
@@ -90,35 +163,71 @@ class DataSourceSearchProcessor(
     def get_output_template(cls) -> Optional[OutputTemplate]:
         return OutputTemplate(markdown="""{{ answers_text }}""", jsonpath="$.answers")
 
-    def process(self) -> DataSourceSearchOutput:
-        input_data = self._input
-        hybrid_semantic_search_ratio = self._config.hybrid_semantic_search_ratio
+    def _get_datasources(self) -> List[DataSource]:
+        datasource_uuids = [uuid.UUID(datasource_uuid) for datasource_uuid in self._config.datasources or []]
+        datasources = {
+            datasource.uuid: datasource
+            for datasource in DataSource.objects.filter(uuid__in=datasource_uuids).select_related("owner")
+        }
+        for datasource_uuid in datasource_uuids:
+            if datasource_uuid not in datasources:
+                raise Http404(f"Datasource {datasource_uuid} not found")
 
-        documents = []
-        for datasource_uuid in self._config.datasources:
-            datasource = get_object_or_404(DataSource, uuid=uuid.UUID(datasource_uuid))
+        return [datasources[datasource_uuid] for datasource_uuid in datasource_uuids]
+
+    def _search_datasource(self, datasource: DataSource, query_embeddings: QueryEmbeddings) -> List:
+        try:
             pipeline = datasource.create_data_query_pipeline()
+            return pipeline.search(
+                query=self._input.query,
+                alpha=self._config.hybrid_semantic_search_ratio,
+                limit=self._config.document_limit,
+                use_hybrid_search=True,
+                query_embedding=query_embeddings.get(pipeline),
+            )
+        finally:
+            close_old_connections()
+
+    def _search_datasources(self, datasources: List[DataSource]) -> List[List]:
+        """
+        Searches all datasources concurrently and returns the results of each datasource that responded
+        within the timeout, in the order of the datasources
+        """
+        query_embeddings = QueryEmbeddings(self._input.query)
+        futures = [
+            (datasource, _search_executor.submit(self._search_datasource, datasource, query_embeddings))
+            for datasource in datasources
+        ]
+        deadline = time.monotonic() + self._config.search_timeout if self._config.search_timeout else None
+
+        results = []
+        for datasource, future in futures:
             try:
-                result = pipeline.search(
-                    query=input_data.query,
-                    alpha=hybrid_semantic_search_ratio,
-                    limit=self._config.document_limit,
-                    use_hybrid_search=True,
-                )
-                documents.extend(result)
+                results.append(future.result(timeout=max(deadline - time.monotonic(), 0) if deadline else None))
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                logger.warning(f"Timed out searching datasource {datasource.uuid}")
             except BaseException:
                 logger.exception("Error while searching")
                 raise Exception("Error while searching")
 
-        if documents and len(documents) > 0:
-            if "score" in documents[0].metadata:
-                documents = sorted(
-                    documents,
-                    key=lambda d: d.metadata["score"],
-                    reverse=True,
-                )[: self._config.document_limit]
-            else:
-                documents = documents[: self._config.document_limit]
+        return results
+
+    def _merge_documents(self, results: List[List]) -> List:
+        if self._config.merge_mode == DocumentMergeMode.RECIPROCAL_RANK_FUSION:
+            return reciprocal_rank_fusion(results)[: self._config.document_limit]
+
+        documents = [document for result in results for document in result]
+        if documents and "score" in documents[0].metadata:
+            documents = sorted(
+                documents,
+                key=lambda d: d.metadata["score"],
+                reverse=True,
+            )
+        return documents[: self._config.document_limit]
+
+    def process(self) -> DataSourceSearchOutput:
+        documents = self._merge_documents(self._search_datasources(self._get_datasources()))
 
         answers = []
         answer_text = ""
@@ -194,6 +194,9 @@ class FileOperationsProcessor(
             disable_history=self.disable_history(),
         )
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         input_content_bytes = None
         input_content_mime_type = None
@@ -289,6 +289,9 @@ class PromptlyHttpAPIProcessor(
     def tool_invoke_input(self, tool_args: dict):
         return HttpAPIProcessorInput(input_data=json.dumps(tool_args))
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self):
         input_json = json.loads(self._input.input_data or "{}")
 
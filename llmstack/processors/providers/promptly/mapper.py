@@ -1,16 +1,19 @@
 import ast
+import asyncio
 import base64
 import json
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 
 from asgiref.sync import async_to_sync
+from django import db
+from django.conf import settings
 from pydantic import Field
 
 from llmstack.apps.schemas import OutputTemplate
 from llmstack.common.blocks.base.schema import BaseSchema as Schema
-from llmstack.common.utils.liquid import render_template
 from llmstack.processors.providers.api_processor_interface import ApiProcessorInterface
 from llmstack.processors.providers.promptly.promptly_app import (
     PromptlyApp,
@@ -29,6 +32,14 @@ class MapProcessorOutput(Schema):
     outputs: List[str] = []
     objrefs: List[str] = []
     outputs_text: str = ""
+    errors: List[str] = Field(
+        default=[],
+        description="Errors of the items that failed, empty for the items that succeeded",
+        json_schema_extra={"widget": "hidden"},
+    )
+    completed: Optional[int] = Field(
+        default=None, description="Number of items completed", json_schema_extra={"widget": "hidden"}
+    )
     processing: Optional[bool] = Field(default=None, description="processing", json_schema_extra={"widget": "hidden"})
 
 
@@ -38,6 +49,14 @@ class MapProcessorConfiguration(PromptlyApp):
         title="Output as Object Reference",
         description="Return output as object reference instead of raw text.",
     )
+    concurrency: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        title="Concurrency",
+        description="Number of items to process at once. Results are returned in the order of the input list.",
+        json_schema_extra={"advanced_parameter": True},
+    )
 
 
 class MapProcessor(ApiProcessorInterface[MapProcessorInput, MapProcessorOutput, MapProcessorConfiguration]):
@@ -45,6 +64,8 @@ class MapProcessor(ApiProcessorInterface[MapProcessorInput, MapProcessorOutput,
     Map processor
     """
 
+    nested_runs = True
+
     @staticmethod
     def name() -> str:
         return "Map"
@@ -84,20 +105,56 @@ class MapProcessor(ApiProcessorInterface[MapProcessorInput, MapProcessorOutput,
     def disable_history(self) -> bool:
         return True
 
-    async def process_response_stream(self, response_stream, output_template):
-        buf = ""
-        async for resp in response_stream:
-            if resp.get("session") and resp.get("csp") and resp.get("template"):
-                self._store_run_session_id = resp["session"]
-                continue
-            rendered_output = render_template(output_template, resp)
-            buf += rendered_output
-        return buf
-
-    def process(self) -> dict:
+    def _run_item(self, app_uuid, app_input) -> str:
         from llmstack.apps.apis import AppViewSet
-        from llmstack.apps.models import AppData
+        from llmstack.apps.runner.app_runner import (
+            AppRunnerRequest,
+            AppRunnerResponseErrorsData,
+            PlatformAppRunnerSource,
+        )
+
+        # Each item runs in its own session and event loop, so that concurrent items don't share app state
+        session_id = str(uuid.uuid4())
+        request_user = self._request_user if self._request_user and self._request_user.is_authenticated else None
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            app_runner = AppViewSet().get_app_runner(
+                session_id=session_id,
+                app_uuid=app_uuid,
+                source=PlatformAppRunnerSource(
+                    slug=f"{self.provider_slug()}/{self.slug()}",
+                    request_user_email=request_user.email if request_user else None,
+                    request_user=request_user,
+                ),
+                request_user=request_user,
+            )
+            try:
+                response = app_runner.run_until_complete(
+                    AppRunnerRequest(client_request_id=str(uuid.uuid4()), session_id=session_id, input=app_input),
+                    loop,
+                )
+            finally:
+                loop.run_until_complete(app_runner.stop())
+        finally:
+            loop.close()
+            db.connection.close()
+
+        if response is None:
+            raise Exception("App run did not complete")
+        if isinstance(response.data, AppRunnerResponseErrorsData):
+            raise Exception("\n".join(error.message for error in response.data.errors))
+        return response.data.output.get("output", "")
+
+    def _write_item_progress(self, completed):
+        # Only the count is streamed per item. Stitching lists written slot by slot from items completing out of
+        # order doesn't preserve every slot, so the ordered outputs are written once all the items are done
+        async_to_sync(self._output_stream.write)(MapProcessorOutput(processing=True, completed=completed))
+
+    def is_output_cacheable(self) -> bool:
+        return False
 
+    def process(self) -> dict:
         if self._input.input_list_json and not self._input.input_list:
             try:
                 self._input.input_list = json.loads(self._input.input_list_json)
@@ -105,30 +162,32 @@ class MapProcessor(ApiProcessorInterface[MapProcessorInput, MapProcessorOutput,
                 self._input.input_list = ast.literal_eval(self._input.input_list_json)
 
         _input_list = self._input.input_list
+        promptly_app = json.loads(self._config.promptly_app)
 
-        app_data = AppData.objects.filter(
-            app_uuid=self._config._promptly_app_uuid, version=self._config._promptly_app_version
-        ).first()
-        output_template = app_data.data.get("output_template").get("markdown")
         output_response = [""] * len(_input_list)
-
-        for idx in range(len(_input_list)):
-            app_input = {**self._config.input, **_input_list[idx]}
-            self._request.data["input"] = app_input
-
-            response_stream, _ = AppViewSet().run_app_internal(
-                self._config._promptly_app_uuid,
-                self._metadata.get("session_id"),
-                str(uuid.uuid4()),
-                self._request,
-                platform="promptly",
-                preview=False,
-                app_store_uuid=None,
-            )
-
-            result = async_to_sync(self.process_response_stream)(response_stream, output_template=output_template)
-            async_to_sync(self._output_stream.write)(MapProcessorOutput(processing=True))
-            output_response[idx] = result
+        errors = [""] * len(_input_list)
+
+        # Items run on a bounded pool and complete in any order. A failed item leaves an empty output and its error
+        # in its slot without affecting the other items
+        max_workers = max(min(self._config.concurrency, getattr(settings, "MAP_PROCESSOR_MAX_CONCURRENCY", 16)), 1)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="map_processor") as executor:
+            futures = {
+                executor.submit(
+                    self._run_item, promptly_app["promptly_app_uuid"], {**promptly_app.get("input", {}), **item}
+                ): idx
+                for idx, item in enumerate(_input_list)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                idx = futures[future]
+                try:
+                    output_response[idx] = future.result()
+                except Exception as e:
+                    logger.exception(f"Error processing item {idx} of the map input")
+                    errors[idx] = str(e) or e.__class__.__name__
+                self._write_item_progress(completed)
+
+        if any(errors):
+            async_to_sync(self._output_stream.write)(MapProcessorOutput(errors=errors))
 
         if self._config.objref:
             objrefs = []
@@ -96,6 +96,9 @@ class NotificationSenderProcessor(
     def get_output_template(cls) -> OutputTemplate | None:
         return OutputTemplate(markdown="{{code}}", jsonpath="$.code")
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         text_content = self._input.text_body
         html_content = self._input.html_body
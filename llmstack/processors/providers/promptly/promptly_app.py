@@ -112,6 +112,8 @@ class PromptlyAppConfiguration(PromptlyApp):
 
 
 class PromptlyAppProcessor(ApiProcessorInterface[PromptlyAppInput, PromptlyAppOutput, PromptlyAppConfiguration]):
+    nested_runs = True
+
     @staticmethod
     def name() -> str:
         return "Promptly App"
@@ -163,6 +165,9 @@ class PromptlyAppProcessor(ApiProcessorInterface[PromptlyAppInput, PromptlyAppOu
             async_to_sync(self._output_stream.write)(PromptlyAppOutput(processing=True))
         return buf
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         from llmstack.apps.apis import AppViewSet
         from llmstack.apps.models import AppData
@@ -54,6 +54,8 @@ class ReduceProcessor(
     Reduce processor
     """
 
+    nested_runs = True
+
     @staticmethod
     def name() -> str:
         return "Reduce"
@@ -104,6 +106,9 @@ class ReduceProcessor(
                 self._reducer_dict[key] = value
         return super().input(message)
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         from llmstack.apps.apis import AppViewSet
         from llmstack.apps.models import AppData
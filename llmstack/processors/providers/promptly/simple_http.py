@@ -119,6 +119,9 @@ class SimpleHTTPProcessor(
             jsonpath="$.response",
         )
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         connection = (
             self._env["connections"].get(
@@ -791,6 +791,9 @@ class WebBrowser(
             )
         return output
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         if self._config.provider_config.provider == "anthropic":
             return self._process_anthropic()
@@ -204,6 +204,9 @@ class SlackPostMessageProcessor(
 
         return response
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         input = self._input.model_dump()
 
@@ -194,7 +194,7 @@ class ImageToImage(
         )
 
     def process(self) -> dict:
-        from llmstack.common.utils.sslr import LLM
+        from llmstack.common.utils.llm_client_pool import get_llm_client
 
         image_file = self._input.image_file or None
         if (image_file is None or image_file == "") and self._input.image_file_data:
@@ -210,7 +210,7 @@ class ImageToImage(
         provider_config = self.get_provider_config(
             model_slug=self._config.engine_id.model_name(),
         )
-        client = LLM(
+        client = get_llm_client(
             provider="stabilityai",
             stabilityai_api_key=provider_config.api_key,
         )
@@ -86,7 +86,7 @@ class RemoveBackgroundProcessor(
         )
 
     def process(self) -> dict:
-        from llmstack.common.utils.sslr import LLM
+        from llmstack.common.utils.llm_client_pool import get_llm_client
         from llmstack.common.utils.sslr._utils import resize_image_file
 
         image_file = self._input.image_file or None
@@ -103,7 +103,7 @@ class RemoveBackgroundProcessor(
         data_bytes = resize_image_file(data_bytes, max_pixels=4194304, max_size=10485760)
 
         provider_config = self.get_provider_config(model_slug=self._config.engine_id.model_name())
-        client = LLM(provider=PROVIDER_STABILITYAI, stabilityai_api_key=provider_config.api_key)
+        client = get_llm_client(provider=PROVIDER_STABILITYAI, stabilityai_api_key=provider_config.api_key)
         result = client.images.edit(
             prompt="",
             image=data_bytes,
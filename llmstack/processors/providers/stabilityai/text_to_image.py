@@ -93,10 +93,10 @@ class TextToImage(ApiProcessorInterface[TextToImageInput, TextToImageOutput, Tex
         )
 
     def process(self) -> dict:
-        from llmstack.common.utils.sslr import LLM
+        from llmstack.common.utils.llm_client_pool import get_llm_client
 
         provider_config = self.get_provider_config(model_slug=self._config.engine_id.model_name())
-        client = LLM(
+        client = get_llm_client(
             provider="stabilityai",
             stabilityai_api_key=provider_config.api_key,
         )
@@ -85,6 +85,9 @@ class TwilioCreateMessageProcessor(
         response = http_processor.process(input.model_dump()).model_dump()
         return response
 
+    def is_output_cacheable(self) -> bool:
+        return False
+
     def process(self) -> dict:
         self._twilio_api_response = None
         input = self._input.model_dump()
@@ -1 +1,88 @@
-# Create your tests here.
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+from llmstack.apps.runner.app_runner import (
+    AppRunnerResponseError,
+    AppRunnerResponseErrorsData,
+    AppRunnerResponseOutputData,
+    AppRunnerStreamingResponse,
+    AppRunnerStreamingResponseType,
+)
+from llmstack.play.output_stream import OutputStream
+from llmstack.processors.providers.promptly.mapper import (
+    MapProcessor,
+    MapProcessorOutput,
+)
+
+
+class _StubAppRunner:
+    """
+    Runs a stub app that greets its input after its delay, or fails for inputs with fail set
+    """
+
+    def run_until_complete(self, request, event_loop):
+        time.sleep(request.input.get("delay", 0))
+        if request.input.get("fail"):
+            return AppRunnerStreamingResponse(
+                id=request.session_id,
+                type=AppRunnerStreamingResponseType.ERRORS,
+                data=AppRunnerResponseErrorsData(errors=[AppRunnerResponseError(message="Item failed")]),
+            )
+        return AppRunnerStreamingResponse(
+            id=request.session_id,
+            type=AppRunnerStreamingResponseType.OUTPUT,
+            data=AppRunnerResponseOutputData(output={"output": f"{request.input['greeting']} {request.input['name']}"}),
+        )
+
+    async def stop(self):
+        pass
+
+
+class _StubCoordinator:
+    def relay(self, message):
+        pass
+
+
+class MapProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.runs = []
+
+    def _get_app_runner(self, session_id, app_uuid, source, request_user, preview=False, app_data=None):
+        self.runs.append((session_id, app_uuid))
+        return _StubAppRunner()
+
+    def _process(self, input_list):
+        processor = MapProcessor.__new__(MapProcessor)
+        processor._request_user = None
+        processor._config = MapProcessor._get_configuration_class()(
+            promptly_app=json.dumps({"promptly_app_uuid": "app-uuid", "input": {"greeting": "Hello"}}),
+            concurrency=len(input_list),
+        )
+        processor._input = MapProcessor._get_input_class()(input_list=input_list)
+        processor._output_stream = OutputStream(stream_id="map1", output_cls=MapProcessorOutput, coalesce_window=0)
+        processor._output_stream._coordinator_proxy = _StubCoordinator()
+
+        with patch("llmstack.apps.apis.AppViewSet.get_app_runner", self._get_app_runner):
+            return processor.process()
+
+    def test_outputs_keep_input_order(self):
+        # Items complete in the order b, a, c
+        output = self._process(
+            [{"name": "a", "delay": 0.1}, {"name": "b"}, {"name": "c", "delay": 0.2}],
+        )
+
+        self.assertEqual(output.outputs, ["Hello a", "Hello b", "Hello c"])
+        self.assertEqual(json.loads(output.outputs_text), ["Hello a", "Hello b", "Hello c"])
+        self.assertEqual(output.errors, [])
+        self.assertEqual(output.completed, 3)
+        # Every item runs the configured app in its own session
+        self.assertEqual([app_uuid for _, app_uuid in self.runs], ["app-uuid"] * 3)
+        self.assertEqual(len({session_id for session_id, _ in self.runs}), 3)
+
+    def test_failed_item_keeps_its_error_in_its_slot(self):
+        output = self._process([{"name": "a", "delay": 0.1}, {"name": "b", "fail": True}, {"name": "c"}])
+
+        self.assertEqual(output.outputs, ["Hello a", "", "Hello c"])
+        self.assertEqual(output.errors, ["", "Item failed", ""])
@@ -31,7 +31,7 @@ from llmstack.connections.models import (
     ConnectionStatus,
 )
 from llmstack.events.apis import JSONEncoder
-from llmstack.play.utils import run_coro_in_new_loop
+from llmstack.play.utils import ConnectionEventQueue, run_in_shared_executor
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +102,7 @@ class AppConsumer(AsyncWebsocketConsumer):
         self._preview = True if "preview" in self.scope["url_route"]["kwargs"] else False
         self._session_id = str(uuid.uuid4())
         self._user = self.scope.get("user", None)
+        self._events = ConnectionEventQueue(self._respond_to_event, name=f"app-{self._app_uuid}")
 
         headers = dict(self.scope["headers"])
         request_ip = headers.get(
@@ -136,48 +137,54 @@ class AppConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         self._connected = False
+        await self._events.close()
         if self._app_runner:
             await self._app_runner.stop()
 
     async def stop(self):
         self._connected = False
-        if self._event_response_task:
-            self._event_response_task.cancel()
+        await self._events.close()
         await self.close()
 
+    async def _run(self, client_request_id, input):
+        app_runner_request = AppRunnerRequest(
+            client_request_id=client_request_id,
+            session_id=self._session_id,
+            input=input,
+        )
+        try:
+            response_iterator = self._app_runner.run(app_runner_request)
+            async for response in response_iterator:
+                # Check both cancellation and connection state
+                if asyncio.current_task().cancelled() or not self._connected:
+                    break
+
+                if response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_CHUNK:
+                    await self.send(text_data=response.model_dump_json())
+                elif response.type == AppRunnerStreamingResponseType.ERRORS:
+                    await self.send(
+                        text_data=json.dumps(
+                            {
+                                "errors": [error.message for error in response.data.errors],
+                                "request_id": client_request_id,
+                            }
+                        )
+                    )
+                elif response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_END:
+                    await self.send(text_data=json.dumps({"event": "done", "request_id": client_request_id}))
+        except Exception as e:
+            logger.exception(f"Failed to run app: {e}")
+
     async def _respond_to_event(self, text_data):
         json_data = json.loads(text_data)
         client_request_id = json_data.get("id", None)
         event = json_data.get("event", None)
 
         if event == "run":
-            app_runner_request = AppRunnerRequest(
-                client_request_id=client_request_id,
-                session_id=self._session_id,
-                input=json_data.get("input", {}),
+            # Runs stream their output in their own task so that later events, like stop, are handled meanwhile
+            self._event_response_task = self._events.spawn(
+                self._run(client_request_id, json_data.get("input", {})), name="respond_to_event"
             )
-            try:
-                response_iterator = self._app_runner.run(app_runner_request)
-                async for response in response_iterator:
-                    # Check both cancellation and connection state
-                    if asyncio.current_task().cancelled() or not self._connected:
-                        break
-
-                    if response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_CHUNK:
-                        await self.send(text_data=response.model_dump_json())
-                    elif response.type == AppRunnerStreamingResponseType.ERRORS:
-                        await self.send(
-                            text_data=json.dumps(
-                                {
-                                    "errors": [error.message for error in response.data.errors],
-                                    "request_id": client_request_id,
-                                }
-                            )
-                        )
-                    elif response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_END:
-                        await self.send(text_data=json.dumps({"event": "done", "request_id": client_request_id}))
-            except Exception as e:
-                logger.exception(f"Failed to run app: {e}")
         elif event == "create_asset":
             from llmstack.apps.models import AppSessionFiles
 
@@ -242,7 +249,7 @@ class AppConsumer(AsyncWebsocketConsumer):
             await self.stop()
 
     async def receive(self, text_data):
-        self._event_response_task = run_coro_in_new_loop(self._respond_to_event(text_data), name="respond_to_event")
+        await self._events.put(text_data)
 
 
 class AssetStreamConsumer(AsyncWebsocketConsumer):
@@ -251,13 +258,24 @@ class AssetStreamConsumer(AsyncWebsocketConsumer):
         self._uuid = self.scope["url_route"]["kwargs"]["uuid"]
         self._session = self.scope["session"]
         self._request_user = self.scope["user"]
+        self._events = ConnectionEventQueue(self._respond_to_event, name=f"asset-{self._uuid}")
+        self._asset_stream = None
         self._asset = await sync_to_async(get_asset_by_objref)(
             f"objref://{self._category}/{self._uuid}", self._request_user, self._session
         )
         await self.accept()
 
     async def disconnect(self, close_code):
-        pass
+        await self._events.close()
+
+    async def _send_stream(self, asset_stream):
+        try:
+            async for chunk in asset_stream.read_async(start_index=0):
+                await self.send(bytes_data=chunk)
+        except Exception as e:
+            logger.exception(e)
+            await self.send(bytes_data=b"")
+            await self.close()
 
     async def _respond_to_event(self, bytes_data):
         from llmstack.assets.stream import AssetStream
@@ -272,12 +290,14 @@ class AssetStreamConsumer(AsyncWebsocketConsumer):
                 await self.close(code=1008)
                 return
 
-            asset_stream = AssetStream(self._asset)
+            # Writes on a connection share one stream so that their chunks are batched
+            if self._asset_stream is None:
+                self._asset_stream = AssetStream(self._asset)
+            asset_stream = self._asset_stream
 
             try:
                 if event == b"read":
-                    async for chunk in asset_stream.read_async(start_index=0):
-                        await self.send(bytes_data=chunk)
+                    self._events.spawn(self._send_stream(asset_stream), name="send_asset_stream")
 
                 if event == b"write":
                     if bytes_data == b"write\n":
@@ -285,7 +305,7 @@ class AssetStreamConsumer(AsyncWebsocketConsumer):
                         await self.close()
                         return
 
-                    await sync_to_async(asset_stream.append_chunk)(bytes_data[6:])
+                    await run_in_shared_executor(asset_stream.append_chunk, bytes_data[6:])
 
             except Exception as e:
                 logger.exception(e)
@@ -293,7 +313,7 @@ class AssetStreamConsumer(AsyncWebsocketConsumer):
                 await self.close()
 
     async def receive(self, text_data=None, bytes_data=None):
-        run_coro_in_new_loop(self._respond_to_event(bytes_data))
+        await self._events.put(bytes_data)
 
 
 class ConnectionConsumer(AsyncWebsocketConsumer):
@@ -400,6 +420,7 @@ class PlaygroundConsumer(AsyncWebsocketConsumer):
             processor_slug="",
             provider_slug="",
         )
+        self._events = ConnectionEventQueue(self._respond_to_event, name="playground")
         self._event_response_task = None
         self._app_runner = None
         self._connected = True
@@ -407,11 +428,31 @@ class PlaygroundConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         self._connected = False
-        if self._event_response_task:
-            self._event_response_task.cancel()
+        await self._events.close()
         if self._app_runner:
             await self._app_runner.stop()
 
+    async def _run(self, app_runner, app_runner_request):
+        client_request_id = app_runner_request.client_request_id
+        try:
+            response_iterator = app_runner.run(app_runner_request)
+            async for response in response_iterator:
+                if not self._connected:
+                    break
+
+                if response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_CHUNK:
+                    await self.send(text_data=response.model_dump_json())
+                elif response.type == AppRunnerStreamingResponseType.OUTPUT:
+                    await self.send(
+                        text_data=json.dumps(
+                            {"event": "done", "request_id": client_request_id, "data": response.data.chunks},
+                            cls=JSONEncoder,
+                        )
+                    )
+        except Exception as e:
+            logger.exception(f"Failed to run app: {e}")
+        await app_runner.stop()
+
     async def _respond_to_event(self, text_data):
         from llmstack.apps.apis import PlaygroundViewSet
 
@@ -440,27 +481,12 @@ class PlaygroundConsumer(AsyncWebsocketConsumer):
         self._app_runner = await PlaygroundViewSet().get_app_runner_async(
             session_id, source, self.scope.get("user", None), input_data, config_data
         )
-        try:
-            response_iterator = self._app_runner.run(app_runner_request)
-            async for response in response_iterator:
-                if not self._connected:
-                    break
 
-                if response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_CHUNK:
-                    await self.send(text_data=response.model_dump_json())
-                elif response.type == AppRunnerStreamingResponseType.OUTPUT:
-                    await self.send(
-                        text_data=json.dumps(
-                            {"event": "done", "request_id": client_request_id, "data": response.data.chunks},
-                            cls=JSONEncoder,
-                        )
-                    )
-        except Exception as e:
-            logger.exception(f"Failed to run app: {e}")
-        await self._app_runner.stop()
+        # Runs stream their output in their own task so that later events are handled meanwhile
+        self._event_response_task = self._events.spawn(self._run(self._app_runner, app_runner_request), name="run_app")
 
     async def receive(self, text_data):
-        self._event_response_task = run_coro_in_new_loop(self._respond_to_event(text_data))
+        await self._events.put(text_data)
 
 
 class StoreAppConsumer(AppConsumer):
@@ -469,6 +495,7 @@ class StoreAppConsumer(AppConsumer):
 
         self._app_slug = self.scope["url_route"]["kwargs"]["app_id"]
         self._session_id = str(uuid.uuid4())
+        self._events = ConnectionEventQueue(self._respond_to_event, name=f"store-app-{self._app_slug}")
 
         headers = dict(self.scope["headers"])
         request_ip = headers.get("X-Forwarded-For", self.scope.get("client", [""])[0] or "").split(",")[
@@ -503,6 +530,7 @@ class TwilioVoiceConsumer(AsyncWebsocketConsumer):
         self._source = TwilioAppRunnerSource(
             app_uuid=self._app_uuid, incoming_number=self.scope["url_route"]["kwargs"]["incoming_number"]
         )
+        self._events = ConnectionEventQueue(self._respond_to_event, name=f"twilio-{self._app_uuid}")
         self._input_audio_stream = None
         self._output_audio_task = None
 
@@ -530,52 +558,57 @@ class TwilioVoiceConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         self._connected = False
+        await self._events.close()
         if self._app_runner:
             await self._app_runner.stop()
         await self.close(code=close_code)
 
     async def receive(self, text_data):
-        self._event_response_task = run_coro_in_new_loop(self._respond_to_event(text_data))
+        await self._events.put(text_data)
 
-    async def _respond_to_event(self, text_data):
+    async def _run(self):
         from llmstack.assets.stream import AssetStream
 
+        response_iterator = self._app_runner.run(
+            AppRunnerRequest(
+                client_request_id=self._stream_sid,
+                session_id=self._session_id,
+                input={},
+            )
+        )
+
+        # Iterate till we get the objrefs for input and output audio
+        async for response in response_iterator:
+            if not self._connected:
+                break
+
+            if response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_CHUNK:
+                deltas = response.data.deltas
+                if "agent_input_audio_stream" in deltas:
+                    input_audio_stream_objref = deltas["agent_input_audio_stream"][1:]
+                    input_audio_stream = await sync_to_async(get_asset_by_objref)(
+                        input_audio_stream_objref, self.scope.get("user", None), self._session_id
+                    )
+                    self._input_audio_stream = AssetStream(input_audio_stream)
+                elif "agent_output_audio_stream__0" in deltas:
+                    self._output_audio_task = self._events.spawn(
+                        self._process_output_audio_stream(
+                            deltas["agent_output_audio_stream__0"][1:]
+                        ),  # Remove + prefix since this is a delta
+                        name="process_output_audio_stream",
+                    )
+                elif "agent_input_audio_stream_started_at" in deltas:
+                    # Clear current media buffer
+                    await self.send(text_data=json.dumps({"event": "clear", "streamSid": self._stream_sid}))
+
+    async def _respond_to_event(self, text_data):
         json_data = json.loads(text_data)
         event = json_data.get("event", None)
 
         if event == "start":
-            # Run the app
+            # Run the app. Media events keep arriving while the run streams its output
             self._stream_sid = json_data.get("start", {}).get("streamSid", "")
-            response_iterator = self._app_runner.run(
-                AppRunnerRequest(
-                    client_request_id=self._stream_sid,
-                    session_id=self._session_id,
-                    input={},
-                )
-            )
-
-            # Iterate till we get the objrefs for input and output audio
-            async for response in response_iterator:
-                if not self._connected:
-                    break
-
-                if response.type == AppRunnerStreamingResponseType.OUTPUT_STREAM_CHUNK:
-                    deltas = response.data.deltas
-                    if "agent_input_audio_stream" in deltas:
-                        input_audio_stream_objref = deltas["agent_input_audio_stream"][1:]
-                        input_audio_stream = await sync_to_async(get_asset_by_objref)(
-                            input_audio_stream_objref, self.scope.get("user", None), self._session_id
-                        )
-                        self._input_audio_stream = AssetStream(input_audio_stream)
-                    elif "agent_output_audio_stream__0" in deltas:
-                        self._output_audio_task = run_coro_in_new_loop(
-                            self._process_output_audio_stream(
-                                deltas["agent_output_audio_stream__0"][1:]
-                            )  # Remove + prefix since this is a delta
-                        )
-                    elif "agent_input_audio_stream_started_at" in deltas:
-                        # Clear current media buffer
-                        await self.send(text_data=json.dumps({"event": "clear", "streamSid": self._stream_sid}))
+            self._event_response_task = self._events.spawn(self._run(), name="run_app")
         elif event == "stop":
             await self._app_runner.stop()
             self._app_runner = None
@@ -594,8 +627,8 @@ class TwilioVoiceConsumer(AsyncWebsocketConsumer):
                 # Upsample from 8kHz to 24kHz
                 pcm_upsampled = audioop.ratecv(pcm_data, 2, 1, 8000, 24000, None)[0]
 
-                # Append the converted and upsampled data
-                self._input_audio_stream.append_chunk(pcm_upsampled)
+                # Append the converted and upsampled data. Media events are handled in order, so chunks are too
+                await run_in_shared_executor(self._input_audio_stream.append_chunk, pcm_upsampled)
 
             except Exception as e:
                 logger.exception(f"Error converting audio format: {e}")
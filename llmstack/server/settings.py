@@ -38,6 +38,11 @@ CSRF_TRUSTED_ORIGINS = os.getenv(
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
 CIPHER_KEY_SALT = os.getenv("CIPHER_KEY_SALT", None)
+# Derived ciphers and decrypted profile secrets are cached per process for this many seconds
+CIPHER_CACHE_SIZE = int(os.getenv("CIPHER_CACHE_SIZE", "1024"))
+CIPHER_CACHE_TTL = int(os.getenv("CIPHER_CACHE_TTL", "600"))
+PROFILE_SECRETS_CACHE_SIZE = int(os.getenv("PROFILE_SECRETS_CACHE_SIZE", "1024"))
+PROFILE_SECRETS_CACHE_TTL = int(os.getenv("PROFILE_SECRETS_CACHE_TTL", "600"))
 
 ADMIN_ENABLED = os.getenv("ADMIN_ENABLED", True)
 
@@ -319,6 +324,14 @@ CACHES = {
         "LOCATION": f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}/3",
         "TIMEOUT": 3600,
     },
+    "app_session_store": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}/2",
+        "TIMEOUT": 3600,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    },
     "objref_stream": {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}/4",
@@ -327,6 +340,16 @@ CACHES = {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
     },
+    "processor_output_cache": {
+        "BACKEND": f"django.core.cache.backends.{os.getenv('CACHE_BACKEND', 'redis.RedisCache')}",
+        "LOCATION": f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}/7",
+        "TIMEOUT": 3600,
+    },
+    "embeddings_cache": {
+        "BACKEND": f"django.core.cache.backends.{os.getenv('CACHE_BACKEND', 'redis.RedisCache')}",
+        "LOCATION": f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}/8",
+        "TIMEOUT": 3600,
+    },
     "sheet_run_data_store": {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', 6379)}/6",
@@ -347,6 +370,11 @@ CHANNEL_LAYERS = {
 }
 
 APP_SESSION_TIMEOUT = int(os.getenv("APP_SESSION_TIMEOUT", 3600))
+# Backend for app session data, "redis" stores each session as a redis hash, "locmem" keeps sessions in process memory
+APP_SESSION_STORE = os.getenv(
+    "APP_SESSION_STORE",
+    "locmem" if os.getenv("CACHE_BACKEND", "redis.RedisCache") == "locmem.LocMemCache" else "redis",
+)
 
 ACCOUNT_DEFAULT_HTTP_PROTOCOL = "https"
 SITE_ID = 1
@@ -454,6 +482,11 @@ RQ_QUEUES = {
 }
 
 USE_REMOTE_JOB_QUEUE = os.getenv("USE_REMOTE_JOB_QUEUE", "True") == "True"
+# When USE_REMOTE_JOB_QUEUE is off, adhoc jobs run in process on LOCAL_JOB_QUEUE_MAX_WORKERS threads from a queue of
+# up to LOCAL_JOB_QUEUE_SIZE jobs. Queued jobs are given LOCAL_JOB_QUEUE_DRAIN_TIMEOUT seconds to complete on exit
+LOCAL_JOB_QUEUE_MAX_WORKERS = int(os.getenv("LOCAL_JOB_QUEUE_MAX_WORKERS", "4"))
+LOCAL_JOB_QUEUE_SIZE = int(os.getenv("LOCAL_JOB_QUEUE_SIZE", "1000"))
+LOCAL_JOB_QUEUE_DRAIN_TIMEOUT = int(os.getenv("LOCAL_JOB_QUEUE_DRAIN_TIMEOUT", "30"))
 # Interval between two subtask runs in seconds
 TASK_RUN_DELAY = int(os.getenv("TASK_RUN_DELAY", "60"))
 # Maximum number of subtasks per task/job
@@ -692,6 +725,9 @@ SHEET_TEMPLATES_DIR = (
     else [os.path.join(BASE_DIR, "contrib", "sheets")]
 )
 
+# Compression for sheet cell pages, "zlib" or "none"
+SHEET_CELL_PAGE_COMPRESSION = os.getenv("SHEET_CELL_PAGE_COMPRESSION", "zlib")
+
 DATA_PIPELINES_DIR = (
     os.getenv("DATA_PIPELINES_DIR").split(",")
     if os.getenv("DATA_PIPELINES_DIR")
@@ -744,6 +780,104 @@ LIMITER_MODULE = "llmstack.server.limiter"
 
 ENABLE_JOBS = os.getenv("ENABLE_JOBS", "True") == "True"
 
+# Actor runtime to use, "threading" runs every actor on its own thread, "asyncio" runs actors as tasks on a
+# shared event loop and handles their messages in bounded executors
+ACTOR_RUNTIME = os.getenv("ACTOR_RUNTIME", "threading")
+# Maximum threads handling processor and coordination actor messages with the asyncio runtime
+ACTOR_RUNTIME_MAX_WORKERS = int(os.getenv("ACTOR_RUNTIME_MAX_WORKERS", "64"))
+ACTOR_RUNTIME_MAX_COORDINATION_WORKERS = int(os.getenv("ACTOR_RUNTIME_MAX_COORDINATION_WORKERS", "256"))
+
+# Keep warm actor graphs for published app versions and reuse them across runs
+APP_RUNNER_POOL_ENABLED = os.getenv("APP_RUNNER_POOL_ENABLED", "False") == "True"
+# Maximum idle actor graphs kept per app version and across all apps
+APP_RUNNER_POOL_MAX_IDLE_PER_KEY = int(os.getenv("APP_RUNNER_POOL_MAX_IDLE_PER_KEY", "4"))
+APP_RUNNER_POOL_MAX_SIZE = int(os.getenv("APP_RUNNER_POOL_MAX_SIZE", "256"))
+# Idle actor graphs are stopped after this many seconds
+APP_RUNNER_POOL_MAX_IDLE_SECONDS = int(os.getenv("APP_RUNNER_POOL_MAX_IDLE_SECONDS", "300"))
+
+# Maximum number of compiled liquid templates and extracted template variable sets cached per process
+LIQUID_TEMPLATE_CACHE_SIZE = int(os.getenv("LIQUID_TEMPLATE_CACHE_SIZE", "1024"))
+LIQUID_VARIABLES_CACHE_SIZE = int(os.getenv("LIQUID_VARIABLES_CACHE_SIZE", "1024"))
+
+# Compiled provider config resolvers cached per process, one for each distinct set of provider configs
+PROVIDER_CONFIG_RESOLVER_CACHE_SIZE = int(os.getenv("PROVIDER_CONFIG_RESOLVER_CACHE_SIZE", "256"))
+PROVIDER_CONFIG_RESOLVER_CACHE_TTL = int(os.getenv("PROVIDER_CONFIG_RESOLVER_CACHE_TTL", "600"))
+
+# LLM clients are pooled per process by provider, base URL and credentials and share keep-alive connections.
+# HTTP/2 is used when the h2 package is installed
+LLM_CLIENT_POOL_MAX_SIZE = int(os.getenv("LLM_CLIENT_POOL_MAX_SIZE", "256"))
+LLM_CLIENT_POOL_IDLE_TIMEOUT = int(os.getenv("LLM_CLIENT_POOL_IDLE_TIMEOUT", "300"))
+LLM_CLIENT_MAX_CONNECTIONS = int(os.getenv("LLM_CLIENT_MAX_CONNECTIONS", "100"))
+LLM_CLIENT_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_CLIENT_KEEPALIVE_EXPIRY = int(os.getenv("LLM_CLIENT_KEEPALIVE_EXPIRY", "60"))
+LLM_CLIENT_HTTP2 = os.getenv("LLM_CLIENT_HTTP2", "True") == "True"
+
+# Streamed chunks written by processors within this window are relayed to the coordinator as one message.
+# The first chunk is always relayed immediately. Set the window to 0 to relay every chunk as it is written
+OUTPUT_STREAM_COALESCE_WINDOW_MS = int(os.getenv("OUTPUT_STREAM_COALESCE_WINDOW_MS", "20"))
+OUTPUT_STREAM_COALESCE_MAX_SIZE = int(os.getenv("OUTPUT_STREAM_COALESCE_MAX_SIZE", "2048"))
+
+# Asset stream chunks are batched up to this many bytes or milliseconds before they are added to redis, and
+# finalized assets are spooled to a temporary file once they are larger than ASSET_STREAM_SPOOL_MAX_SIZE bytes
+ASSET_STREAM_BATCH_SIZE = int(os.getenv("ASSET_STREAM_BATCH_SIZE", "8192"))
+ASSET_STREAM_BATCH_WINDOW_MS = int(os.getenv("ASSET_STREAM_BATCH_WINDOW_MS", "20"))
+ASSET_STREAM_READ_PAGE_SIZE = int(os.getenv("ASSET_STREAM_READ_PAGE_SIZE", "1000"))
+ASSET_STREAM_SPOOL_MAX_SIZE = int(os.getenv("ASSET_STREAM_SPOOL_MAX_SIZE", str(10 * 1024 * 1024)))
+
+# Maximum connections in the async redis pool used to read asset streams
+ASSET_STREAM_ASYNC_MAX_CONNECTIONS = int(os.getenv("ASSET_STREAM_ASYNC_MAX_CONNECTIONS", "500"))
+
+# Websocket consumers handle each connection's events in order from a queue of this many events on the ASGI event
+# loop, and run blocking calls in a shared pool of CONSUMER_EXECUTOR_MAX_WORKERS threads
+CONSUMER_EVENT_QUEUE_SIZE = int(os.getenv("CONSUMER_EVENT_QUEUE_SIZE", "100"))
+CONSUMER_EXECUTOR_MAX_WORKERS = int(os.getenv("CONSUMER_EXECUTOR_MAX_WORKERS", "32"))
+
+# File backed destinations like sqlite and pandas keep a local working copy of this many tables per process
+DATA_DESTINATION_WORKING_COPY_CACHE_SIZE = int(os.getenv("DATA_DESTINATION_WORKING_COPY_CACHE_SIZE", "32"))
+
+# Texts are embedded in requests of EMBEDDINGS_BATCH_SIZE texts with up to EMBEDDINGS_MAX_CONCURRENCY requests in
+# flight. Rate limited requests are retried up to EMBEDDINGS_MAX_RETRIES times after the provider's retry delay
+EMBEDDINGS_BATCH_SIZE = int(os.getenv("EMBEDDINGS_BATCH_SIZE", "100"))
+EMBEDDINGS_MAX_CONCURRENCY = int(os.getenv("EMBEDDINGS_MAX_CONCURRENCY", "4"))
+EMBEDDINGS_MAX_RETRIES = int(os.getenv("EMBEDDINGS_MAX_RETRIES", "5"))
+EMBEDDING_CLIENT_CACHE_SIZE = int(os.getenv("EMBEDDING_CLIENT_CACHE_SIZE", "256"))
+EMBEDDING_CLIENT_CACHE_TTL = int(os.getenv("EMBEDDING_CLIENT_CACHE_TTL", "600"))
+# Text embeddings are cached by content hash so that unchanged chunks aren't embedded again on resync
+EMBEDDINGS_CACHE_ENABLED = os.getenv("EMBEDDINGS_CACHE_ENABLED", "True") == "True"
+EMBEDDINGS_CACHE_TTL = int(os.getenv("EMBEDDINGS_CACHE_TTL", str(7 * 24 * 3600)))
+
+# App store search keeps an index of app search vectors per process, saved to APP_STORE_SEARCH_INDEX_PATH (a file in
+# the temp directory by default) and checked for changes made by other processes every refresh interval seconds
+APP_STORE_SEARCH_INDEX_PATH = os.getenv("APP_STORE_SEARCH_INDEX_PATH", "")
+APP_STORE_SEARCH_INDEX_REFRESH_INTERVAL = int(os.getenv("APP_STORE_SEARCH_INDEX_REFRESH_INTERVAL", "60"))
+APP_STORE_SEARCH_MAX_LIMIT = int(os.getenv("APP_STORE_SEARCH_MAX_LIMIT", "100"))
+# Query vectors computed by vectorize_text are cached per process
+TEXT_VECTOR_CACHE_SIZE = int(os.getenv("TEXT_VECTOR_CACHE_SIZE", "1024"))
+TEXT_VECTOR_CACHE_TTL = int(os.getenv("TEXT_VECTOR_CACHE_TTL", "3600"))
+
+# The map processor runs up to this many items of its input list at once, whatever its concurrency is configured to
+MAP_PROCESSOR_MAX_CONCURRENCY = int(os.getenv("MAP_PROCESSOR_MAX_CONCURRENCY", "16"))
+
+# App run jobs run up to TASK_RUN_MAX_CONCURRENCY inputs of a batch at once. Workers keep the inputs of up to
+# TASK_RUN_INPUT_CACHE_SIZE task runs in memory instead of reading them from the job for every batch
+TASK_RUN_MAX_CONCURRENCY = int(os.getenv("TASK_RUN_MAX_CONCURRENCY", "4"))
+TASK_RUN_INPUT_CACHE_SIZE = int(os.getenv("TASK_RUN_INPUT_CACHE_SIZE", "16"))
+TASK_RUN_INPUT_CACHE_TTL = int(os.getenv("TASK_RUN_INPUT_CACHE_TTL", "3600"))
+
+# Cache processor outputs for identical inputs. Apps opt in by setting processor_cache_ttl in their config and
+# runs from PROCESSOR_OUTPUT_CACHE_SOURCES are cached with the default TTL
+PROCESSOR_OUTPUT_CACHE_ENABLED = os.getenv("PROCESSOR_OUTPUT_CACHE_ENABLED", "False") == "True"
+PROCESSOR_OUTPUT_CACHE_DEFAULT_TTL = int(os.getenv("PROCESSOR_OUTPUT_CACHE_DEFAULT_TTL", "3600"))
+PROCESSOR_OUTPUT_CACHE_SOURCES = [
+    source for source in os.getenv("PROCESSOR_OUTPUT_CACHE_SOURCES", "sheet").split(",") if source
+]
+# Outputs larger than this many bytes when serialized are not cached. Apps can lower it with
+# processor_cache_max_entry_size in their config
+PROCESSOR_OUTPUT_CACHE_MAX_ENTRY_SIZE = int(os.getenv("PROCESSOR_OUTPUT_CACHE_MAX_ENTRY_SIZE", "262144"))
+
+# Interval in seconds at which each process publishes its metrics snapshot to the cache. 0 disables publishing
+METRICS_PUBLISH_INTERVAL = int(os.getenv("METRICS_PUBLISH_INTERVAL", "60"))
+
 CONNECTION_TYPE_INTERFACE_EXCLUDED_PACKAGES = os.getenv("CONNECTION_TYPE_INTERFACE_EXCLUDED_PACKAGES", "").split(",")
 
 DEFAULT_DATA_DESTINATION_CONFIG = {"provider_slug": "weaviate", "processor_slug": "vector-store"}
@@ -21,7 +21,7 @@ from llmstack.apps.runner.app_runner import (
     SheetStoreAppRunnerSource,
 )
 from llmstack.base.models import Profile
-from llmstack.common.utils.sslr._client import LLM
+from llmstack.common.utils.llm_client_pool import get_llm_client
 from llmstack.jobs.adhoc import ProcessingJob
 from llmstack.jobs.models import RepeatableJob
 from llmstack.sheets.models import (
@@ -98,14 +98,18 @@ def _get_sheet_csv(columns, cells, total_rows):
     output.seek(0)
     output.truncate(0)
 
+    # Group cells by row once instead of scanning all cells for every row
+    cells_by_row = {}
+    for cell in cells.values():
+        cells_by_row.setdefault(cell.row, {})[cell.col_letter] = cell
+
     for row in range(1, total_rows + 1):
-        # Create a dict of cell_id to cell from this row
-        row_cells = {cell.cell_id: cell for cell in cells.values() if cell.row == row}
+        row_cells = cells_by_row.get(row, {})
 
         # Create a list of cell values for this row, using an empty string if the cell doesn't exist
         row_values = []
         for column in columns:
-            cell = row_cells.get(f"{column.col_letter}{row}")
+            cell = row_cells.get(column.col_letter)
             row_values.append(cell.value if cell else "")
 
         writer.writerow(row_values)
@@ -139,12 +143,30 @@ class PromptlySheetViewSet(viewsets.ViewSet):
         include_cells = request.query_params.get("include_cells", "false").lower() == "true"
 
         if sheet_uuid:
+            start_row, end_row = request.query_params.get("start_row"), request.query_params.get("end_row")
+            try:
+                start_row = int(start_row) if start_row is not None else None
+                end_row = int(end_row) if end_row is not None else None
+            except ValueError:
+                return DRFResponse(
+                    {"detail": "start_row and end_row must be integers."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if start_row is not None and end_row is not None and not 0 <= start_row <= end_row:
+                return DRFResponse(
+                    {"detail": "start_row must be non-negative and not greater than end_row."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             sheet = PromptlySheet.objects.get(uuid=sheet_uuid, profile_uuid=profile.uuid)
             return DRFResponse(
                 PromptlySheetSerializer(
                     instance=sheet,
                     context={
                         "include_cells": include_cells,
+                        # Only load the pages covering the rows in the client's viewport when given
+                        "start_row": start_row,
+                        "end_row": end_row,
                     },
                 ).data
             )
@@ -583,7 +605,7 @@ Now generate a liquidjs template for below instructions:
                 "OpenAI provider config not found. Please add a provider config for OpenAI to generate a template."
             )
 
-        llm_client = LLM(
+        llm_client = get_llm_client(
             provider="openai",
             openai_api_key=provider_config.api_key if provider_config else "",
         )
@@ -0,0 +1,127 @@
+"""
+Columnar in-memory view of a sheet's cells used while running a sheet.
+"""
+
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from llmstack.sheets.models import SheetCell, SheetColumn
+
+CELL_REFERENCE_PATTERN = re.compile(r"([A-Z]+\d+(?:-[A-Z]+\d+)?)")
+
+
+def _expand_range(ref: str) -> Tuple[str, ...]:
+    start, end = ref.split("-")
+    start_row, start_col = SheetCell.cell_id_to_row_and_col(start)
+    end_row, end_col = SheetCell.cell_id_to_row_and_col(end)
+    return tuple(
+        f"{SheetColumn.column_index_to_letter(col)}{row}"
+        for row in range(start_row, end_row + 1)
+        for col in range(SheetColumn.column_letter_to_index(start_col), SheetColumn.column_letter_to_index(end_col) + 1)
+    )
+
+
+@lru_cache(maxsize=4096)
+def parse_cell_references(text: str) -> Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...]:
+    """
+    Returns the cell references in text as (reference, cell ids) pairs. Cell ids are only set for ranges
+    """
+    return tuple((ref, _expand_range(ref) if "-" in ref else None) for ref in CELL_REFERENCE_PATTERN.findall(text))
+
+
+class SheetGrid:
+    """
+    Cells of a sheet indexed by cell id, column and row. Column values are kept in row order and only
+    rebuilt for columns that changed since they were last read, so formula cells can be given entire
+    columns as input without scanning the sheet.
+
+    Reads are safe from multiple threads. Updates are expected between batches of rows, as run_sheet does.
+    """
+
+    def __init__(self, cells: Optional[Dict[str, SheetCell]] = None):
+        self._cells: Dict[str, SheetCell] = {}
+        self._columns: Dict[str, Dict[int, SheetCell]] = defaultdict(dict)
+        self._rows: Dict[int, Dict[str, SheetCell]] = defaultdict(dict)
+        self._column_values: Dict[str, List] = {}
+        self._formula_references: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+
+        self.update((cells or {}).values())
+
+    def __contains__(self, cell_id: str) -> bool:
+        return cell_id in self._cells
+
+    def __getitem__(self, cell_id: str) -> SheetCell:
+        return self._cells[cell_id]
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def get(self, cell_id: str, default=None) -> Optional[SheetCell]:
+        return self._cells.get(cell_id, default)
+
+    def values(self):
+        return self._cells.values()
+
+    @property
+    def cells(self) -> Dict[str, SheetCell]:
+        return self._cells
+
+    def update(self, cells: Iterable[SheetCell]) -> None:
+        """
+        Adds or replaces cells, invalidating the cached values of the columns they belong to
+        """
+        with self._lock:
+            for cell in cells:
+                self._cells[cell.cell_id] = cell
+                self._columns[cell.col_letter][cell.row] = cell
+                self._rows[cell.row][cell.col_letter] = cell
+                self._column_values.pop(cell.col_letter, None)
+
+    def column_values(self, col_letter: str) -> List:
+        """
+        Returns the values of the cells in a column in row order. The returned list is shared and must not
+        be modified
+        """
+        values = self._column_values.get(col_letter)
+        if values is None:
+            with self._lock:
+                column = self._columns.get(col_letter, {})
+                values = [column[row].value for row in sorted(column.keys())]
+                self._column_values[col_letter] = values
+        return values
+
+    def row_cells(self, row: int) -> List[SheetCell]:
+        """
+        Returns the cells in a row in column order
+        """
+        cells = self._rows.get(row, {})
+        return sorted(cells.values(), key=lambda cell: SheetColumn.column_letter_to_index(cell.col_letter))
+
+    def formula_references(self, key: str, formula_data) -> Tuple:
+        """
+        Returns the parsed cell references of a formula. Formulas are parsed once per key for a run
+        """
+        references = self._formula_references.get(key)
+        if references is None:
+            references = parse_cell_references(formula_data.model_dump_json())
+            self._formula_references[key] = references
+        return references
+
+    def reference_values(self, references: Tuple, input_values: Optional[Dict] = None) -> Dict:
+        """
+        Resolves parsed cell references to the values of the referenced cells
+        """
+        if input_values is None:
+            input_values = {}
+
+        for ref, range_cell_ids in references:
+            if range_cell_ids is not None:
+                input_values[ref] = [self._cells[cell_id].value for cell_id in range_cell_ids if cell_id in self._cells]
+            elif ref in self._cells:
+                input_values[ref] = self._cells[ref].value
+
+        return input_values
@@ -0,0 +1,99 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from llmstack.sheets.grid import SheetGrid
+from llmstack.sheets.models import (
+    DataTransformerFormulaData,
+    SheetCell,
+    SheetColumn,
+    SheetFormula,
+    SheetFormulaType,
+)
+
+
+def _legacy_input_values(formula_cell, existing_cells_dict, columns_dict, current_col_index):
+    # Input values as run_row built them before the sheet grid
+    input_values = {}
+    for ref in re.findall(r"([A-Z]+\d+(?:-[A-Z]+\d+)?)", formula_cell.formula.data.model_dump_json()):
+        if ref in existing_cells_dict:
+            input_values[ref] = existing_cells_dict[ref].value
+
+    for col in columns_dict.values():
+        if SheetColumn.column_letter_to_index(col.col_letter) != current_col_index:
+            input_values[col.col_letter] = [
+                cell.value for cell in existing_cells_dict.values() if cell.col_letter == col.col_letter
+            ]
+    return input_values
+
+
+def _grid_input_values(formula_cell, grid, columns_dict, current_col_index):
+    input_values = grid.reference_values(grid.formula_references(formula_cell.cell_id, formula_cell.formula.data))
+    for col in columns_dict.values():
+        if SheetColumn.column_letter_to_index(col.col_letter) != current_col_index:
+            input_values[col.col_letter] = grid.column_values(col.col_letter)
+    return input_values
+
+
+class Command(BaseCommand):
+    help = "Benchmarks building formula cell inputs for a synthetic sheet with and without the sheet grid."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Number of rows in the sheet")
+        parser.add_argument("--cols", type=int, default=10, help="Number of columns in the sheet")
+        parser.add_argument(
+            "--legacy-rows",
+            type=int,
+            default=50,
+            help="Formula cells to time with the legacy scans. Results are extrapolated to all rows",
+        )
+
+    def handle(self, *args, **options):
+        rows, cols = options["rows"], options["cols"]
+        formula_col_index = cols - 1
+        col_letters = [SheetColumn.column_index_to_letter(index) for index in range(cols)]
+        formula_col = col_letters[formula_col_index]
+
+        columns_dict = {letter: SheetColumn(title=letter, col_letter=letter) for letter in col_letters}
+        cells = {}
+        for row in range(1, rows + 1):
+            for letter in col_letters[:-1]:
+                cell = SheetCell(row=row, col_letter=letter, value=f"{letter}{row} value")
+                cells[cell.cell_id] = cell
+            formula_cell = SheetCell(
+                row=row,
+                col_letter=formula_col,
+                formula=SheetFormula(
+                    type=SheetFormulaType.DATA_TRANSFORMER,
+                    data=DataTransformerFormulaData(transformation_template=f"{{{{ A{row} }}}} {{{{ B{row} }}}}"),
+                ),
+            )
+            cells[formula_cell.cell_id] = formula_cell
+        formula_cells = [cell for cell in cells.values() if cell.is_formula]
+
+        legacy_rows = min(options["legacy_rows"], rows)
+        start = time.perf_counter()
+        for formula_cell in formula_cells[:legacy_rows]:
+            _legacy_input_values(formula_cell, cells, columns_dict, formula_col_index)
+        legacy_elapsed = (time.perf_counter() - start) / legacy_rows * rows
+
+        start = time.perf_counter()
+        grid = SheetGrid(cells)
+        build_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for index, formula_cell in enumerate(formula_cells):
+            _grid_input_values(formula_cell, grid, columns_dict, formula_col_index)
+            # Executed cells come back in batches and invalidate the formula column
+            if index % 4 == 3:
+                grid.update([SheetCell(row=formula_cell.row, col_letter=formula_col, value="output")])
+        grid_elapsed = time.perf_counter() - start
+
+        self.stdout.write(f"Sheet: {rows} rows x {cols} columns, {len(formula_cells)} formula cells")
+        self.stdout.write(f"Legacy scans (extrapolated from {legacy_rows} rows): {legacy_elapsed:.3f}s")
+        self.stdout.write(f"Sheet grid: {build_elapsed:.3f}s to build, {grid_elapsed:.3f}s for all formula cells")
+        if grid_elapsed:
+            self.stdout.write(
+                self.style.SUCCESS(f"Speedup: {legacy_elapsed / (build_elapsed + grid_elapsed):.1f}x"),
+            )
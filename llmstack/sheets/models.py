@@ -1,12 +1,13 @@
-import base64
+import bisect
 import json
 import logging
 import string
 import uuid
+import zlib
 from enum import Enum
-from functools import cache
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import Any, Dict, Iterator, List, Literal, Optional, Union
 
+from django.conf import settings
 from django.db import models
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
@@ -272,24 +273,80 @@ def delete_sheet_data_objrefs(data_objrefs):
             pass
 
 
-def create_sheet_data_objrefs(cell_objs: List[SheetCell], sheet_name, sheet_uuid, page_size: int = 1000):
-    # Sort the cells by row and columns
-    cells = sorted(cell_objs, key=lambda cell: (cell.row, SheetColumn.column_letter_to_index(cell.col_letter)))
-    max_rows = max(cell_objs, key=lambda cell: cell.row).row + 1
+def create_sheet_data_pages(cell_objs: List[SheetCell], sheet_name, sheet_uuid, page_size: int = 1000):
+    """
+    Writes cells to one file per range of page_size rows and yields the page index entries. Pages without
+    cells are not written
+    """
+    compression = getattr(settings, "SHEET_CELL_PAGE_COMPRESSION", "zlib")
 
-    for i in range(0, max_rows, page_size):
-        chunk = {}
-        cells_in_page = list(filter(lambda cell: cell.row >= i and cell.row < i + page_size, cells))
-        for cell in cells_in_page:
-            chunk[cell.cell_id] = cell.model_dump()
+    pages = {}
+    for cell in cell_objs:
+        pages.setdefault(cell.row // page_size, []).append(cell)
 
-        data_json = json.dumps(chunk)
-        filename = f"{sheet_name}_{str(uuid.uuid4())[:4]}_{i}.json"
-        data_json_uri = f"data:application/json;name={filename};base64,{base64.b64encode(data_json.encode()).decode()}"
-        file_obj = PromptlySheetFiles.create_from_data_uri(
-            data_json_uri, ref_id=sheet_uuid, metadata={"sheet_uuid": sheet_uuid}
+    for page_number in sorted(pages.keys()):
+        cells = sorted(
+            pages[page_number],
+            key=lambda cell: (cell.row, SheetColumn.column_letter_to_index(cell.col_letter)),
         )
-        yield f"objref://sheets/{file_obj.uuid}"
+        data = json.dumps({cell.cell_id: cell.model_dump() for cell in cells}).encode()
+        filename = f"{sheet_name}_{str(uuid.uuid4())[:4]}_{page_number * page_size}.json"
+        if compression == "zlib":
+            data = zlib.compress(data)
+            filename = f"{filename}.zz"
+
+        file_obj = PromptlySheetFiles.create_from_bytes(
+            data,
+            filename,
+            metadata={"sheet_uuid": sheet_uuid, "mime_type": "application/json", "file_name": filename},
+            ref_id=sheet_uuid,
+        )
+        yield {
+            "start_row": page_number * page_size,
+            "end_row": (page_number + 1) * page_size - 1,
+            "objref": f"objref://sheets/{file_obj.uuid}",
+            "compression": compression,
+        }
+
+
+def get_sheet_data_pages(data: Dict, page_size: int = 1000) -> List[Dict]:
+    """
+    Returns the page index of sheet data. Sheets saved before pages were indexed have a page for every
+    page_size rows
+    """
+    if "cell_pages" in data:
+        return data["cell_pages"]
+
+    return [
+        {"start_row": i * page_size, "end_row": (i + 1) * page_size - 1, "objref": objref, "compression": None}
+        for i, objref in enumerate(data.get("cells", []))
+    ]
+
+
+def save_sheet_data_pages(data: Dict, cell_objs: List[SheetCell], sheet_name, sheet_uuid, page_size: int = 1000):
+    pages = list(create_sheet_data_pages(cell_objs, sheet_name, sheet_uuid, page_size=page_size)) if cell_objs else []
+    data["cell_pages"] = pages
+    data["cells"] = [page["objref"] for page in pages]
+
+
+def read_sheet_data_page(page: Dict) -> Dict[str, SheetCell]:
+    try:
+        category, uuid = page["objref"].strip().split("//")[1].split("/")
+        asset = PromptlySheetFiles.objects.get(uuid=uuid)
+        with asset.file.open("rb") as f:
+            data = f.read()
+
+        if page.get("compression") == "zlib":
+            data = zlib.decompress(data)
+        data = json.loads(data)
+
+        cell_items = data.items() if isinstance(data, dict) else enumerate(data)
+        return {cell_id: SheetCell(**cell_data) for cell_id, cell_data in cell_items}
+
+    except Exception as e:
+        logger.error(f"Error loading sheet data from objref: {e}")
+
+    return {}
 
 
 class PromptlySheet(models.Model):
@@ -310,42 +367,57 @@ class PromptlySheet(models.Model):
     def __str__(self):
         return self.name
 
-    @cache
-    def get_sheet_cells(self, objref):
-        try:
-            category, uuid = objref.strip().split("//")[1].split("/")
-            asset = PromptlySheetFiles.objects.get(uuid=uuid)
-            cells = {}
-            with asset.file.open("rb") as f:
-                data = json.load(f)
-                cell_items = data.items() if isinstance(data, dict) else enumerate(data)
-                for cell_id, cell_data in cell_items:
-                    cells[cell_id] = SheetCell(**cell_data)
-
-                return cells
+    @property
+    def page_size(self):
+        return (self.extra_data or {}).get("page_size", 1000)
 
-        except Exception as e:
-            logger.error(f"Error loading sheet data from objref: {e}")
-            pass
+    @property
+    def cell_pages(self) -> List[Dict]:
+        return get_sheet_data_pages(self.data or {}, self.page_size)
+
+    def get_page_cells(self, page: Dict) -> Dict[str, SheetCell]:
+        """
+        Returns the cells of a page, loading each page at most once per instance
+        """
+        loaded_pages = self.__dict__.setdefault("_loaded_cell_pages", {})
+        if page["objref"] not in loaded_pages:
+            loaded_pages[page["objref"]] = read_sheet_data_page(page)
+        return loaded_pages[page["objref"]]
+
+    def get_pages_in_rows(self, start_row: int, end_row: int) -> Iterator[Dict]:
+        pages = self.cell_pages
+        index = max(bisect.bisect_right([page["start_row"] for page in pages], start_row) - 1, 0)
+        for page in pages[index:]:
+            if page["start_row"] > end_row:
+                break
+            if page["end_row"] >= start_row:
+                yield page
 
+    def get_cell(self, row, col):
+        for page in self.get_pages_in_rows(row, row):
+            return self.get_page_cells(page).get(f"{col}{row}", {})
         return {}
 
-    def get_cell(self, row, col):
-        page_size = self.extra_data.get("page_size", 1000)
-        page = row // page_size
-        pages = self.data.get("cells", [])
-        page_objref = pages[page] if len(pages) > page else None
-        if page_objref:
-            cells = self.get_sheet_cells(page_objref)
-            return cells.get(f"{col}{row}", {})
-        else:
-            return {}
+    def get_cells_in_rows(self, start_row: int, end_row: int) -> Dict[str, SheetCell]:
+        """
+        Returns the cells between start_row and end_row, loading only the pages covering those rows
+        """
+        cells = {}
+        for page in self.get_pages_in_rows(start_row, end_row):
+            cells.update(
+                {
+                    cell_id: cell
+                    for cell_id, cell in self.get_page_cells(page).items()
+                    if start_row <= cell.row <= end_row
+                }
+            )
+        return cells
 
     @property
     def cells(self):
         cells = {}
-        for objref in self.data.get("cells", []):
-            cells.update(self.get_sheet_cells(objref))
+        for page in self.cell_pages:
+            cells.update(self.get_page_cells(page))
 
         return cells
 
@@ -364,15 +436,8 @@ class PromptlySheet(models.Model):
                 delete_sheet_data_objrefs(self.data.get("cells", []))
             cell_objs = kwargs.pop("cells")
 
-            self.data["cells"] = (
-                list(
-                    create_sheet_data_objrefs(
-                        cell_objs, self.name, str(self.uuid), page_size=self.extra_data.get("page_size", 1000)
-                    )
-                )
-                if cell_objs
-                else []
-            )
+            save_sheet_data_pages(self.data, cell_objs, self.name, str(self.uuid), page_size=self.page_size)
+            self.__dict__.pop("_loaded_cell_pages", None)
             if kwargs.get("update_fields"):
                 kwargs["update_fields"].append("data")
 
@@ -403,19 +468,11 @@ class PromptlySheetRunEntry(models.Model):
         sheet = PromptlySheet.objects.get(uuid=self.sheet_uuid)
 
         cell_objs = kwargs.pop("cells", [])
-        if not cell_objs:
-            self.data = {"cells": []}
-        else:
-            self.data = {
-                "cells": list(
-                    create_sheet_data_objrefs(
-                        cell_objs,
-                        f"{sheet.name}_processed",
-                        str(sheet.uuid),
-                        page_size=sheet.extra_data.get("page_size", 1000),
-                    )
-                )
-            }
+        self.data = {"cells": []}
+        if cell_objs:
+            save_sheet_data_pages(
+                self.data, cell_objs, f"{sheet.name}_processed", str(sheet.uuid), page_size=sheet.page_size
+            )
 
         if kwargs.get("update_fields"):
             kwargs["update_fields"].append("data")
@@ -20,7 +20,13 @@ class PromptlySheetSerializer(serializers.ModelSerializer):
     def get_cells(self, obj):
         cells = {}
         if self.context.get("include_cells", False):
-            for cell_id, cell in obj.cells.items():
+            start_row, end_row = self.context.get("start_row"), self.context.get("end_row")
+            sheet_cells = (
+                obj.get_cells_in_rows(start_row, end_row)
+                if start_row is not None and end_row is not None
+                else obj.cells
+            )
+            for cell_id, cell in sheet_cells.items():
                 cells[cell_id] = cell.model_dump()
 
         return cells
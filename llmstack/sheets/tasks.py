@@ -1,7 +1,6 @@
 import concurrent
 import json
 import logging
-import re
 from threading import Lock
 from typing import Any, Dict, List
 
@@ -16,6 +15,7 @@ from jsonpath_ng import parse
 from llmstack.common.utils.liquid import hydrate_input, render_template
 from llmstack.common.utils.utils import retry_on_db_error
 from llmstack.sheets.apis import PromptlySheetViewSet
+from llmstack.sheets.grid import SheetGrid, parse_cell_references
 from llmstack.sheets.models import (
     PromptlySheet,
     PromptlySheetRunEntry,
@@ -221,21 +221,11 @@ def process_cell_references(data, existing_cells_dict, input_values=None):
         for item in data:
             process_cell_references(item, existing_cells_dict, input_values)
     elif isinstance(data, str):
-        cell_refs = re.findall(r"([A-Z]+\d+(?:-[A-Z]+\d+)?)", data)
-        for ref in cell_refs:
-            if "-" in ref:
-                start, end = ref.split("-")
-                start_row, start_col = SheetCell.cell_id_to_row_and_col(start)
-                end_row, end_col = SheetCell.cell_id_to_row_and_col(end)
-                range_values = [
-                    existing_cells_dict[f"{SheetColumn.column_index_to_letter(col)}{row}"].value
-                    for row in range(start_row, end_row + 1)
-                    for col in range(
-                        SheetColumn.column_letter_to_index(start_col), SheetColumn.column_letter_to_index(end_col) + 1
-                    )
-                    if f"{SheetColumn.column_index_to_letter(col)}{row}" in existing_cells_dict
+        for ref, range_cell_ids in parse_cell_references(data):
+            if range_cell_ids is not None:
+                input_values[ref] = [
+                    existing_cells_dict[cell_id].value for cell_id in range_cell_ids if cell_id in existing_cells_dict
                 ]
-                input_values[ref] = range_values
             elif ref in existing_cells_dict:
                 input_values[ref] = existing_cells_dict[ref].value
 
@@ -298,7 +288,7 @@ def run_row(
     current_row,
     subsheet_start,
     subsheet_end,
-    existing_cells_dict,
+    grid: SheetGrid,
     columns_dict,
     formula_cells_dict,
     sheet,
@@ -314,32 +304,26 @@ def run_row(
         current_cell_id = f"{current_col}{current_row}"
         previous_cell_id = f"{SheetColumn.column_index_to_letter(current_col_index)}{current_row}"
 
-        if (
-            previous_cell_id in existing_cells_dict
-            and existing_cells_dict[previous_cell_id].value
-            and existing_cells_dict[previous_cell_id].value != ""
-        ):
-            valid_cells_in_row.append(existing_cells_dict.get(previous_cell_id))
+        if previous_cell_id in grid and grid[previous_cell_id].value and grid[previous_cell_id].value != "":
+            valid_cells_in_row.append(grid.get(previous_cell_id))
 
         # If selected_grid is provided and the cell is not in the selected grid, we don't need to execute it
         if selected_grid and not cell_in_selected_grid(
             selected_grid, SheetCell(row=current_row, col_letter=current_col)
         ):
-            if current_cell_id in existing_cells_dict:
-                valid_cells_in_row.append(existing_cells_dict.get(current_cell_id))
+            if current_cell_id in grid:
+                valid_cells_in_row.append(grid.get(current_cell_id))
             continue
 
         if current_cell_id in formula_cells_dict:
-            input_values = process_cell_references(
-                formula_cells_dict[current_cell_id].formula.data.model_dump_json(), existing_cells_dict
+            input_values = grid.reference_values(
+                grid.formula_references(current_cell_id, formula_cells_dict[current_cell_id].formula.data)
             )
 
             # For formula cells, we pass entire columns data as input values
             for col in columns_dict.values():
                 if SheetColumn.column_letter_to_index(col.col_letter) != current_col_index:
-                    input_values[col.col_letter] = [
-                        cell.value for cell in existing_cells_dict.values() if cell.col_letter == col.col_letter
-                    ]
+                    input_values[col.col_letter] = grid.column_values(col.col_letter)
 
             executed_cells.extend(
                 _execute_cell(
@@ -357,8 +341,8 @@ def run_row(
             and columns_dict[current_col].formula.type != SheetFormulaType.NONE
             and valid_cells_in_row
         ):
-            input_values = process_cell_references(
-                columns_dict[current_col].formula.data.model_dump_json(), existing_cells_dict
+            input_values = grid.reference_values(
+                grid.formula_references(f"column:{current_col}", columns_dict[current_col].formula.data)
             )
 
             for cell in valid_cells_in_row:
@@ -414,9 +398,10 @@ def run_sheet(
             sheet = PromptlySheet.objects.select_for_update().get(uuid=sheet_uuid)
             user = User.objects.get(id=user_id)
 
-            existing_cells_dict = sheet.cells
+            # Columnar view of the cells, updated as cells are executed
+            grid = SheetGrid(sheet.cells)
             columns_dict = {col.col_letter: col for col in sheet.columns}
-            formula_cells_dict = {cell.cell_id: cell for cell in sheet.cells.values() if cell.is_formula}
+            formula_cells_dict = {cell.cell_id: cell for cell in grid.values() if cell.is_formula}
             formula_cell_columns = set(
                 [SheetColumn.column_letter_to_index(cell.col_letter) for cell in formula_cells_dict.values()]
             )
@@ -470,10 +455,8 @@ def run_sheet(
                         for row_index in range(current_row, min(current_row + row_step, total_rows + 1)):
                             valid_cells_in_row_from_prev_cols = [
                                 cell
-                                for cell in existing_cells_dict.values()
-                                if cell.row == row_index
-                                and SheetColumn.column_letter_to_index(cell.col_letter) < subsheet_start
-                                and cell.value
+                                for cell in grid.row_cells(row_index)
+                                if SheetColumn.column_letter_to_index(cell.col_letter) < subsheet_start and cell.value
                             ]
 
                             parallel_args.append(
@@ -481,7 +464,7 @@ def run_sheet(
                                     row_index,
                                     subsheet_start,
                                     subsheet_end,
-                                    existing_cells_dict,
+                                    grid,
                                     columns_dict,
                                     formula_cells_dict,
                                     sheet,
@@ -503,8 +486,7 @@ def run_sheet(
 
                         # Update the executed cells
                         with global_lock:
-                            for cell in executed_cells:
-                                existing_cells_dict[f"{cell.col_letter}{cell.row}"] = cell
+                            grid.update(executed_cells)
 
                         # Update total rows and cols if the executed cells are beyond the current grid
                         if executed_cells: